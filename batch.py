@@ -0,0 +1,114 @@
+'''
+Module: batch
+Author: David Frye
+Description: Contains the functions solving many path queries over a maze at once, sharing search trees between queries and optionally spreading the searches over a pool of threads or processes.
+'''
+
+import array
+import collections
+import os
+
+from maze import Maze
+from solver import BreadthFirstSolver
+
+def group_queries(grid, queries):
+	'''
+	Function: group_queries
+	Description: Groups path queries by a shared endpoint, so that each group is answered by a single search tree grown from that endpoint. Since paths are undirected, each query joins the group of whichever of its endpoints is shared by more queries.
+	Parameters: grid, queries
+		grid: Grid - The compact cell storage of the maze
+		queries: [2-Tuple] - The queries, as (start cell position, end cell position), each valid and distinct
+	Return: [2-Tuple] - The groups, largest first
+		[0] = (Int) - The flat index of the root cell
+		[1] = ([3-Tuple]) - The group's queries (query number, flat index of the other endpoint, whether or not the root is the query's start)
+	'''
+
+	counts = collections.Counter()
+	for start, end in queries:
+		counts[start] += 1
+		counts[end] += 1
+
+	groups = {}
+	for number, (start, end) in enumerate(queries):
+		if counts[start] >= counts[end]:
+			groups.setdefault(grid.index(start), []).append((number, grid.index(end), True))
+		else:
+			groups.setdefault(grid.index(end), []).append((number, grid.index(start), False))
+
+	return sorted(groups.items(), key=lambda group: len(group[1]), reverse=True)
+
+def solve_groups(cells, size, groups):
+	'''
+	Function: solve_groups
+	Description: Answers groups of path queries over a snapshot of a maze's cells, growing one breadth-first search tree per group. Runs as a single task of a thread or process pool.
+	Parameters: cells, size, groups
+		cells: Buffer - The maze's cell bytes, which are only read
+		size: 2-Tuple - The dimensional lengths of the maze
+		groups: [2-Tuple] - The groups, in the format of group_queries
+	Return: [2-Tuple] - The answers (query number, path in the format of solve_batch)
+	'''
+
+	maze = Maze(size, buffer=cells)
+	solver = BreadthFirstSolver()
+	width = size[0]
+
+	answers = []
+	for root, members in groups:
+		parents = solver.search_tree(maze, root, [other for number, other, root_is_start in members])
+		for number, other, root_is_start in members:
+			if parents[other] < 0:
+				answers.append((number, None))
+				continue
+
+			# The tree leads from the other endpoint back to the root, so it is reversed when the root is the start.
+			path = solver.backtrace(parents, other)
+			if root_is_start:
+				path.reverse()
+			answers.append((number, array.array("i", [value for index in path for value in (index % width, index // width)])))
+
+	return answers
+
+def solve_batch(maze, queries, executor=None, chunks=None):
+	'''
+	Function: solve_batch
+	Description: Finds shortest paths for many queries at once. Queries sharing a start or an end cell are answered from one shared search tree, and the independent groups may be spread over a thread or process pool, each task reading an immutable snapshot of the cells taken when the call begins. Paths are returned as flat arrays, which are cheap to pass between processes.
+	Parameters: maze, queries, executor=None, chunks=None
+		maze: Maze - The maze to solve
+		queries: [2-Tuple] - The queries, as (start cell position, end cell position)
+		executor: Executor - A thread or process pool to spread the searches over (searching within this thread if None)
+		chunks: Int - The number of tasks to split the groups into for the executor (one per CPU if None)
+	Return: [Array(Int)] - The solution path of each query, in query order, as an array of interleaved x-positions and y-positions from start to end (None if the query has no solution or an endpoint lies outside of the maze)
+	'''
+
+	grid = maze.m_grid
+	results = [None] * len(queries)
+
+	# Answer the trivial queries directly, and set the invalid ones aside.
+	searched = []
+	numbers = []
+	for number, (start, end) in enumerate(queries):
+		if not maze.is_valid_cell_position(start) or not maze.is_valid_cell_position(end):
+			continue
+		if start == end:
+			results[number] = array.array("i", start)
+			continue
+		searched.append((start, end))
+		numbers.append(number)
+
+	groups = group_queries(grid, searched)
+	if not groups:
+		return results
+
+	if executor is None:
+		answers = solve_groups(grid.m_cells, maze.m_size, groups)
+	else:
+		# Deal the groups (largest first) into the tasks round-robin, so that the tasks take about as long as each other.
+		chunks = min(len(groups), chunks if chunks is not None else os.cpu_count() or 1)
+		snapshot = bytes(grid.m_cells)
+		futures = [executor.submit(solve_groups, snapshot, maze.m_size, groups[i::chunks]) for i in range(chunks)]
+		answers = [answer for future in futures for answer in future.result()]
+
+	for number, path in answers:
+		results[numbers[number]] = path
+
+	return results
\ No newline at end of file
@@ -4,12 +4,12 @@ Author: David Frye
 Description: Contains the Cell class.
 '''
 
-from utility import Direction
+from region import Region
 
 class Cell:
 	'''
 	Class: Cell
-	Description: Represents an individual cell in a maze.
+	Description: Represents an individual cell in a maze, as a view onto the maze's compact cell storage.
 	'''
 
 	# The print character for a visited cell.
@@ -21,27 +21,42 @@ class Cell:
 	# The print character for a vertical wall.
 	WALL_VERTICAL_STRING = "|"
 
-	def __init__(self, content, position):
+	def __init__(self, maze, position):
 		'''
 		Method: __init__
-		Description: Cell constructor.
-		Parameters: content, position
-			content: String - A string visually representing the cell
+		Description: Cell constructor. A cell is a lightweight view onto the compact cell storage of the maze that owns it.
+		Parameters: maze, position
+			maze: Maze - The maze that owns the cell
 			position: 2-Tuple - The cell's position in the maze that owns it
 				[0] - Cell's x-position
 				[1] - Cell's y-position
 		Return: None
 		'''
 
-		self.m_content = content
+		self.m_maze = maze
 		self.m_position = position
-		self.m_visited = False
-		self.m_walls = {
-			Direction.NORTH : True,
-			Direction.EAST : True,
-			Direction.SOUTH : True,
-			Direction.WEST : True
-		}
+		self.m_index = maze.m_grid.index(position)
+
+	def __eq__(self, other):
+		'''
+		Method: __eq__
+		Description: Determines whether or not the given cell views the same cell of the same maze.
+		Parameters: other
+			other: Cell - The cell to compare against
+		Return: Boolean - Whether or not both cells view the same cell of the same maze
+		'''
+
+		return isinstance(other, Cell) and self.m_maze is other.m_maze and self.m_index == other.m_index
+
+	def __hash__(self):
+		'''
+		Method: __hash__
+		Description: Hashes the cell by its position, so that views of the same cell are interchangeable.
+		Parameters: No parameters
+		Return: Int - The hash of the cell
+		'''
+
+		return hash(self.m_position)
 
 	def visit(self):
 		'''
@@ -51,8 +66,7 @@ class Cell:
 		Return: None
 		'''
 
-		self.m_visited = True
-		self.m_content = self.VISITED_STRING
+		self.m_maze.m_grid.visit(self.m_index)
 
 	def unvisit(self):
 		'''
@@ -62,8 +76,7 @@ class Cell:
 		Return: None
 		'''
 
-		self.m_visited = False
-		self.m_content = self.UNVISITED_STRING
+		self.m_maze.m_grid.unvisit(self.m_index)
 
 	def is_visited(self):
 		'''
@@ -73,7 +86,7 @@ class Cell:
 		Return: Boolean - Whether or not the cell is in the visited state
 		'''
 
-		return self.m_visited
+		return self.m_maze.m_grid.is_visited(self.m_index)
 
 	def get_content(self):
 		'''
@@ -83,7 +96,7 @@ class Cell:
 		Return: String - Cell's content attribute
 		'''
 
-		return self.m_content
+		return self.m_maze.get_index_content(self.m_index)
 
 	def get_position_x(self):
 		'''
@@ -114,7 +127,7 @@ class Cell:
 		Return: String - Cell's wall attribute corresponding to the given direction
 		'''
 
-		return self.m_walls.get(direction)
+		return self.m_maze.m_grid.get_wall(self.m_index, direction)
 
 	def set_content(self, content):
 		'''
@@ -125,7 +138,7 @@ class Cell:
 		Return: None
 		'''
 
-		self.m_content = content
+		self.m_maze.get_overlay(self.m_maze.OVERLAY_MARKERS).set(self.m_index, content)
 
 	def set_position_x(self, x):
 		'''
@@ -136,7 +149,8 @@ class Cell:
 		Return: None
 		'''
 
-		self.m_position[0] = x
+		self.m_position = (x, self.m_position[1])
+		self.m_index = self.m_maze.m_grid.index(self.m_position)
 
 	def set_position_y(self, y):
 		'''
@@ -147,7 +161,8 @@ class Cell:
 		Return: None
 		'''
 
-		self.m_position[1] = y
+		self.m_position = (self.m_position[0], y)
+		self.m_index = self.m_maze.m_grid.index(self.m_position)
 
 	def set_wall(self, direction, value):
 		'''
@@ -159,4 +174,6 @@ class Cell:
 		Return: None
 		'''
 
-		self.m_walls[direction] = value
\ No newline at end of file
+		self.m_maze.prepare([Region(self.m_position, (1, 1))], self.m_maze.MUTATION_CLOSE if value else self.m_maze.MUTATION_OPEN)
+		self.m_maze.m_grid.set_wall_side(self.m_index, direction, value)
+		self.m_maze.notify([Region(self.m_position, (1, 1))], self.m_maze.MUTATION_CLOSE if value else self.m_maze.MUTATION_OPEN)
\ No newline at end of file
@@ -0,0 +1,321 @@
+'''
+Module: changelog
+Author: David Frye
+Description: Contains the ChangeLog class, which records the changes made to a maze as compact diffs, along with the functions encoding, decoding and applying them.
+'''
+
+import struct
+import zlib
+
+from grid import Grid
+from maze import Maze
+from observer import MazeObserver
+from region import Region
+
+# The magic number and version at the start of every encoded diff.
+MAGIC = b"DDIF"
+VERSION = 1
+
+# The kinds of cell record: the XOR of the old and new cell bytes, or the new cell bytes themselves.
+RECORD_XOR = 0
+RECORD_SET = 1
+
+# The header (magic, version, cell record count, content record count), followed by the compressed records.
+HEADER = struct.Struct(">4sHII")
+# Each cell record (kind, x-position, y-position, width, height), followed by width * height bytes.
+CELL_RECORD = struct.Struct(">BIIII")
+# Each content record (overlay layer, flat index, content length), followed by the UTF-8 content.
+CONTENT_RECORD = struct.Struct(">BIH")
+# The content length marking a cell's content as removed.
+REMOVED_LENGTH = 0xFFFF
+
+def encode_diff(diff):
+	'''
+	Function: encode_diff
+	Description: Encodes a diff collected by ChangeLog.collect into bytes. The records are compressed together, so the unchanged bytes within each record (zero in XOR records) cost almost nothing.
+	Parameters: diff
+		diff: 2-Tuple - The diff
+			[0] = ([6-Tuple]) - The cell records (kind, x-position, y-position, width, height, bytes)
+			[1] = ([3-Tuple]) - The content records (overlay layer name, flat index, content or None if removed)
+	Return: Bytes - The encoded diff
+	'''
+
+	cell_records, content_records = diff
+	body = []
+	for kind, x, y, width, height, data in cell_records:
+		body.append(CELL_RECORD.pack(kind, x, y, width, height))
+		body.append(data)
+	for name, index, content in content_records:
+		if content is None:
+			body.append(CONTENT_RECORD.pack(Maze.OVERLAY_ORDER.index(name), index, REMOVED_LENGTH))
+		else:
+			encoded = content.encode("utf-8")
+			body.append(CONTENT_RECORD.pack(Maze.OVERLAY_ORDER.index(name), index, len(encoded)))
+			body.append(encoded)
+
+	return HEADER.pack(MAGIC, VERSION, len(cell_records), len(content_records)) + zlib.compress(b"".join(body))
+
+def decode_diff(data):
+	'''
+	Function: decode_diff
+	Description: Decodes a diff encoded by encode_diff.
+	Parameters: data
+		data: Bytes - The encoded diff
+	Return: 2-Tuple - The diff, in the format of ChangeLog.collect
+	'''
+
+	magic, version, cell_count, content_count = HEADER.unpack_from(data)
+	if magic != MAGIC:
+		raise ValueError("Not a maze diff")
+	if version != VERSION:
+		raise ValueError("Unsupported maze diff version " + str(version))
+
+	body = zlib.decompress(data[HEADER.size:])
+	offset = 0
+
+	cell_records = []
+	for i in range(cell_count):
+		kind, x, y, width, height = CELL_RECORD.unpack_from(body, offset)
+		offset += CELL_RECORD.size
+		cell_records.append((kind, x, y, width, height, body[offset:offset + width * height]))
+		offset += width * height
+
+	content_records = []
+	for i in range(content_count):
+		layer, index, length = CONTENT_RECORD.unpack_from(body, offset)
+		offset += CONTENT_RECORD.size
+		content = None
+		if length != REMOVED_LENGTH:
+			content = body[offset:offset + length].decode("utf-8")
+			offset += length
+		content_records.append((Maze.OVERLAY_ORDER[layer], index, content))
+
+	return (cell_records, content_records)
+
+def apply_diff(maze, diff):
+	'''
+	Function: apply_diff
+	Description: Applies a diff to a mirror of the maze it was collected from, which must hold the same cells the original did when the diff's changes began. The mirror's own observers are notified of the changes, as an opening mutation unless a wall was raised.
+	Parameters: maze, diff
+		maze: Maze - The mirror to apply the diff to
+		diff: Bytes or 2-Tuple - The diff, encoded or in the format of ChangeLog.collect
+	Return: None
+	'''
+
+	if isinstance(diff, (bytes, bytearray, memoryview)):
+		diff = decode_diff(bytes(diff))
+	cell_records, content_records = diff
+
+	grid = maze.m_grid
+	cells = grid.m_cells
+	width = grid.m_width
+
+	# Work out whether any wall is raised, so that observers can be told the right kind of mutation.
+	regions = [Region((x, y), (record_width, record_height)) for record_kind, x, y, record_width, record_height, data in cell_records]
+	raised = False
+	for record_kind, x, y, record_width, record_height, data in cell_records:
+		wall_mask = int.from_bytes(bytes([Grid.WALL_MASK]) * record_width, "big")
+		for row in range(record_height):
+			start = (y + row) * width + x
+			old = int.from_bytes(cells[start:start + record_width], "big")
+			new = int.from_bytes(data[row * record_width:(row + 1) * record_width], "big")
+			if record_kind == RECORD_XOR:
+				new ^= old
+			if new & ~old & wall_mask:
+				raised = True
+				break
+		if raised:
+			break
+	kind = Maze.MUTATION_CLOSE if raised else Maze.MUTATION_OPEN
+
+	if regions:
+		maze.prepare(regions, kind)
+
+	for record_kind, x, y, record_width, record_height, data in cell_records:
+		for row in range(record_height):
+			start = (y + row) * width + x
+			span = data[row * record_width:(row + 1) * record_width]
+			if record_kind == RECORD_XOR:
+				span = (int.from_bytes(cells[start:start + record_width], "big") ^ int.from_bytes(span, "big")).to_bytes(record_width, "big")
+			cells[start:start + record_width] = span
+
+	if regions:
+		maze.notify(regions, kind)
+
+	for name, index, content in content_records:
+		if content is None:
+			maze.get_overlay(name).remove(index)
+		else:
+			maze.get_overlay(name).set(index, content)
+
+class ChangeLog(MazeObserver):
+	'''
+	Class: ChangeLog
+	Description: Records every change made to a maze since the last collection, as a diff which a mirror of the maze can apply to catch up. Before each mutation, the cells of the mutated regions are snapshotted (only those not already snapshotted since the last collection, so that overlapping mutations coalesce); when the diff is collected, each snapshot is XORed with the current cells, trimmed to the bytes which actually changed, and merged with the rows above it into rectangular records. Content changes are collected from the overlays themselves, so the cost of each diff follows what changed rather than the size of the maze.
+	'''
+
+	def __init__(self, maze):
+		'''
+		Method: __init__
+		Description: ChangeLog constructor, which registers the change log as an observer of the maze and of its overlays.
+		Parameters: maze
+			maze: Maze - The maze whose changes are recorded
+		Return: None
+		'''
+
+		self.m_maze = maze
+		# The snapshotted spans of each row, as sorted lists of (start x-position, end x-position, old cell bytes), keyed by y-position.
+		self.m_snapshots = {}
+		# The regions whose current cells are sent whole, for changes the maze does not report to its observers.
+		self.m_marked = []
+		# The flat index of every cell whose content changed, keyed by overlay layer name.
+		self.m_content_changes = dict([(name, set()) for name in maze.OVERLAY_ORDER])
+
+		for name, change_set in self.m_content_changes.items():
+			maze.get_overlay(name).m_change_sets.append(change_set)
+		maze.add_observer(self)
+
+	def detach(self):
+		'''
+		Method: detach
+		Description: Stops recording changes, unregistering the change log from the maze and its overlays.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		for name, change_set in self.m_content_changes.items():
+			overlay = self.m_maze.get_overlay(name)
+			overlay.m_change_sets = [other for other in overlay.m_change_sets if other is not change_set]
+		self.m_maze.remove_observer(self)
+
+	def before_mutation(self, maze, regions, kind):
+		'''
+		Method: before_mutation
+		Description: Snapshots the cells of every row span about to be mutated which has not been snapshotted since the last collection.
+		Parameters: maze, regions, kind
+			maze: Maze - The maze about to be mutated
+			regions: [Region] - The regions containing every cell whose walls may change
+			kind: String - Maze.MUTATION_OPEN or Maze.MUTATION_CLOSE
+		Return: None
+		'''
+
+		cells = maze.m_grid.m_cells
+		width = maze.m_grid.m_width
+		for region in regions:
+			(x0, x1), (y0, y1) = region.m_range
+			for y in range(y0, y1 + 1):
+				spans = self.m_snapshots.setdefault(y, [])
+
+				# Snapshot only the gaps between the spans already snapshotted.
+				start = x0
+				gaps = []
+				for span_start, span_end, old in spans:
+					if span_end <= start:
+						continue
+					if span_start > x1:
+						break
+					if span_start > start:
+						gaps.append((start, span_start))
+					start = max(start, span_end)
+				if start <= x1:
+					gaps.append((start, x1 + 1))
+
+				if gaps:
+					spans.extend([(gap_start, gap_end, bytes(cells[y * width + gap_start:y * width + gap_end])) for gap_start, gap_end in gaps])
+					spans.sort()
+
+	def mark(self, region=None):
+		'''
+		Method: mark
+		Description: Sends the current cells of a region whole with the next diff, for changes the maze does not report to its observers (such as visiting cells directly).
+		Parameters: region=None
+			region: Region - The region to send (the whole maze if None)
+		Return: None
+		'''
+
+		region = self.m_maze.m_region.intersect(region if region is not None else self.m_maze.m_region)
+		if region is not None:
+			self.m_marked.append(region)
+
+	def collect(self):
+		'''
+		Method: collect
+		Description: Collects every change made since the last collection, and starts recording afresh.
+		Parameters: No parameters
+		Return: 2-Tuple - The diff
+			[0] = ([6-Tuple]) - The cell records (kind, x-position, y-position, width, height, bytes), each holding the rows of a rectangle
+			[1] = ([3-Tuple]) - The content records (overlay layer name, flat index, content or None if removed)
+		'''
+
+		maze = self.m_maze
+		cells = maze.m_grid.m_cells
+		width = maze.m_grid.m_width
+
+		# XOR each snapshotted span with the current cells, trimmed to the bytes which changed, extending the open rectangle with the same columns in the row above where there is one.
+		records = []
+		open_records = {}
+		for y in sorted(self.m_snapshots):
+			row_records = {}
+			for start, end, old in self.merge_spans(self.m_snapshots[y]):
+				diff = (int.from_bytes(old, "big") ^ int.from_bytes(cells[y * width + start:y * width + end], "big")).to_bytes(end - start, "big")
+				trimmed = diff.strip(b"\0")
+				if not trimmed:
+					continue
+
+				x = start + len(diff) - len(diff.lstrip(b"\0"))
+				record = open_records.get((x, len(trimmed)))
+				if record is not None and record[2] + record[4] == y:
+					record[4] += 1
+					record[5].append(trimmed)
+				else:
+					record = [RECORD_XOR, x, y, len(trimmed), 1, [trimmed]]
+					records.append(record)
+				row_records[(x, len(trimmed))] = record
+			open_records = row_records
+
+		cell_records = [(kind, x, y, record_width, record_height, b"".join(rows)) for kind, x, y, record_width, record_height, rows in records]
+
+		# Send the marked regions whole, after the XOR records (which they may overlap).
+		for region in self.m_marked:
+			(x0, x1), (y0, y1) = region.m_range
+			cell_records.append((RECORD_SET, x0, y0, x1 - x0 + 1, y1 - y0 + 1, b"".join([bytes(cells[y * width + x0:y * width + x1 + 1]) for y in range(y0, y1 + 1)])))
+
+		content_records = []
+		for name in maze.OVERLAY_ORDER:
+			overlay = maze.get_overlay(name)
+			content_records += [(name, index, overlay.get(index)) for index in sorted(self.m_content_changes[name])]
+			self.m_content_changes[name].clear()
+
+		self.m_snapshots = {}
+		self.m_marked = []
+
+		return (cell_records, content_records)
+
+	def flush(self):
+		'''
+		Method: flush
+		Description: Collects every change made since the last collection as an encoded diff, and starts recording afresh.
+		Parameters: No parameters
+		Return: Bytes - The encoded diff
+		'''
+
+		return encode_diff(self.collect())
+
+	def merge_spans(self, spans):
+		'''
+		Method: merge_spans
+		Description: Merges the adjacent snapshotted spans of a row.
+		Parameters: spans
+			spans: [3-Tuple] - The sorted, disjoint snapshotted spans of the row (start x-position, end x-position, old cell bytes)
+		Return: [3-Tuple] - The merged spans
+		'''
+
+		merged = []
+		for start, end, old in spans:
+			if merged and merged[-1][1] == start:
+				merged[-1][1] = end
+				merged[-1][2].append(old)
+			else:
+				merged.append([start, end, [old]])
+
+		return [(start, end, b"".join(olds)) for start, end, olds in merged]
\ No newline at end of file
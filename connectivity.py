@@ -0,0 +1,285 @@
+'''
+Module: connectivity
+Author: David Frye
+Description: Contains the ConnectivityIndex class, which answers reachability queries about a maze as it is mutated.
+'''
+
+import array
+
+from maze import Maze
+from observer import MazeObserver
+
+class ConnectivityIndex(MazeObserver):
+	'''
+	Class: ConnectivityIndex
+	Description: Maintains the connected components of a maze's cells, so that reachability queries take near-constant time. The maze is split into square blocks, and each block's cells are labelled with the component they belong to within the block. A union-find over those labels then joins them through the open walls crossing block borders.
+		Opened walls are joined into the union-find as they happen. Raised walls cannot be undone in a union-find, so they instead mark their blocks for relabelling and the union-find is rebuilt from the block labels at the next query, at a cost proportional to the mutated blocks plus the block borders rather than the whole maze.
+	'''
+
+	DEFAULT_BLOCK_SIZE = 32
+
+	def __init__(self, maze, block_size=DEFAULT_BLOCK_SIZE):
+		'''
+		Method: __init__
+		Description: ConnectivityIndex constructor, which registers the index as an observer of the maze.
+		Parameters: maze, block_size=DEFAULT_BLOCK_SIZE
+			maze: Maze - The maze to index
+			block_size: Int - The side length of the square blocks the maze is split into
+		Return: None
+		'''
+
+		self.m_maze = maze
+		self.m_block_size = block_size
+		grid = maze.m_grid
+		self.m_blocks_x = (grid.m_width + block_size - 1) // block_size
+		self.m_blocks_y = (grid.m_height + block_size - 1) // block_size
+
+		# The flat index of the representative cell of each cell's component within its block.
+		self.m_labels = array.array("i", range(grid.m_area))
+		# The number of components within each block.
+		self.m_block_counts = [0] * (self.m_blocks_x * self.m_blocks_y)
+		# The union-find parent of each cell (block labels are joined by pointing their representatives elsewhere).
+		self.m_parents = array.array("i", range(grid.m_area))
+		# The number of components in the whole maze.
+		self.m_count = grid.m_area
+
+		# The blocks whose labels are out of date, and whether or not the union-find must be rebuilt.
+		self.m_dirty_blocks = set(range(len(self.m_block_counts)))
+		self.m_stale = True
+
+		maze.add_observer(self)
+
+	def detach(self):
+		'''
+		Method: detach
+		Description: Stops indexing the maze, unregistering the index as an observer.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		self.m_maze.remove_observer(self)
+
+	def connected(self, start_cell_position, end_cell_position):
+		'''
+		Method: connected
+		Description: Determines whether or not a path exists between two cells.
+		Parameters: start_cell_position, end_cell_position
+			start_cell_position: 2-Tuple - The position of one cell
+			end_cell_position: 2-Tuple - The position of the other cell
+		Return: Boolean - Whether or not a path exists between the cells (False if either is not within the maze)
+		'''
+
+		if not self.m_maze.is_valid_cell_position(start_cell_position) or not self.m_maze.is_valid_cell_position(end_cell_position):
+			return False
+
+		return self.get_component(start_cell_position) == self.get_component(end_cell_position)
+
+	def get_component(self, position):
+		'''
+		Method: get_component
+		Description: Gets an identifier of the connected component containing a cell, which is shared by every cell reachable from it until the maze is next mutated.
+		Parameters: position
+			position: 2-Tuple - The position of the cell
+		Return: Int - The flat index of the component's representative cell
+		'''
+
+		self.update()
+
+		return self.find(self.m_maze.m_grid.index(position))
+
+	def get_component_count(self):
+		'''
+		Method: get_component_count
+		Description: Gets the number of connected components of the maze (every isolated cell counting as its own component).
+		Parameters: No parameters
+		Return: Int - The number of connected components
+		'''
+
+		self.update()
+
+		return self.m_count
+
+	def is_connected(self):
+		'''
+		Method: is_connected
+		Description: Determines whether or not every cell of the maze is reachable from every other.
+		Parameters: No parameters
+		Return: Boolean - Whether or not the maze is a single connected component
+		'''
+
+		return self.get_component_count() == 1
+
+	def on_mutation(self, maze, regions, kind):
+		'''
+		Method: on_mutation
+		Description: Joins the cells across newly-opened walls, or marks the mutated blocks for relabelling if any walls may have been raised.
+		Parameters: maze, regions, kind
+			maze: Maze - The mutated maze
+			regions: [Region] - The regions containing every cell whose walls may have changed
+			kind: String - Maze.MUTATION_OPEN or Maze.MUTATION_CLOSE
+		Return: None
+		'''
+
+		block_size = self.m_block_size
+		for region in regions:
+			(x0, x1), (y0, y1) = region.m_range
+			for block_y in range(y0 // block_size, y1 // block_size + 1):
+				self.m_dirty_blocks.update(range(block_y * self.m_blocks_x + x0 // block_size, block_y * self.m_blocks_x + x1 // block_size + 1))
+
+		if kind == Maze.MUTATION_CLOSE:
+			self.m_stale = True
+		elif not self.m_stale:
+			for region in regions:
+				self.join_region(region)
+
+	def update(self):
+		'''
+		Method: update
+		Description: Rebuilds the union-find if any walls have been raised since it was last built, relabelling only the mutated blocks.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		if not self.m_stale:
+			return
+
+		for block in self.m_dirty_blocks:
+			self.label_block(block)
+		self.m_dirty_blocks = set()
+
+		# Every cell starts out pointing at its block representative, and the blocks are then joined across their borders.
+		self.m_parents[:] = self.m_labels
+		self.m_count = sum(self.m_block_counts)
+		self.join_borders()
+
+		self.m_stale = False
+
+	def label_block(self, block):
+		'''
+		Method: label_block
+		Description: Labels every cell of a block with the representative of its component within the block, with a breadth-first search confined to the block.
+		Parameters: block
+			block: Int - The index of the block (row-major)
+		Return: None
+		'''
+
+		grid = self.m_maze.m_grid
+		cells = grid.m_cells
+		width = grid.m_width
+		offsets = grid.m_offsets
+		labels = self.m_labels
+		block_y, block_x = divmod(block, self.m_blocks_x)
+		x0 = block_x * self.m_block_size
+		y0 = block_y * self.m_block_size
+		x1 = min(x0 + self.m_block_size, width) - 1
+		y1 = min(y0 + self.m_block_size, grid.m_height) - 1
+
+		for y in range(y0, y1 + 1):
+			labels[y * width + x0:y * width + x1 + 1] = array.array("i", [-1]) * (x1 - x0 + 1)
+
+		count = 0
+		for y in range(y0, y1 + 1):
+			for seed in range(y * width + x0, y * width + x1 + 1):
+				if labels[seed] >= 0:
+					continue
+
+				count += 1
+				labels[seed] = seed
+				queue = [seed]
+				for current in queue:
+					current_y, current_x = divmod(current, width)
+					walls = cells[current]
+					if not walls & 1 and current_y > y0 and labels[current + offsets[0]] < 0:
+						labels[current + offsets[0]] = seed
+						queue.append(current + offsets[0])
+					if not walls & 2 and current_x < x1 and labels[current + 1] < 0:
+						labels[current + 1] = seed
+						queue.append(current + 1)
+					if not walls & 4 and current_y < y1 and labels[current + offsets[2]] < 0:
+						labels[current + offsets[2]] = seed
+						queue.append(current + offsets[2])
+					if not walls & 8 and current_x > x0 and labels[current - 1] < 0:
+						labels[current - 1] = seed
+						queue.append(current - 1)
+
+		self.m_block_counts[block] = count
+
+	def join_borders(self):
+		'''
+		Method: join_borders
+		Description: Joins the components of neighboring blocks through every open wall crossing a block border.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		grid = self.m_maze.m_grid
+		cells = grid.m_cells
+		width = grid.m_width
+		height = grid.m_height
+		block_size = self.m_block_size
+
+		# The eastern walls of each block's last column.
+		for x in range(block_size - 1, width - 1, block_size):
+			for index in range(x, height * width, width):
+				if not cells[index] & 2:
+					self.union(index, index + 1)
+
+		# The southern walls of each block's last row.
+		for y in range(block_size - 1, height - 1, block_size):
+			for index in range(y * width, (y + 1) * width):
+				if not cells[index] & 4:
+					self.union(index, index + width)
+
+	def join_region(self, region):
+		'''
+		Method: join_region
+		Description: Joins the cells across every open wall within a region.
+		Parameters: region
+			region: Region - The region to join the cells of
+		Return: None
+		'''
+
+		grid = self.m_maze.m_grid
+		cells = grid.m_cells
+		width = grid.m_width
+		(x0, x1), (y0, y1) = region.m_range
+
+		for y in range(y0, y1 + 1):
+			for index in range(y * width + x0, y * width + x1 + 1):
+				walls = cells[index]
+				if not walls & 2 and index % width < x1:
+					self.union(index, index + 1)
+				if not walls & 4 and y < y1:
+					self.union(index, index + width)
+
+	def find(self, index):
+		'''
+		Method: find
+		Description: Finds the root of a cell in the union-find, halving the path to it along the way.
+		Parameters: index
+			index: Int - The flat index of the cell
+		Return: Int - The flat index of the root cell
+		'''
+
+		parents = self.m_parents
+		while parents[index] != index:
+			parents[index] = parents[parents[index]]
+			index = parents[index]
+
+		return index
+
+	def union(self, index, other):
+		'''
+		Method: union
+		Description: Joins the components of two cells in the union-find.
+		Parameters: index, other
+			index: Int - The flat index of one cell
+			other: Int - The flat index of the other cell
+		Return: None
+		'''
+
+		root = self.find(index)
+		other_root = self.find(other)
+		if root != other_root:
+			self.m_parents[root] = other_root
+			self.m_count -= 1
\ No newline at end of file
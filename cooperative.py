@@ -0,0 +1,88 @@
+'''
+Module: cooperative
+Author: David Frye
+Description: Contains helpers for running resumable maze generation and solving (Maze.generate_steps and Maze.solve_steps) in time slices, either from a game loop or as asyncio tasks.
+'''
+
+import asyncio
+import time
+
+from maze import Maze
+
+# The number of steps between checks of the clock.
+DEFAULT_STEPS = 1024
+# The time a computation may run before handing control back, in seconds.
+DEFAULT_TIME_SLICE = 0.002
+
+def advance(steps, time_slice=DEFAULT_TIME_SLICE):
+	'''
+	Function: advance
+	Description: Runs a resumable computation for up to a time slice (overrunning it by at most one of the computation's slices of work).
+	Parameters: steps, time_slice=DEFAULT_TIME_SLICE
+		steps: Generator - The computation, which yields between slices of work
+		time_slice: Float - The time to run the computation for, in seconds
+	Return: 2-Tuple - The progress of the computation
+		[0] = (Boolean) - Whether or not the computation has finished
+		[1] = (Object) - The computation's result, if it has finished
+	'''
+
+	deadline = time.perf_counter() + time_slice
+	while True:
+		try:
+			next(steps)
+		except StopIteration as stop:
+			return (True, stop.value)
+
+		if time.perf_counter() >= deadline:
+			return (False, None)
+
+async def run_sliced(steps, time_slice=DEFAULT_TIME_SLICE):
+	'''
+	Function: run_sliced
+	Description: Runs a resumable computation to completion on the event loop, handing control back to the loop after each time slice.
+	Parameters: steps, time_slice=DEFAULT_TIME_SLICE
+		steps: Generator - The computation, which yields between slices of work
+		time_slice: Float - The time to run the computation for between handing control back, in seconds
+	Return: Object - The computation's result
+	'''
+
+	while True:
+		finished, result = advance(steps, time_slice)
+		if finished:
+			return result
+		await asyncio.sleep(0)
+
+async def generate_async(maze, region=None, exemptions=None, open_chance=Maze.DEFAULT_OPEN_CHANCE, generator=None, seed=None, steps=DEFAULT_STEPS, time_slice=DEFAULT_TIME_SLICE):
+	'''
+	Function: generate_async
+	Description: Generates a maze within the provided bounds without blocking the event loop for more than a time slice at a time. Nothing else may mutate the region until generation has finished.
+	Parameters: maze, region=None, exemptions=None, open_chance=Maze.DEFAULT_OPEN_CHANCE, generator=None, seed=None, steps=DEFAULT_STEPS, time_slice=DEFAULT_TIME_SLICE
+		maze: Maze - The maze to generate within
+		region: Region - A region for maze generation to span
+		exemptions: Regions - A collection of regions for maze generation to avoid
+		open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+		generator: Generator - The maze generation algorithm to use (a RecursiveBacktracker if None)
+		seed: Int - The seed from which the random stream of the region is derived (the maze's seed if None)
+		steps: Int - The number of generation steps between checks of the clock
+		time_slice: Float - The time to generate for between handing control back, in seconds
+	Return: None
+	'''
+
+	await run_sliced(maze.generate_steps(region, exemptions, open_chance, generator, seed, steps), time_slice)
+
+async def solve_async(maze, start_cell_position, end_cell_position, breadcrumbs=False, solver=None, steps=DEFAULT_STEPS, time_slice=DEFAULT_TIME_SLICE):
+	'''
+	Function: solve_async
+	Description: Finds a path between the given start and end cells without blocking the event loop for more than a time slice at a time. The maze must not be mutated until the search has finished.
+	Parameters: maze, start_cell_position, end_cell_position, breadcrumbs=False, solver=None, steps=DEFAULT_STEPS, time_slice=DEFAULT_TIME_SLICE
+		maze: Maze - The maze to solve
+		start_cell_position: 2-Tuple - The cell position to begin searching from
+		end_cell_position: 2-Tuple - The cell position to target in the search
+		breadcrumbs: Boolean - Whether or not to change the content of cells along the solution path for pretty-printing
+		solver: Solver - The maze solving algorithm to use (a BreadthFirstSolver if None)
+		steps: Int - The number of search steps between checks of the clock
+		time_slice: Float - The time to search for between handing control back, in seconds
+	Return: [2-Tuple] - A list of cell positions denoting the solution path, or None if no solution is found
+	'''
+
+	return await run_sliced(maze.solve_steps(start_cell_position, end_cell_position, breadcrumbs, solver, steps), time_slice)
\ No newline at end of file
@@ -0,0 +1,419 @@
+'''
+Module: engine
+Author: David Frye
+Description: Contains the MutationEngine class, which runs regional maze mutations as jobs within a per-tick time budget, along with the jobs themselves.
+'''
+
+import collections
+import time
+
+from maze import Maze
+from region import Region
+from utility import Direction
+
+class Job:
+	'''
+	Class: Job
+	Description: Represents a regional mutation which can be carried out a band of rows at a time, so that a mutation of any size can be spread across ticks. Each band is a complete mutation of its rows, so the maze is consistent between bands.
+	'''
+
+	def __init__(self, region, exemptions=None, on_complete=None):
+		'''
+		Method: __init__
+		Description: Job constructor.
+		Parameters: region, exemptions=None, on_complete=None
+			region: Region - The region to mutate
+			exemptions: Regions - A collection of regions for the mutation to avoid
+			on_complete: Function(Job) - Called once the last band has been mutated
+		Return: None
+		'''
+
+		self.m_region = region
+		self.m_exemptions = exemptions
+		self.m_on_complete = on_complete
+		# The next row to mutate (None until the region has been clipped to the maze by the first step).
+		self.m_next_row = None
+		# The range of rows of the region within the maze, and the number of its columns within the maze.
+		self.m_rows = None
+		self.m_columns = 0
+		self.m_done = False
+
+	def is_done(self):
+		'''
+		Method: is_done
+		Description: Determines whether or not every band has been mutated.
+		Parameters: No parameters
+		Return: Boolean - Whether or not the job is done
+		'''
+
+		return self.m_done
+
+	def cost_kind(self):
+		'''
+		Method: cost_kind
+		Description: Gets the kind of work the next step does, so that the engine can estimate its time per cell.
+		Parameters: No parameters
+		Return: Class - The job class whose time per cell estimates the next step
+		'''
+
+		return type(self)
+
+	def step(self, maze, cells):
+		'''
+		Method: step
+		Description: Mutates the next band of rows, of at most the given number of cells (but always at least a row).
+		Parameters: maze, cells
+			maze: Maze - The maze to mutate
+			cells: Int - The number of cells the band should not exceed
+		Return: Int - The number of cells in the band
+		'''
+
+		# Clip the rows of the region to the maze on the first step.
+		if self.m_next_row is None:
+			clipped = maze.m_region.intersect(self.m_region)
+			if clipped is None:
+				self.finish()
+				return 0
+			self.m_rows = clipped.m_range[1]
+			self.m_columns = clipped.m_range[0][1] - clipped.m_range[0][0] + 1
+			self.m_next_row = self.m_rows[0]
+
+		# The first and last bands reach the region's own top and bottom (even outside of the maze), so that each band's border only differs from the region's along the seams between bands.
+		(x0, x1), (y0, y1) = self.m_region.m_range
+		rows = min(max(1, cells // self.m_columns), self.m_rows[1] + 1 - self.m_next_row)
+		top = y0 if self.m_next_row == self.m_rows[0] else self.m_next_row
+		bottom = y1 if self.m_next_row + rows > self.m_rows[1] else self.m_next_row + rows - 1
+		self.mutate(maze, Region((x0, top), (x1 - x0 + 1, bottom - top + 1)), self.m_next_row > self.m_rows[0])
+
+		self.m_next_row += rows
+		if self.m_next_row > self.m_rows[1]:
+			self.finish()
+
+		return rows * self.m_columns
+
+	def mutate(self, maze, band, continued):
+		'''
+		Method: mutate
+		Description: Mutates a single band of rows. Implemented by each kind of job.
+		Parameters: maze, band, continued
+			maze: Maze - The maze to mutate
+			band: Region - The band of rows to mutate
+			continued: Boolean - Whether or not the band continues a band directly above it
+		Return: None
+		'''
+
+		raise NotImplementedError
+
+	def finish(self):
+		'''
+		Method: finish
+		Description: Marks the job as done, calling its completion callback.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		self.m_done = True
+		if self.m_on_complete is not None:
+			self.m_on_complete(self)
+
+	def seam_columns(self, maze, y):
+		'''
+		Method: seam_columns
+		Description: Gets the columns along the seam between a band and the band above it where either cell may be mutated (a valid cell's wall to an exempt neighbor is mutated too).
+		Parameters: maze, y
+			maze: Maze - The maze being mutated
+			y: Int - The first row of the lower band
+		Return: [Int] - The x-positions of the valid columns
+		'''
+
+		x0, x1 = self.m_region.m_range[0]
+		rows = []
+		for row in (y - 1, y):
+			rows.append(set([x for valid_region in maze.valid_regions(Region((x0, row), (x1 - x0 + 1, 1)), self.m_exemptions) for x in valid_region.get_range_x()]))
+
+		return sorted(rows[0] | rows[1])
+
+class RegenerateJob(Job):
+	'''
+	Class: RegenerateJob
+	Description: Resets a region a band of rows at a time, then generates it anew as a whole, a slice of generation steps at a time. Generation is never split into bands, since bands generated on their own would be split further by exemptions and left joined by single seam passages. The result is the same as resetting and generating the region directly, and nothing else may mutate the region until the job is done.
+	'''
+
+	# The number of generation steps (cells carved or backtracked from) in each slice of work.
+	GENERATION_STEPS = 256
+
+	def __init__(self, region, exemptions=None, open_chance=Maze.DEFAULT_OPEN_CHANCE, generator=None, reset=True, on_complete=None):
+		'''
+		Method: __init__
+		Description: RegenerateJob constructor.
+		Parameters: region, exemptions=None, open_chance=Maze.DEFAULT_OPEN_CHANCE, generator=None, reset=True, on_complete=None
+			region: Region - The region to regenerate
+			exemptions: Regions - A collection of regions for the mutation to avoid
+			open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+			generator: Generator - The maze generation algorithm to use (a RecursiveBacktracker if None)
+			reset: Boolean - Whether or not to reset the region before generating it (only unvisited cells are carved otherwise)
+			on_complete: Function(Job) - Called once the region has been regenerated
+		Return: None
+		'''
+
+		super().__init__(region, exemptions, on_complete)
+		self.m_open_chance = open_chance
+		self.m_generator = generator
+		# The job resetting the region, band by band, before it is generated (None if the region is not reset).
+		self.m_reset_job = RewallJob(region, exemptions) if reset else None
+		# The resumable generation of the region (None until the region has been reset).
+		self.m_generation = None
+
+	def step(self, maze, cells):
+		'''
+		Method: step
+		Description: Resets the next band of rows or, once the region has been reset, runs the next slices of its generation, of at most the given number of steps in total (but always at least one slice).
+		Parameters: maze, cells
+			maze: Maze - The maze to mutate
+			cells: Int - The number of cells (or generation steps) the work should not exceed
+		Return: Int - The number of cells reset (or generation steps run)
+		'''
+
+		if self.m_reset_job is not None and not self.m_reset_job.is_done():
+			return self.m_reset_job.step(maze, cells)
+
+		if self.m_generation is None:
+			self.m_generation = maze.generate_steps(self.m_region, self.m_exemptions, self.m_open_chance, self.m_generator, None, self.GENERATION_STEPS)
+
+		slices = max(1, cells // self.GENERATION_STEPS)
+		for count in range(slices):
+			if next(self.m_generation, StopIteration) is StopIteration:
+				self.finish()
+				return count * self.GENERATION_STEPS
+
+		return slices * self.GENERATION_STEPS
+
+	def cost_kind(self):
+		'''
+		Method: cost_kind
+		Description: Gets the kind of work the next step does, which is resetting while the region is being reset.
+		Parameters: No parameters
+		Return: Class - The job class whose time per cell estimates the next step
+		'''
+
+		if self.m_reset_job is not None and not self.m_reset_job.is_done():
+			return RewallJob
+		return RegenerateJob
+
+class OpenJob(Job):
+	'''
+	Class: OpenJob
+	Description: Opens a region, a band of rows at a time.
+	'''
+
+	def __init__(self, region, exemptions=None, open_border=True, on_complete=None):
+		'''
+		Method: __init__
+		Description: OpenJob constructor.
+		Parameters: region, exemptions=None, open_border=True, on_complete=None
+			region: Region - The region to open
+			exemptions: Regions - A collection of regions for the mutation to avoid
+			open_border: Boolean - Whether or not to open the border of the region
+			on_complete: Function(Job) - Called once the last band has been opened
+		Return: None
+		'''
+
+		super().__init__(region, exemptions, on_complete)
+		self.m_open_border = open_border
+
+	def mutate(self, maze, band, continued):
+		'''
+		Method: mutate
+		Description: Opens a single band of rows. If the region's border is kept, each band keeps its own border too, so the seam with the band above is opened separately.
+		Parameters: maze, band, continued
+			maze: Maze - The maze to mutate
+			band: Region - The band of rows to mutate
+			continued: Boolean - Whether or not the band continues a band directly above it
+		Return: None
+		'''
+
+		maze.open(band, self.m_exemptions, self.m_open_border)
+
+		if continued and not self.m_open_border:
+			y = band.m_range[1][0]
+			columns = self.seam_columns(maze, y)
+			if columns:
+				seams = [Region((x, y - 1), (1, 2)) for x in columns]
+				maze.prepare(seams, maze.MUTATION_OPEN)
+				grid = maze.m_grid
+				for x in columns:
+					grid.set_wall(grid.index((x, y)), Direction.NORTH, False)
+				maze.notify(seams, maze.MUTATION_OPEN)
+
+class RewallJob(Job):
+	'''
+	Class: RewallJob
+	Description: Resets a region (raising every wall and unvisiting every cell), a band of rows at a time.
+	'''
+
+	def mutate(self, maze, band, continued):
+		'''
+		Method: mutate
+		Description: Resets a single band of rows.
+		Parameters: maze, band, continued
+			maze: Maze - The maze to mutate
+			band: Region - The band of rows to mutate
+			continued: Boolean - Whether or not the band continues a band directly above it
+		Return: None
+		'''
+
+		maze.reset(band, self.m_exemptions)
+
+class MutationEngine:
+	'''
+	Class: MutationEngine
+	Description: Runs scheduled jobs in order, as much of them as fits in each tick's time budget. The engine keeps a running estimate of the time each kind of job takes per cell, and sizes each band to the time left in the tick, so that large regions are spread across as many ticks as they need and tick latency stays close to the budget. The latency of recent ticks is kept for reporting.
+	'''
+
+	DEFAULT_BUDGET = 0.004
+	# The estimated time per cell of a kind of job, before it has been measured.
+	DEFAULT_CELL_COST = 0.00001
+	# The weight of each new measurement in the running estimates.
+	COST_SMOOTHING = 0.25
+	DEFAULT_HISTORY = 1000
+
+	def __init__(self, maze, budget=DEFAULT_BUDGET, history=DEFAULT_HISTORY):
+		'''
+		Method: __init__
+		Description: MutationEngine constructor.
+		Parameters: maze, budget=DEFAULT_BUDGET, history=DEFAULT_HISTORY
+			maze: Maze - The maze to mutate
+			budget: Float - The time each tick may spend on jobs, in seconds
+			history: Int - The number of recent ticks whose latency is kept
+		Return: None
+		'''
+
+		self.m_maze = maze
+		self.m_budget = budget
+		# The scheduled jobs, in order.
+		self.m_jobs = collections.deque()
+		# The estimated time per cell of each kind of work, keyed by job class (see Job.cost_kind).
+		self.m_cell_costs = {}
+		# The latency of each recent tick, in seconds.
+		self.m_latencies = collections.deque(maxlen=history)
+		self.m_tick_count = 0
+
+	def schedule(self, job):
+		'''
+		Method: schedule
+		Description: Schedules a job to run after every job already scheduled.
+		Parameters: job
+			job: Job - The job to schedule
+		Return: Job - The scheduled job
+		'''
+
+		self.m_jobs.append(job)
+		return job
+
+	def cancel(self, job):
+		'''
+		Method: cancel
+		Description: Unschedules a job, leaving any bands it has already mutated as they are.
+		Parameters: job
+			job: Job - The job to unschedule
+		Return: None
+		'''
+
+		if job in self.m_jobs:
+			self.m_jobs.remove(job)
+
+	def is_idle(self):
+		'''
+		Method: is_idle
+		Description: Determines whether or not no jobs are scheduled.
+		Parameters: No parameters
+		Return: Boolean - Whether or not no jobs are scheduled
+		'''
+
+		return not self.m_jobs
+
+	def tick(self):
+		'''
+		Method: tick
+		Description: Runs jobs until the tick's time budget is spent or no jobs remain. At least one band is always mutated when a job is scheduled, so that every job makes progress.
+		Parameters: No parameters
+		Return: Float - The latency of the tick, in seconds
+		'''
+
+		start = time.perf_counter()
+		deadline = start + self.m_budget
+		stepped = False
+
+		while self.m_jobs:
+			now = time.perf_counter()
+			if stepped and now >= deadline:
+				break
+
+			# Size the band to the time left in the tick.
+			job = self.m_jobs[0]
+			kind = job.cost_kind()
+			cost = self.m_cell_costs.get(kind, self.DEFAULT_CELL_COST)
+			cells = job.step(self.m_maze, int((deadline - now) / cost))
+			stepped = True
+
+			# Refine the estimated time per cell of this kind of job.
+			if cells > 0:
+				measured = (time.perf_counter() - now) / cells
+				self.m_cell_costs[kind] = cost + self.COST_SMOOTHING * (measured - cost)
+
+			if job.is_done():
+				self.m_jobs.popleft()
+
+		latency = time.perf_counter() - start
+		self.m_latencies.append(latency)
+		self.m_tick_count += 1
+
+		return latency
+
+	def run(self, frame_time, ticks=None, on_tick=None):
+		'''
+		Method: run
+		Description: Ticks at a fixed frame rate, sleeping out the remainder of each frame.
+		Parameters: frame_time, ticks=None, on_tick=None
+			frame_time: Float - The time between the starts of consecutive ticks, in seconds
+			ticks: Int - The number of ticks to run (forever if None)
+			on_tick: Function(MutationEngine, Float) - Called after each tick with the engine and the tick's latency (such as to schedule more jobs, or to render the frame)
+		Return: None
+		'''
+
+		count = 0
+		next_frame = time.perf_counter()
+		while ticks is None or count < ticks:
+			latency = self.tick()
+			if on_tick is not None:
+				on_tick(self, latency)
+			count += 1
+
+			next_frame += frame_time
+			remaining = next_frame - time.perf_counter()
+			if remaining > 0:
+				time.sleep(remaining)
+			else:
+				next_frame = time.perf_counter()
+
+	def get_latency_stats(self):
+		'''
+		Method: get_latency_stats
+		Description: Summarizes the latency of recent ticks.
+		Parameters: No parameters
+		Return: Dict - The number of recent ticks ("ticks") and their mean ("mean"), median ("p50"), 95th percentile ("p95"), 99th percentile ("p99") and maximum ("max") latencies, in seconds (None if no ticks have run)
+		'''
+
+		if not self.m_latencies:
+			return None
+
+		latencies = sorted(self.m_latencies)
+		count = len(latencies)
+
+		return {
+			"ticks": count,
+			"mean": sum(latencies) / count,
+			"p50": latencies[(count - 1) // 2],
+			"p95": latencies[min(count - 1, int(0.95 * count))],
+			"p99": latencies[min(count - 1, int(0.99 * count))],
+			"max": latencies[-1]}
\ No newline at end of file
@@ -0,0 +1,381 @@
+'''
+Module: flowfield
+Author: David Frye
+Description: Contains the FlowField class, a cached breadth-first distance map towards a single goal cell, along with the FlowFieldCache of the fields of many goals.
+'''
+
+import array
+import collections
+import heapq
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+from grid import Grid
+from maze import Maze
+from observer import MazeObserver
+from solver import Solver
+from utility import Direction
+
+class FlowField(MazeObserver):
+	'''
+	Class: FlowField
+	Description: Represents the distance from every cell of a maze to a single goal cell, from which any number of agents heading to the goal can each look up their next step in constant time. The field is computed once (with a NumPy frontier expansion when NumPy is available), then repaired locally as the maze is mutated: raised walls only invalidate the cells whose every shortest route ran through them, and opened walls only relax the distances they shorten.
+	'''
+
+	# The share of the maze which may be mutated between lookups before the field is recomputed rather than repaired.
+	REPAIR_LIMIT = 0.25
+
+	def __init__(self, maze, goal_index):
+		'''
+		Method: __init__
+		Description: FlowField constructor, which computes the field and registers it as an observer of the maze.
+		Parameters: maze, goal_index
+			maze: Maze - The maze the field spans
+			goal_index: Int - The flat index of the goal cell
+		Return: None
+		'''
+
+		self.m_maze = maze
+		self.m_goal_index = goal_index
+		# The distance of each cell from the goal (-1 for unreachable cells), indexed by flat index.
+		self.m_distances = None
+		# The regions mutated since the field was last brought up to date, and whether or not any of them raised walls.
+		self.m_pending = []
+		self.m_pending_area = 0
+		self.m_closed = False
+
+		self.compute()
+		maze.add_observer(self)
+
+	def detach(self):
+		'''
+		Method: detach
+		Description: Stops keeping the field up to date, unregistering it as an observer.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		self.m_maze.remove_observer(self)
+
+	def get_distance(self, position):
+		'''
+		Method: get_distance
+		Description: Gets the length of a shortest path from a cell to the goal.
+		Parameters: position
+			position: 2-Tuple - The position of the cell
+		Return: Int - The number of steps to the goal, or None if the goal is unreachable
+		'''
+
+		self.update()
+
+		distance = self.m_distances[self.m_maze.m_grid.index(position)]
+		return distance if distance >= 0 else None
+
+	def get_next_step(self, position):
+		'''
+		Method: get_next_step
+		Description: Gets the neighboring cell one step closer to the goal.
+		Parameters: position
+			position: 2-Tuple - The position of the cell
+		Return: 2-Tuple - The position of the next cell towards the goal, or None if the cell is the goal or the goal is unreachable
+		'''
+
+		self.update()
+
+		grid = self.m_maze.m_grid
+		index = grid.index(position)
+		next_index = self.next_index(index)
+		return grid.position(next_index) if next_index >= 0 else None
+
+	def get_path(self, position):
+		'''
+		Method: get_path
+		Description: Follows the field from a cell all the way to the goal.
+		Parameters: position
+			position: 2-Tuple - The position of the cell
+		Return: [2-Tuple] - A list of cell positions denoting a shortest path to the goal, or None if the goal is unreachable
+		'''
+
+		self.update()
+
+		grid = self.m_maze.m_grid
+		index = grid.index(position)
+		if self.m_distances[index] < 0:
+			return None
+
+		path = [index]
+		while index != self.m_goal_index:
+			index = self.next_index(index)
+			path.append(index)
+
+		return [grid.position(index) for index in path]
+
+	def next_index(self, index):
+		'''
+		Method: next_index
+		Description: Finds the neighboring cell one step closer to the goal, whose wall towards the given cell is open.
+		Parameters: index
+			index: Int - The flat index of the cell
+		Return: Int - The flat index of the next cell towards the goal, or -1 if there is none
+		'''
+
+		distances = self.m_distances
+		distance = distances[index]
+		if distance <= 0:
+			return -1
+
+		grid = self.m_maze.m_grid
+		cells = grid.m_cells
+		for direction in Direction:
+			neighbor = grid.neighbor(index, direction)
+			if neighbor >= 0 and distances[neighbor] == distance - 1 and not cells[neighbor] & Grid.WALL_BITS[(direction.value + 2) % 4]:
+				return neighbor
+
+		return -1
+
+	def on_mutation(self, maze, regions, kind):
+		'''
+		Method: on_mutation
+		Description: Records a mutation of the maze, to be applied at the next lookup.
+		Parameters: maze, regions, kind
+			maze: Maze - The mutated maze
+			regions: [Region] - The regions containing every cell whose walls may have changed
+			kind: String - Maze.MUTATION_OPEN or Maze.MUTATION_CLOSE
+		Return: None
+		'''
+
+		self.m_pending += regions
+		self.m_pending_area += sum(region.get_area() for region in regions)
+		self.m_closed = self.m_closed or kind == Maze.MUTATION_CLOSE
+
+	def update(self):
+		'''
+		Method: update
+		Description: Applies every pending mutation, repairing the field locally or recomputing it if too much of the maze was mutated.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		if not self.m_pending:
+			return
+
+		if self.m_pending_area > self.REPAIR_LIMIT * self.m_maze.m_grid.m_area:
+			self.compute()
+		else:
+			self.repair()
+
+		self.m_pending = []
+		self.m_pending_area = 0
+		self.m_closed = False
+
+	def compute(self):
+		'''
+		Method: compute
+		Description: Computes the whole field with a breadth-first search from the goal.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		if numpy is not None:
+			self.compute_vectorized()
+			return
+
+		grid = self.m_maze.m_grid
+		cells = grid.m_cells
+		width = grid.m_width
+		area = grid.m_area
+		offsets = grid.m_offsets
+		open_directions = Solver.OPEN_DIRECTIONS
+
+		distances = array.array("i", [-1]) * area
+		distances[self.m_goal_index] = 0
+		queue = [self.m_goal_index]
+		for current in queue:
+			distance = distances[current] + 1
+			for direction in open_directions[cells[current] & 15]:
+				neighbor = current + offsets[direction]
+				if direction & 1:
+					if neighbor // width != current // width:
+						continue
+				elif not 0 <= neighbor < area:
+					continue
+				if distances[neighbor] < 0:
+					distances[neighbor] = distance
+					queue.append(neighbor)
+
+		self.m_distances = distances
+
+	def compute_vectorized(self):
+		'''
+		Method: compute_vectorized
+		Description: Computes the whole field with a breadth-first search from the goal, expanding each level's whole frontier at once with NumPy.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		grid = self.m_maze.m_grid
+		width = grid.m_width
+		area = grid.m_area
+		cells = numpy.frombuffer(bytes(grid.m_cells), dtype=numpy.uint8)
+
+		distances = numpy.full(area, -1, dtype=numpy.int32)
+		distances[self.m_goal_index] = 0
+		frontier = numpy.array([self.m_goal_index], dtype=numpy.int64)
+		distance = 0
+		while frontier.size:
+			distance += 1
+			walls = cells[frontier]
+			columns = frontier % width
+
+			# Step through every open wall of the frontier, staying inside the maze.
+			north = frontier[(walls & Grid.WALL_BITS[0] == 0) & (frontier >= width)] - width
+			east = frontier[(walls & Grid.WALL_BITS[1] == 0) & (columns < width - 1)] + 1
+			south = frontier[(walls & Grid.WALL_BITS[2] == 0) & (frontier < area - width)] + width
+			west = frontier[(walls & Grid.WALL_BITS[3] == 0) & (columns > 0)] - 1
+
+			neighbors = numpy.concatenate((north, east, south, west))
+			frontier = numpy.unique(neighbors[distances[neighbors] < 0])
+			distances[frontier] = distance
+
+		self.m_distances = array.array("i", distances.tobytes())
+
+	def repair(self):
+		'''
+		Method: repair
+		Description: Repairs the field after the pending mutations, touching only the cells whose distances change. If walls were raised, the cells left without a neighbor one step closer to the goal are invalidated in increasing order of distance (invalidating the cells which relied on them in turn). Every mutated and invalidated cell is then relaxed from its valid neighbors, in increasing order of distance.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		grid = self.m_maze.m_grid
+		cells = grid.m_cells
+		width = grid.m_width
+		offsets = grid.m_offsets
+		distances = self.m_distances
+		open_directions = Solver.OPEN_DIRECTIONS
+		opposite_bits = (Grid.WALL_BITS[2], Grid.WALL_BITS[3], Grid.WALL_BITS[0], Grid.WALL_BITS[1])
+
+		mutated = []
+		for region in self.m_pending:
+			(x0, x1), (y0, y1) = region.m_range
+			for y in range(y0, y1 + 1):
+				mutated.extend(range(y * width + x0, y * width + x1 + 1))
+
+		invalid = set()
+		if self.m_closed:
+			heap = [(distances[index], index) for index in mutated if distances[index] > 0]
+			heapq.heapify(heap)
+			while heap:
+				distance, current = heapq.heappop(heap)
+				if current in invalid:
+					continue
+
+				# A cell stays valid while a valid neighbor one step closer to the goal still opens onto it.
+				neighbors = [(direction.value, grid.neighbor(current, direction)) for direction in Direction]
+				if any(neighbor >= 0 and distances[neighbor] == distance - 1 and neighbor not in invalid and not cells[neighbor] & opposite_bits[direction] for direction, neighbor in neighbors):
+					continue
+
+				invalid.add(current)
+				for direction, neighbor in neighbors:
+					if neighbor >= 0 and distances[neighbor] == distance + 1 and not cells[current] & Grid.WALL_BITS[direction]:
+						heapq.heappush(heap, (distance + 1, neighbor))
+
+			for index in invalid:
+				distances[index] = -1
+
+		# Relax outwards from every mutated cell and from the valid neighbors of every invalidated cell.
+		seeds = set([index for index in mutated if distances[index] >= 0])
+		for index in invalid:
+			seeds.update([neighbor for neighbor in [grid.neighbor(index, direction) for direction in Direction] if neighbor >= 0 and distances[neighbor] >= 0])
+		heap = [(distances[index], index) for index in seeds]
+		heapq.heapify(heap)
+		while heap:
+			distance, current = heapq.heappop(heap)
+			if distance != distances[current]:
+				continue
+
+			for direction in open_directions[cells[current] & 15]:
+				neighbor = current + offsets[direction]
+				if direction & 1:
+					if neighbor // width != current // width:
+						continue
+				elif not 0 <= neighbor < grid.m_area:
+					continue
+				if distances[neighbor] < 0 or distances[neighbor] > distance + 1:
+					distances[neighbor] = distance + 1
+					heapq.heappush(heap, (distance + 1, neighbor))
+
+class FlowFieldCache:
+	'''
+	Class: FlowFieldCache
+	Description: Caches the flow fields of the most recently used goals of a maze, so that every agent heading to the same goal shares a single field.
+	'''
+
+	DEFAULT_MAX_FIELDS = 16
+
+	def __init__(self, maze, max_fields=DEFAULT_MAX_FIELDS):
+		'''
+		Method: __init__
+		Description: FlowFieldCache constructor.
+		Parameters: maze, max_fields=DEFAULT_MAX_FIELDS
+			maze: Maze - The maze the fields span
+			max_fields: Int - The number of fields kept before the least recently used one is evicted
+		Return: None
+		'''
+
+		self.m_maze = maze
+		self.m_max_fields = max_fields
+		# The cached fields, keyed by the flat index of their goal, from least to most recently used.
+		self.m_fields = collections.OrderedDict()
+
+	def get_field(self, goal_position):
+		'''
+		Method: get_field
+		Description: Gets the flow field towards a goal, computing it if it is not cached. Evicted fields are no longer kept up to date.
+		Parameters: goal_position
+			goal_position: 2-Tuple - The position of the goal cell
+		Return: FlowField - The flow field towards the goal
+		'''
+
+		if not self.m_maze.is_valid_cell_position(goal_position):
+			raise ValueError("Goal " + str(goal_position) + " is not within the maze")
+
+		goal_index = self.m_maze.m_grid.index(goal_position)
+		field = self.m_fields.get(goal_index)
+		if field is not None:
+			self.m_fields.move_to_end(goal_index)
+			return field
+
+		field = FlowField(self.m_maze, goal_index)
+		self.m_fields[goal_index] = field
+		while len(self.m_fields) > self.m_max_fields:
+			self.m_fields.popitem(last=False)[1].detach()
+
+		return field
+
+	def get_next_step(self, position, goal_position):
+		'''
+		Method: get_next_step
+		Description: Gets the neighboring cell one step closer to a goal.
+		Parameters: position, goal_position
+			position: 2-Tuple - The position of the cell
+			goal_position: 2-Tuple - The position of the goal cell
+		Return: 2-Tuple - The position of the next cell towards the goal, or None if the cell is the goal or the goal is unreachable
+		'''
+
+		return self.get_field(goal_position).get_next_step(position)
+
+	def clear(self):
+		'''
+		Method: clear
+		Description: Evicts every cached field.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		for field in self.m_fields.values():
+			field.detach()
+		self.m_fields.clear()
\ No newline at end of file
@@ -0,0 +1,980 @@
+'''
+Module: generator
+Author: David Frye
+Description: Contains the maze generation algorithms, each a Generator strategy operating on a GenerationArea.
+'''
+
+import array
+import copy
+import itertools
+import random
+
+from grid import Grid
+from region import Region
+from utility import Direction
+from utility import exhaust
+
+class GenerationArea:
+	'''
+	Class: GenerationArea
+	Description: Represents the cells of a maze which a generation algorithm may carve (valid and unvisited), as a bitmap spanning the bounding box of the valid regions plus a one-cell border of invalid cells so that neighbors never need bounds checks.
+	'''
+
+	# The bitmap value of a cell which may not be carved.
+	BLOCKED = 0
+	# The bitmap value of a cell which may be carved, but has not been yet.
+	CARVABLE = 1
+
+	def __init__(self, maze, region, exemptions, bounded=False):
+		'''
+		Method: __init__
+		Description: GenerationArea constructor.
+		Parameters: maze, region, exemptions, bounded=False
+			maze: Maze - The maze to be carved
+			region: Region - A region for maze generation to span
+			exemptions: Regions - A collection of regions for maze generation to avoid
+			bounded: Boolean - Whether or not plowing is confined to the valid cells (so that no cell outside of them is ever written, as when other processes generate the neighboring regions concurrently)
+		Return: None
+		'''
+
+		self.m_maze = maze
+		self.m_grid = maze.m_grid
+		self.m_cells = maze.m_grid.m_cells
+		self.m_width = maze.get_width()
+		self.m_height = maze.get_height()
+		# The disjoint regions covering the valid cells.
+		self.m_regions = maze.valid_regions(region, exemptions)
+		self.m_area = sum(valid_region.get_area() for valid_region in self.m_regions)
+
+		self.m_exemptions = exemptions if exemptions is not None else []
+
+		# Whether or not each bitmap cell is valid, if plowing is bounded (None otherwise).
+		self.m_inside = None
+
+		if not self.m_regions:
+			self.m_bitmap = bytearray()
+			self.m_pieces = []
+			return
+
+		# The maze position of bitmap index 0, and the dimensions of the bitmap.
+		self.m_origin_x = min(valid_region.m_range[0][0] for valid_region in self.m_regions) - 1
+		self.m_origin_y = min(valid_region.m_range[1][0] for valid_region in self.m_regions) - 1
+		self.m_bitmap_width = max(valid_region.m_range[0][1] for valid_region in self.m_regions) - self.m_origin_x + 2
+		self.m_bitmap_height = max(valid_region.m_range[1][1] for valid_region in self.m_regions) - self.m_origin_y + 2
+
+		# The bitmap itself, built a row slice at a time.
+		self.m_bitmap = bytearray(self.m_bitmap_width * self.m_bitmap_height)
+		for valid_region in self.m_regions:
+			(x0, x1), (y0, y1) = valid_region.m_range
+			for y in range(y0, y1 + 1):
+				bitmap_start = self.to_bitmap((x0, y))
+				self.m_bitmap[bitmap_start:bitmap_start + x1 - x0 + 1] = bytes(self.m_cells[y * self.m_width + x0:y * self.m_width + x1 + 1]).translate(Grid.UNVISITED_TABLE)
+
+		if bounded:
+			self.m_inside = bytearray(len(self.m_bitmap))
+			for valid_region in self.m_regions:
+				(x0, x1), (y0, y1) = valid_region.m_range
+				for y in range(y0, y1 + 1):
+					bitmap_start = self.to_bitmap((x0, y))
+					self.m_inside[bitmap_start:bitmap_start + x1 - x0 + 1] = bytes([1]) * (x1 - x0 + 1)
+
+		# Which cells were carvable before carving began, for telling carved cells apart from those already visited.
+		self.m_carvable_mask = bytes(self.m_bitmap)
+		# The disjoint regions covering exactly the carvable cells (the valid regions themselves, unless some valid cells were already visited).
+		self.m_pieces = self.m_regions if self.m_bitmap.count(self.CARVABLE) == self.m_area else self.carvable_pieces()
+
+		# The bitmap index offset and the flat cell index offset to the neighboring cell, indexed by direction value.
+		self.m_bitmap_offsets = (-self.m_bitmap_width, 1, self.m_bitmap_width, -1)
+		self.m_cell_offsets = self.m_grid.m_offsets
+
+	def is_empty(self):
+		'''
+		Method: is_empty
+		Description: Determines whether or not there are no valid cells at all.
+		Parameters: No parameters
+		Return: Boolean - Whether or not there are no valid cells at all
+		'''
+
+		return not self.m_regions
+
+	def carvable_pieces(self):
+		'''
+		Method: carvable_pieces
+		Description: Splits the valid regions around their already-visited cells into rectangles of carvable cells, by merging each row's runs of carvable cells with identical runs in the row above.
+		Parameters: No parameters
+		Return: [Region] - The disjoint regions covering exactly the carvable cells
+		'''
+
+		bitmap = self.m_bitmap
+		pieces = []
+		for valid_region in self.m_regions:
+			(x0, x1), (y0, y1) = valid_region.m_range
+			open_pieces = {}
+			for y in range(y0, y1 + 1):
+				start = self.to_bitmap((x0, y))
+				row = bitmap[start:start + x1 - x0 + 1]
+				row_pieces = {}
+				run_start = row.find(self.CARVABLE)
+				while run_start >= 0:
+					run_end = row.find(self.BLOCKED, run_start)
+					if run_end < 0:
+						run_end = len(row)
+
+					# Extend the piece with the same columns in the row above, if there is one.
+					piece = open_pieces.get((run_start, run_end))
+					if piece is not None:
+						piece[3] = y
+					else:
+						piece = [x0 + run_start, y, x0 + run_end - 1, y]
+						pieces.append(piece)
+					row_pieces[(run_start, run_end)] = piece
+					run_start = row.find(self.CARVABLE, run_end)
+				open_pieces = row_pieces
+
+		return [Region((px0, py0), (px1 - px0 + 1, py1 - py0 + 1)) for px0, py0, px1, py1 in pieces]
+
+	def to_bitmap(self, position):
+		'''
+		Method: to_bitmap
+		Description: Converts a maze position into a bitmap index.
+		Parameters: position
+			position: 2-Tuple - A position value within the bounding box of the valid regions
+		Return: Int - The bitmap index of the given position
+		'''
+
+		return (position[1] - self.m_origin_y) * self.m_bitmap_width + position[0] - self.m_origin_x
+
+	def to_position(self, bitmap_index):
+		'''
+		Method: to_position
+		Description: Converts a bitmap index into a maze position.
+		Parameters: bitmap_index
+			bitmap_index: Int - A bitmap index
+		Return: 2-Tuple - The maze position of the given bitmap index
+		'''
+
+		y, x = divmod(bitmap_index, self.m_bitmap_width)
+		return (x + self.m_origin_x, y + self.m_origin_y)
+
+	def to_index(self, bitmap_index):
+		'''
+		Method: to_index
+		Description: Converts a bitmap index into a flat cell index of the maze.
+		Parameters: bitmap_index
+			bitmap_index: Int - A bitmap index
+		Return: Int - The flat cell index of the given bitmap index
+		'''
+
+		y, x = divmod(bitmap_index, self.m_bitmap_width)
+		return (y + self.m_origin_y) * self.m_width + x + self.m_origin_x
+
+	def random_position(self, rng):
+		'''
+		Method: random_position
+		Description: Chooses a valid cell uniformly at random.
+		Parameters: rng
+			rng: Random - The source of randomness
+		Return: 2-Tuple - The position of the chosen cell
+		'''
+
+		choice = rng.randrange(self.m_area)
+		for valid_region in self.m_regions:
+			if choice < valid_region.get_area():
+				(x0, x1), (y0, y1) = valid_region.m_range
+				return (x0 + choice % (x1 - x0 + 1), y0 + choice // (x1 - x0 + 1))
+			choice -= valid_region.get_area()
+
+	def carvable(self):
+		'''
+		Method: carvable
+		Description: Iterates over the bitmap indices of the cells which may still be carved, in row-major order.
+		Parameters: No parameters
+		Return: Generator(Int) - The bitmap indices of the cells which may still be carved
+		'''
+
+		bitmap = self.m_bitmap
+		bitmap_index = bitmap.find(self.CARVABLE)
+		while bitmap_index >= 0:
+			yield bitmap_index
+			bitmap_index = bitmap.find(self.CARVABLE, bitmap_index + 1)
+
+	def visit(self, bitmap_index):
+		'''
+		Method: visit
+		Description: Visits the given cell, removing it from the cells which may be carved.
+		Parameters: bitmap_index
+			bitmap_index: Int - The bitmap index of the cell
+		Return: None
+		'''
+
+		index = self.to_index(bitmap_index)
+		self.m_cells[index] |= Grid.VISITED_BIT
+		self.m_bitmap[bitmap_index] = self.BLOCKED
+
+	def carve(self, bitmap_index, direction):
+		'''
+		Method: carve
+		Description: Removes both sides of the wall between the given cell and its neighbor in the given direction, visiting the neighbor.
+		Parameters: bitmap_index, direction
+			bitmap_index: Int - The bitmap index of the source cell
+			direction: Int - The direction value of the wall
+		Return: Int - The bitmap index of the neighbor
+		'''
+
+		index = self.to_index(bitmap_index)
+		neighbor_index = index + self.m_cell_offsets[direction]
+		self.m_cells[index] &= ~Grid.WALL_BITS[direction]
+		self.m_cells[neighbor_index] &= ~Grid.WALL_BITS[(direction + 2) % 4]
+
+		neighbor = bitmap_index + self.m_bitmap_offsets[direction]
+		if self.m_bitmap[neighbor] == self.CARVABLE:
+			self.visit(neighbor)
+
+		return neighbor
+
+	def plow(self, bitmap_index, direction):
+		'''
+		Method: plow
+		Description: Opens up the maze by removing the wall between the given cell and its neighbor in the given direction, if that neighbor lies within the maze (inside or outside of the region, unless the area is bounded) and is visited.
+		Parameters: bitmap_index, direction
+			bitmap_index: Int - The bitmap index of the source cell
+			direction: Int - The direction value of the wall
+		Return: None
+		'''
+
+		if self.m_inside is not None and not self.m_inside[bitmap_index + self.m_bitmap_offsets[direction]]:
+			return
+
+		x, y = self.to_position(bitmap_index)
+		if (direction == 0 and y > 0) or (direction == 1 and x < self.m_width - 1) or (direction == 2 and y < self.m_height - 1) or (direction == 3 and x > 0):
+			index = y * self.m_width + x
+			neighbor_index = index + self.m_cell_offsets[direction]
+			if self.m_cells[neighbor_index] & Grid.VISITED_BIT:
+				self.m_cells[index] &= ~Grid.WALL_BITS[direction]
+				self.m_cells[neighbor_index] &= ~Grid.WALL_BITS[(direction + 2) % 4]
+
+class Generator:
+	'''
+	Class: Generator
+	Description: Represents a maze generation algorithm. Every algorithm only carves cells inside the region which are neither exempt nor already visited, carving every such cell into a single tree per connected group of them, and opens up the maze at random according to open_chance. The new cells are then joined to the visited cells around them, so that generating next to (or around) visited cells never leaves the new cells cut off from them.
+	'''
+
+	def __init__(self, rng=None):
+		'''
+		Method: __init__
+		Description: Generator constructor.
+		Parameters: rng=None
+			rng: Random - The source of randomness (the global random module if None)
+		Return: None
+		'''
+
+		self.m_random = rng if rng is not None else random
+
+	def with_random(self, rng):
+		'''
+		Method: with_random
+		Description: Copies the generator, keeping its configuration but drawing from a different source of randomness.
+		Parameters: rng
+			rng: Random - The source of randomness of the copy
+		Return: Generator - The copy
+		'''
+
+		generator = copy.copy(self)
+		generator.m_random = rng
+		return generator
+
+	def generate(self, maze, region, exemptions, open_chance, bounded=False):
+		'''
+		Method: generate
+		Description: Generate a maze within the provided bounds.
+		Parameters: maze, region, exemptions, open_chance, bounded=False
+			maze: Maze - The maze to generate within
+			region: Region - A region for maze generation to span
+			exemptions: Regions - A collection of regions for maze generation to avoid
+			open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+			bounded: Boolean - Whether or not to leave every cell outside of the valid cells untouched (see GenerationArea)
+		Return: None
+		'''
+
+		area = GenerationArea(maze, region, exemptions, bounded)
+		if not area.is_empty():
+			self.carve(area, open_chance)
+			self.join_visited(area)
+
+	def generate_steps(self, maze, region, exemptions, open_chance, steps=0):
+		'''
+		Method: generate_steps
+		Description: Generate a maze within the provided bounds, resumably. Between slices, nothing but the generator itself may mutate the maze within the bounds.
+		Parameters: maze, region, exemptions, open_chance, steps=0
+			maze: Maze - The maze to generate within
+			region: Region - A region for maze generation to span
+			exemptions: Regions - A collection of regions for maze generation to avoid
+			open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+			steps: Int - The number of steps in each slice of work (never yielding if 0)
+		Return: Generator - Yields None after each slice of work
+		'''
+
+		area = GenerationArea(maze, region, exemptions)
+		if not area.is_empty():
+			yield from self.carve_steps(area, open_chance, steps)
+			self.join_visited(area)
+
+	def carve_steps(self, area, open_chance, steps=0):
+		'''
+		Method: carve_steps
+		Description: Carves the maze within the given generation area, resumably. Algorithms which do not override this carve the whole area in a single slice.
+		Parameters: area, open_chance, steps=0
+			area: GenerationArea - The cells which may be carved
+			open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+			steps: Int - The number of steps in each slice of work (never yielding if 0)
+		Return: Generator - Yields None after each slice of work
+		'''
+
+		yield from ()
+		self.carve(area, open_chance)
+
+	def carve(self, area, open_chance):
+		'''
+		Method: carve
+		Description: Carves the maze within the given generation area. Implemented by each algorithm.
+		Parameters: area, open_chance
+			area: GenerationArea - The cells which may be carved
+			open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+		Return: None
+		'''
+
+		raise NotImplementedError
+
+	def open_at_random(self, area, bitmap_index, open_chance):
+		'''
+		Method: open_at_random
+		Description: Opens up the maze by plowing through a random wall of the given cell, with the given chance.
+		Parameters: area, bitmap_index, open_chance
+			area: GenerationArea - The cells which may be carved
+			bitmap_index: Int - The bitmap index of the cell
+			open_chance: The percent chance of plowing through a wall
+		Return: None
+		'''
+
+		if self.m_random.random() * 100 < open_chance:
+			area.plow(bitmap_index, int(self.m_random.random() * 4))
+
+	def connect_regions(self, area, open_chance, regions=None):
+		'''
+		Method: connect_regions
+		Description: Connects separately-carved regions of the generation area by carving a single random passage between each pair of adjacent regions needed to span them.
+		Parameters: area, open_chance, regions=None
+			area: GenerationArea - The cells which may be carved
+			open_chance: The percent chance that each passage's cell will have a wall to an already-visited neighbor knocked down
+			regions: [Region] - The disjoint, separately-carved regions (the valid regions if None)
+		Return: None
+		'''
+
+		if regions is None:
+			regions = area.m_regions
+		parents = list(range(len(regions)))
+
+		def find(i):
+			while parents[i] != i:
+				parents[i] = parents[parents[i]]
+				i = parents[i]
+			return i
+
+		pairs = self.adjacent_pairs(regions)
+		self.m_random.shuffle(pairs)
+		for i, j in pairs:
+			if find(i) == find(j):
+				continue
+
+			passages = self.passages_between(area, regions[i], regions[j])
+			if passages:
+				bitmap_index, direction = passages[int(self.m_random.random() * len(passages))]
+				area.carve(bitmap_index, direction)
+				self.open_at_random(area, bitmap_index, open_chance)
+				parents[find(i)] = find(j)
+
+	def adjacent_pairs(self, regions):
+		'''
+		Method: adjacent_pairs
+		Description: Lists the pairs of disjoint regions which share a border, looking up the regions just below and just right of each one rather than comparing every pair.
+		Parameters: regions
+			regions: [Region] - The disjoint regions
+		Return: [2-Tuple] - The indices of each pair of adjacent regions, the upper or left region first
+		'''
+
+		by_top = {}
+		by_left = {}
+		for i, region in enumerate(regions):
+			by_top.setdefault(region.m_range[1][0], []).append(i)
+			by_left.setdefault(region.m_range[0][0], []).append(i)
+
+		pairs = []
+		for i, region in enumerate(regions):
+			(x0, x1), (y0, y1) = region.m_range
+			pairs += [(i, j) for j in by_top.get(y1 + 1, ()) if regions[j].m_range[0][0] <= x1 and regions[j].m_range[0][1] >= x0]
+			pairs += [(i, j) for j in by_left.get(x1 + 1, ()) if regions[j].m_range[1][0] <= y1 and regions[j].m_range[1][1] >= y0]
+
+		return pairs
+
+	def join_visited(self, area):
+		'''
+		Method: join_visited
+		Description: Joins the carved cells to the already-visited cells around them (those neither exempt nor, if the area is bounded, outside of it). Each run of such cells along a side of a carved piece gets a passage to a random one of them, unless a wall to one of them is already open. Visited cells lying side by side are normally connected already, so this links the new cells to every separate group of visited cells they touch.
+		Parameters: area
+			area: GenerationArea - The carved cells
+		Return: None
+		'''
+
+		cells = area.m_cells
+		mask = area.m_carvable_mask
+		inside = area.m_inside
+		bitmap_offsets = area.m_bitmap_offsets
+		width = area.m_width
+		height = area.m_height
+		offsets = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+		for piece in area.m_pieces:
+			(x0, x1), (y0, y1) = piece.m_range
+			sides = ([((x, y0), 0) for x in range(x0, x1 + 1)], [((x1, y), 1) for y in range(y0, y1 + 1)], [((x, y1), 2) for x in range(x0, x1 + 1)], [((x0, y), 3) for y in range(y0, y1 + 1)])
+
+			# Split each side into runs of walls out to already-visited cells.
+			runs = []
+			for side in sides:
+				run = []
+				for position, direction in side:
+					x = position[0] + offsets[direction][0]
+					y = position[1] + offsets[direction][1]
+					bitmap_index = area.to_bitmap(position)
+					neighbor = bitmap_index + bitmap_offsets[direction]
+					if not (0 <= x < width and 0 <= y < height) or not cells[y * width + x] & Grid.VISITED_BIT or mask[neighbor] or (inside is not None and not inside[neighbor]) or any(exemption.contains((x, y)) for exemption in area.m_exemptions):
+						if run:
+							runs.append(run)
+							run = []
+						continue
+					run.append((bitmap_index, direction))
+				if run:
+					runs.append(run)
+
+			# Carve a passage through each run which has no open wall yet.
+			for run in runs:
+				if all(cells[area.to_index(bitmap_index)] & Grid.WALL_BITS[direction] for bitmap_index, direction in run):
+					bitmap_index, direction = run[int(self.m_random.random() * len(run))]
+					area.carve(bitmap_index, direction)
+
+	def passages_between(self, area, region, other):
+		'''
+		Method: passages_between
+		Description: Lists the walls that could be carved between two adjacent valid regions.
+		Parameters: area, region, other
+			area: GenerationArea - The cells which may be carved
+			region: Region - The valid region to carve from
+			other: Region - The valid region to carve into
+		Return: [2-Tuple] - The bitmap index of the source cell and the direction value of each wall
+		'''
+
+		(x0, x1), (y0, y1) = region.m_range
+		(ox0, ox1), (oy0, oy1) = other.m_range
+		if oy0 == y1 + 1 or oy1 == y0 - 1:
+			direction = 2 if oy0 == y1 + 1 else 0
+			y = y1 if direction == 2 else y0
+			walls = [(area.to_bitmap((x, y)), direction) for x in range(max(x0, ox0), min(x1, ox1) + 1)]
+		elif ox0 == x1 + 1 or ox1 == x0 - 1:
+			direction = 1 if ox0 == x1 + 1 else 3
+			x = x1 if direction == 1 else x0
+			walls = [(area.to_bitmap((x, y)), direction) for y in range(max(y0, oy0), min(y1, oy1) + 1)]
+		else:
+			return []
+
+		return walls
+
+class RecursiveBacktracker(Generator):
+	'''
+	Class: RecursiveBacktracker
+	Description: Generates a maze with a randomized depth-first search from a single random valid cell, as the original Maze.generate did. Carvable cells the search cannot reach from there (cut off by exemptions or visited cells) are carved by further searches, each started from the first such cell left.
+	'''
+
+	# Every ordering of the four direction values, for choosing a random travel order with a single random draw.
+	DIRECTION_PERMUTATIONS = tuple(itertools.permutations(range(4)))
+
+	def carve(self, area, open_chance):
+		'''
+		Method: carve
+		Description: Carves the maze within the given generation area.
+		Parameters: area, open_chance
+			area: GenerationArea - The cells which may be carved
+			open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+		Return: None
+		'''
+
+		exhaust(self.carve_steps(area, open_chance))
+
+	def carve_steps(self, area, open_chance, steps=0):
+		'''
+		Method: carve_steps
+		Description: Carves the maze within the given generation area, resumably. The depth-first search's cell stack lives in the generator, so each slice picks up exactly where the last one left off.
+		Parameters: area, open_chance, steps=0
+			area: GenerationArea - The cells which may be carved
+			open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+			steps: Int - The number of steps (cells carved or backtracked from) in each slice of work (never yielding if 0)
+		Return: Generator - Yields None after each slice of work
+		'''
+
+		cells = area.m_cells
+		bitmap = area.m_bitmap
+		bitmap_width = area.m_bitmap_width
+		origin_x = area.m_origin_x
+		origin_y = area.m_origin_y
+		width = area.m_width
+		height = area.m_height
+
+		# Randomly choose a starting cell from the valid cells (it may have already been visited).
+		start_position = area.random_position(self.m_random)
+		start_index = area.m_grid.index(start_position)
+		cells[start_index] |= Grid.VISITED_BIT
+
+		# Push the starting cell onto the cell stack, which holds bitmap indices.
+		start = area.to_bitmap(start_position)
+		bitmap[start] = GenerationArea.BLOCKED
+		cell_stack = array.array("i", [start])
+
+		bitmap_offsets = area.m_bitmap_offsets
+		cell_offsets = area.m_cell_offsets
+		wall_clears = tuple(~bit & 0xFF for bit in Grid.WALL_BITS)
+		opposites = (2, 3, 0, 1)
+		permutations = self.DIRECTION_PERMUTATIONS
+		visited_bit = Grid.VISITED_BIT
+		rand = self.m_random.random
+		inside = area.m_inside
+		countdown = steps
+
+		# Crawl the entire maze, starting a new search wherever the last one could not reach.
+		scan = 0
+		while True:
+			while cell_stack:
+
+				# Yield at the end of each slice (the countdown only reaches 0 again if steps is not 0).
+				countdown -= 1
+				if countdown == 0:
+					yield
+					countdown = steps
+
+				# Grab the top cell from the cell stack.
+				current = cell_stack[-1]
+
+				# Find a valid direction to trailblaze in, trying the directions in a random order.
+				directions = permutations[int(rand() * 24)]
+				for i in range(4):
+					direction = directions[i]
+					target = current + bitmap_offsets[direction]
+					if bitmap[target]:
+						break
+
+				# If all directions have been tried, backtrack through the cell stack.
+				else:
+					cell_stack.pop()
+					continue
+
+				# Remove the wall between source and target cells, visit the target cell and add it to the cell stack.
+				y, x = divmod(current, bitmap_width)
+				x += origin_x
+				y += origin_y
+				current_index = y * width + x
+				target_index = current_index + cell_offsets[direction]
+				cells[current_index] &= wall_clears[direction]
+				cells[target_index] = (cells[target_index] & wall_clears[opposites[direction]]) | visited_bit
+				bitmap[target] = GenerationArea.BLOCKED
+				cell_stack.append(target)
+
+				# Open up the maze by plowing through walls at random (towards any visited neighbor, including those outside of the region).
+				if rand() * 100 < open_chance:
+					direction = directions[i + int(rand() * (4 - i))]
+					if (direction == 0 and y > 0) or (direction == 1 and x < width - 1) or (direction == 2 and y < height - 1) or (direction == 3 and x > 0):
+						neighbor_index = current_index + cell_offsets[direction]
+						if cells[neighbor_index] & visited_bit and (inside is None or inside[current + bitmap_offsets[direction]]):
+							cells[current_index] &= wall_clears[direction]
+							cells[neighbor_index] &= wall_clears[opposites[direction]]
+
+			# Start the next search from the first carvable cell left, if any.
+			scan = bitmap.find(GenerationArea.CARVABLE, scan)
+			if scan < 0:
+				break
+			area.visit(scan)
+			cell_stack.append(scan)
+
+class Kruskal(Generator):
+	'''
+	Class: Kruskal
+	Description: Generates a maze with randomized Kruskal's algorithm, joining cells in a random order with a union-find forest over the bitmap.
+	'''
+
+	def carve(self, area, open_chance):
+		'''
+		Method: carve
+		Description: Carves the maze within the given generation area.
+		Parameters: area, open_chance
+			area: GenerationArea - The cells which may be carved
+			open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+		Return: None
+		'''
+
+		bitmap = area.m_bitmap
+		bitmap_width = area.m_bitmap_width
+		carvable = list(area.carvable())
+
+		# Every wall between two carvable cells, encoded as twice the bitmap index of its northern/western cell, plus one for southern walls.
+		walls = array.array("i")
+		for bitmap_index in carvable:
+			if bitmap[bitmap_index + 1]:
+				walls.append(2 * bitmap_index)
+			if bitmap[bitmap_index + bitmap_width]:
+				walls.append(2 * bitmap_index + 1)
+		walls = walls.tolist()
+		self.m_random.shuffle(walls)
+
+		# The union-find forest, indexed by bitmap index.
+		parents = array.array("i", range(len(bitmap)))
+
+		for wall in walls:
+			bitmap_index = wall >> 1
+			direction = 2 if wall & 1 else 1
+			neighbor = bitmap_index + area.m_bitmap_offsets[direction]
+
+			# Find both roots, halving paths along the way.
+			root = bitmap_index
+			while parents[root] != root:
+				parents[root] = parents[parents[root]]
+				root = parents[root]
+			neighbor_root = neighbor
+			while parents[neighbor_root] != neighbor_root:
+				parents[neighbor_root] = parents[parents[neighbor_root]]
+				neighbor_root = parents[neighbor_root]
+
+			# Only join cells which are not already connected.
+			if root == neighbor_root:
+				continue
+
+			parents[root] = neighbor_root
+			if bitmap[bitmap_index]:
+				area.visit(bitmap_index)
+			area.carve(bitmap_index, direction)
+			self.open_at_random(area, bitmap_index, open_chance)
+
+		# Visit any isolated cells.
+		for bitmap_index in carvable:
+			if bitmap[bitmap_index]:
+				area.visit(bitmap_index)
+
+class Prim(Generator):
+	'''
+	Class: Prim
+	Description: Generates a maze with randomized Prim's algorithm, growing a tree from a random frontier cell at a time.
+	'''
+
+	# The bitmap value of a carvable cell which neighbors the growing tree.
+	FRONTIER = 2
+
+	def carve(self, area, open_chance):
+		'''
+		Method: carve
+		Description: Carves the maze within the given generation area, growing one tree per connected component of carvable cells.
+		Parameters: area, open_chance
+			area: GenerationArea - The cells which may be carved
+			open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+		Return: None
+		'''
+
+		bitmap = area.m_bitmap
+		bitmap_offsets = area.m_bitmap_offsets
+		rand = self.m_random.random
+
+		for root in area.carvable():
+			if bitmap[root] != GenerationArea.CARVABLE:
+				continue
+
+			# The cells of the current tree (this run only), as a set of bitmap indices.
+			tree = set([root])
+			area.visit(root)
+			frontier = []
+			for direction in range(4):
+				neighbor = root + bitmap_offsets[direction]
+				if bitmap[neighbor] == GenerationArea.CARVABLE:
+					bitmap[neighbor] = self.FRONTIER
+					frontier.append(neighbor)
+
+			while frontier:
+
+				# Remove a random frontier cell, by swapping it with the last.
+				choice = int(rand() * len(frontier))
+				frontier[choice], frontier[-1] = frontier[-1], frontier[choice]
+				current = frontier.pop()
+
+				# Connect it to a random neighbor inside the tree.
+				directions = [direction for direction in range(4) if current + bitmap_offsets[direction] in tree]
+				direction = directions[int(rand() * len(directions))]
+				area.visit(current)
+				area.carve(current, direction)
+				tree.add(current)
+				self.open_at_random(area, current, open_chance)
+
+				# Extend the frontier.
+				for direction in range(4):
+					neighbor = current + bitmap_offsets[direction]
+					if bitmap[neighbor] == GenerationArea.CARVABLE:
+						bitmap[neighbor] = self.FRONTIER
+						frontier.append(neighbor)
+
+class Wilson(Generator):
+	'''
+	Class: Wilson
+	Description: Generates a uniform spanning tree maze with Wilson's algorithm, adding loop-erased random walks to the tree.
+	'''
+
+	# The bitmap value of a carvable cell which has been added to the tree.
+	IN_TREE = 2
+
+	def carve(self, area, open_chance):
+		'''
+		Method: carve
+		Description: Carves the maze within the given generation area, growing one tree per connected component of carvable cells.
+		Parameters: area, open_chance
+			area: GenerationArea - The cells which may be carved
+			open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+		Return: None
+		'''
+
+		bitmap = area.m_bitmap
+		bitmap_offsets = area.m_bitmap_offsets
+		rand = self.m_random.random
+		carvable = list(area.carvable())
+
+		# Seed the tree of each connected component of carvable cells with a single random root, so that every random walk terminates.
+		component = bytearray(len(bitmap))
+		components = []
+		for bitmap_index in carvable:
+			if component[bitmap_index]:
+				continue
+			members = [bitmap_index]
+			component[bitmap_index] = 1
+			for current in members:
+				for direction in range(4):
+					neighbor = current + bitmap_offsets[direction]
+					if bitmap[neighbor] and not component[neighbor]:
+						component[neighbor] = 1
+						members.append(neighbor)
+			components.append(members[int(rand() * len(members))])
+		del component
+
+		for root in components:
+			area.visit(root)
+			bitmap[root] = self.IN_TREE
+
+		# The direction the random walk last left each cell in.
+		exits = bytearray(len(bitmap))
+
+		for start in carvable:
+			if bitmap[start] != GenerationArea.CARVABLE:
+				continue
+
+			# Random walk until the tree is hit, remembering only the last exit of each cell (which erases loops).
+			current = start
+			while bitmap[current] == GenerationArea.CARVABLE:
+				direction = int(rand() * 4)
+				neighbor = current + bitmap_offsets[direction]
+				if bitmap[neighbor]:
+					exits[current] = direction
+					current = neighbor
+
+			# Carve the loop-erased walk into the tree.
+			path = []
+			current = start
+			while bitmap[current] == GenerationArea.CARVABLE:
+				path.append(current)
+				current += bitmap_offsets[exits[current]]
+			for current in path:
+				area.visit(current)
+				area.carve(current, exits[current])
+				self.open_at_random(area, current, open_chance)
+			for current in path:
+				bitmap[current] = self.IN_TREE
+
+		# Block the tree cells again.
+		for bitmap_index in carvable:
+			bitmap[bitmap_index] = GenerationArea.BLOCKED
+
+class RecursiveDivision(Generator):
+	'''
+	Class: RecursiveDivision
+	Description: Generates a maze by opening up each valid region and recursively dividing it with walls containing a single gap. Walls are raised a row or column span at a time, rather than a cell at a time.
+	'''
+
+	def carve(self, area, open_chance):
+		'''
+		Method: carve
+		Description: Carves the maze within the given generation area, dividing each fully carvable piece of it separately and then joining the pieces. Valid cells which were already visited are left untouched.
+		Parameters: area, open_chance
+			area: GenerationArea - The cells which may be carved
+			open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+		Return: None
+		'''
+
+		grid = area.m_grid
+		width = area.m_width
+		rand = self.m_random.random
+
+		# Every piece is entirely carvable, so its cells can be opened up in bulk.
+		for piece in area.m_pieces:
+			(x0, x1), (y0, y1) = piece.m_range
+
+			# Visit every cell and open up every wall inside the piece a row slice at a time (keeping its borders), then mark its cells as carved.
+			for y in range(y0, y1 + 1):
+				grid.fill(y * width + x0, y * width + x1 + 1, Grid.OPEN_CELL)
+				start = area.to_bitmap((x0, y))
+				area.m_bitmap[start:start + x1 - x0 + 1] = bytes(x1 - x0 + 1)
+			grid.set_wall_span(y0 * width + x0, y0 * width + x1 + 1, Direction.NORTH, True)
+			grid.set_wall_span(y1 * width + x0, y1 * width + x1 + 1, Direction.SOUTH, True)
+			grid.set_wall_span(y0 * width + x0, y1 * width + x0 + 1, Direction.WEST, True, width)
+			grid.set_wall_span(y0 * width + x1, y1 * width + x1 + 1, Direction.EAST, True, width)
+
+			# Divide chambers until they are a single cell wide.
+			chambers = [(x0, y0, x1, y1)]
+			while chambers:
+				cx0, cy0, cx1, cy1 = chambers.pop()
+				chamber_width = cx1 - cx0 + 1
+				chamber_height = cy1 - cy0 + 1
+				if chamber_width < 2 or chamber_height < 2:
+					continue
+
+				# Divide across the longer dimension (at random for squares).
+				if chamber_height > chamber_width or (chamber_height == chamber_width and rand() < 0.5):
+					wall_y = cy0 + int(rand() * (chamber_height - 1))
+					gap_x = cx0 + int(rand() * chamber_width)
+					grid.set_wall_span(wall_y * width + cx0, wall_y * width + cx1 + 1, Direction.SOUTH, True)
+					grid.set_wall_span((wall_y + 1) * width + cx0, (wall_y + 1) * width + cx1 + 1, Direction.NORTH, True)
+					grid.set_wall(wall_y * width + gap_x, Direction.SOUTH, False)
+					chambers.append((cx0, cy0, cx1, wall_y))
+					chambers.append((cx0, wall_y + 1, cx1, cy1))
+				else:
+					wall_x = cx0 + int(rand() * (chamber_width - 1))
+					gap_y = cy0 + int(rand() * chamber_height)
+					grid.set_wall_span(cy0 * width + wall_x, cy1 * width + wall_x + 1, Direction.EAST, True, width)
+					grid.set_wall_span(cy0 * width + wall_x + 1, cy1 * width + wall_x + 2, Direction.WEST, True, width)
+					grid.set_wall(gap_y * width + wall_x, Direction.EAST, False)
+					chambers.append((cx0, cy0, wall_x, cy1))
+					chambers.append((wall_x + 1, cy0, cx1, cy1))
+
+			# Open up the maze at random, with the same expected number of plowed walls as carving cell by cell.
+			for _ in range(int(piece.get_area() * open_chance / 100)):
+				area.plow(area.to_bitmap((x0 + int(rand() * (x1 - x0 + 1)), y0 + int(rand() * (y1 - y0 + 1)))), int(rand() * 4))
+
+		self.connect_regions(area, open_chance, area.m_pieces)
+
+class Eller(Generator):
+	'''
+	Class: Eller
+	Description: Generates a maze with Eller's algorithm, one row at a time, keeping only the set membership of a single row of cells.
+	'''
+
+	def carve(self, area, open_chance):
+		'''
+		Method: carve
+		Description: Carves the maze within the given generation area, each fully carvable piece of it separately, then joins the pieces. Valid cells which were already visited are left untouched.
+		Parameters: area, open_chance
+			area: GenerationArea - The cells which may be carved
+			open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+		Return: None
+		'''
+
+		bitmap = area.m_bitmap
+
+		for piece in area.m_pieces:
+			(x0, x1), (y0, y1) = piece.m_range
+			row_width = x1 - x0 + 1
+
+			start = area.to_bitmap((x0, y0))
+			present = [bool(value) for value in bitmap[start:start + row_width]]
+			sets = [i if present[i] else -1 for i in range(row_width)]
+			next_set = row_width
+
+			for y in range(y0, y1 + 1):
+				start = area.to_bitmap((x0, y))
+				last = y == y1
+				below = [False] * row_width if last else [bool(value) for value in bitmap[start + area.m_bitmap_width:start + area.m_bitmap_width + row_width]]
+				east, south, sets, next_set = self.join_row(sets, below, last, next_set)
+
+				for i in range(row_width):
+					if present[i]:
+						if bitmap[start + i]:
+							area.visit(start + i)
+						if east[i]:
+							area.carve(start + i, 1)
+						if south[i]:
+							area.carve(start + i, 2)
+						if east[i] or south[i]:
+							self.open_at_random(area, start + i, open_chance)
+
+				present = below
+
+		self.connect_regions(area, open_chance, area.m_pieces)
+
+	def join_row(self, sets, below, last, next_set):
+		'''
+		Method: join_row
+		Description: Performs a single row step of Eller's algorithm: randomly joins horizontally-adjacent cells of different sets, then carries every set down into the next row at least once where possible.
+		Parameters: sets, below, last, next_set
+			sets: [Int] - The set of each cell in the row (-1 for absent cells)
+			below: [Boolean] - Whether or not the cell below each cell of the row is present
+			last: Boolean - Whether or not this is the last row (in which case all adjacent sets are joined, and none are carried down)
+			next_set: Int - The next unused set number
+		Return: 4-Tuple - The row step
+			[0] = [Boolean] - Whether or not the wall east of each cell is carved
+			[1] = [Boolean] - Whether or not the wall south of each cell is carved
+			[2] = [Int] - The set of each cell in the next row (-1 for absent cells)
+			[3] = Int - The next unused set number
+		'''
+
+		rand = self.m_random.random
+		row_width = len(sets)
+		sets = list(sets)
+
+		# The cells of each set, for merging the smaller set into the larger.
+		members = {}
+		for i in range(row_width):
+			if sets[i] >= 0:
+				members.setdefault(sets[i], []).append(i)
+
+		# Randomly join adjacent cells of different sets.
+		east = [False] * row_width
+		for i in range(row_width - 1):
+			joined = sets[i]
+			other = sets[i + 1]
+			if joined < 0 or other < 0 or joined == other:
+				continue
+			if last or rand() < 0.5:
+				east[i] = True
+				if len(members[joined]) < len(members[other]):
+					joined, other = other, joined
+				for j in members[other]:
+					sets[j] = joined
+				members[joined] += members.pop(other)
+
+		# Carry each set down at least once, and each of its other cells at random.
+		south = [False] * row_width
+		next_sets = [-1] * row_width
+		if not last:
+			for member_set, cells in members.items():
+				candidates = [i for i in cells if below[i]]
+				if not candidates:
+					continue
+				carried = candidates[int(rand() * len(candidates))]
+				for i in candidates:
+					if i == carried or rand() < 0.5:
+						south[i] = True
+						next_sets[i] = member_set
+
+			# Every other cell of the next row starts out in a set of its own.
+			for i in range(row_width):
+				if below[i] and next_sets[i] < 0:
+					next_sets[i] = next_set
+					next_set += 1
+
+		return east, south, next_sets, next_set
\ No newline at end of file
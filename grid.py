@@ -0,0 +1,225 @@
+'''
+Module: grid
+Author: David Frye
+Description: Contains the Grid class.
+'''
+
+from utility import Direction
+
+class Grid:
+	'''
+	Class: Grid
+	Description: Represents the compact cell storage of a maze, one byte per cell holding a 4-bit wall mask and a visited bit.
+	'''
+
+	# The bit of a cell byte corresponding to each wall, indexed by direction value.
+	WALL_BITS = (0x01, 0x02, 0x04, 0x08)
+	# The bits of a cell byte corresponding to all four walls.
+	WALL_MASK = 0x0F
+	# The bit of a cell byte marking the cell as visited.
+	VISITED_BIT = 0x10
+	# The byte of a fresh cell (unvisited, with all four walls standing).
+	UNVISITED_CELL = WALL_MASK
+	# The byte of a visited cell with all four walls destroyed.
+	OPEN_CELL = VISITED_BIT
+
+	# Byte translation table mapping unvisited cells to 1 and visited cells to 0.
+	UNVISITED_TABLE = (bytes([1]) * VISITED_BIT + bytes(VISITED_BIT)) * (128 // VISITED_BIT)
+
+	# Byte translation tables raising/lowering each wall, indexed by direction value, for bulk span updates.
+	RAISE_TABLES = tuple(bytes([value | bit for value in range(256)]) for bit in WALL_BITS)
+	LOWER_TABLES = tuple(bytes([value & ~bit for value in range(256)]) for bit in WALL_BITS)
+
+	def __init__(self, size, buffer=None):
+		'''
+		Method: __init__
+		Description: Grid constructor.
+		Parameters: size, buffer=None
+			size: 2-Tuple - The dimensional lengths of the grid
+				[0] - Grid x-dimensional length
+				[1] - Grid y-dimensional length
+			buffer: Buffer - A writable buffer of at least width * height bytes to store the cells in (a fresh bytearray is allocated if None)
+		Return: None
+		'''
+
+		self.m_size = size
+		self.m_width = size[0]
+		self.m_height = size[1]
+		self.m_area = size[0] * size[1]
+
+		# The cell bytes, stored row-major.
+		if buffer is None:
+			self.m_cells = bytearray([self.UNVISITED_CELL]) * self.m_area
+		else:
+			self.m_cells = buffer
+
+		# The flat index offset to the neighboring cell, indexed by direction value.
+		self.m_offsets = (-self.m_width, 1, self.m_width, -1)
+
+	def contains(self, position):
+		'''
+		Method: contains
+		Description: Determines whether or not the given position lies within the grid.
+		Parameters: position
+			position: 2-Tuple - A position value
+				[0] = The x-position
+				[1] = The y-position
+		Return: Boolean - Whether or not the given position lies within the grid
+		'''
+
+		return 0 <= position[0] < self.m_width and 0 <= position[1] < self.m_height
+
+	def index(self, position):
+		'''
+		Method: index
+		Description: Converts a position into a flat (row-major) cell index.
+		Parameters: position
+			position: 2-Tuple - A position value
+				[0] = The x-position
+				[1] = The y-position
+		Return: Int - The flat cell index of the given position
+		'''
+
+		return position[1] * self.m_width + position[0]
+
+	def position(self, index):
+		'''
+		Method: position
+		Description: Converts a flat (row-major) cell index into a position.
+		Parameters: index
+			index: Int - A flat cell index
+		Return: 2-Tuple - The position of the given flat cell index
+			[0] = The x-position
+			[1] = The y-position
+		'''
+
+		return (index % self.m_width, index // self.m_width)
+
+	def neighbor(self, index, direction):
+		'''
+		Method: neighbor
+		Description: Gets the flat index of the cell neighboring the given cell in the given direction.
+		Parameters: index, direction
+			index: Int - The flat index of the source cell
+			direction: Direction - The direction of the neighbor from the source cell
+		Return: Int - The flat index of the neighboring cell, or -1 if the neighbor lies outside of the grid
+		'''
+
+		direction = direction.value
+
+		if direction == 0:
+			return index - self.m_width if index >= self.m_width else -1
+		elif direction == 1:
+			return index + 1 if (index % self.m_width) < self.m_width - 1 else -1
+		elif direction == 2:
+			return index + self.m_width if index < self.m_area - self.m_width else -1
+		else:
+			return index - 1 if (index % self.m_width) > 0 else -1
+
+	def get_wall(self, index, direction):
+		'''
+		Method: get_wall
+		Description: Gets the given cell's wall in the given direction.
+		Parameters: index, direction
+			index: Int - The flat index of the cell
+			direction: Direction - The direction of the wall
+		Return: Boolean - Whether the wall exists or not
+		'''
+
+		return bool(self.m_cells[index] & self.WALL_BITS[direction.value])
+
+	def set_wall_side(self, index, direction, value):
+		'''
+		Method: set_wall_side
+		Description: Modifies only the given cell's side of the wall in the given direction.
+		Parameters: index, direction, value
+			index: Int - The flat index of the cell
+			direction: Direction - The direction of the wall
+			value: Boolean - Whether the wall should exist or not
+		Return: None
+		'''
+
+		if value:
+			self.m_cells[index] |= self.WALL_BITS[direction.value]
+		else:
+			self.m_cells[index] &= ~self.WALL_BITS[direction.value]
+
+	def set_wall(self, index, direction, value):
+		'''
+		Method: set_wall
+		Description: Modifies both sides of the given cell's wall in the given direction.
+		Parameters: index, direction, value
+			index: Int - The flat index of the cell
+			direction: Direction - The direction of the wall
+			value: Boolean - Whether the wall should exist or not
+		Return: None
+		'''
+
+		self.set_wall_side(index, direction, value)
+
+		# Modify the shared wall of the neighbor cell, if there is one.
+		neighbor = self.neighbor(index, direction)
+		if neighbor >= 0:
+			self.set_wall_side(neighbor, Direction.get_opposite(direction), value)
+
+	def is_visited(self, index):
+		'''
+		Method: is_visited
+		Description: Determines whether or not the given cell is in the visited state.
+		Parameters: index
+			index: Int - The flat index of the cell
+		Return: Boolean - Whether or not the cell is in the visited state
+		'''
+
+		return bool(self.m_cells[index] & self.VISITED_BIT)
+
+	def visit(self, index):
+		'''
+		Method: visit
+		Description: Sets the given cell into the visited state.
+		Parameters: index
+			index: Int - The flat index of the cell
+		Return: None
+		'''
+
+		self.m_cells[index] |= self.VISITED_BIT
+
+	def unvisit(self, index):
+		'''
+		Method: unvisit
+		Description: Sets the given cell into the unvisited state.
+		Parameters: index
+			index: Int - The flat index of the cell
+		Return: None
+		'''
+
+		self.m_cells[index] &= ~self.VISITED_BIT
+
+	def fill(self, start, end, value):
+		'''
+		Method: fill
+		Description: Sets every cell in a contiguous span of flat indices to the given cell byte.
+		Parameters: start, end, value
+			start: Int - The first flat index of the span
+			end: Int - One past the last flat index of the span
+			value: Int - The cell byte to store
+		Return: None
+		'''
+
+		self.m_cells[start:end] = bytes([value]) * (end - start)
+
+	def set_wall_span(self, start, end, direction, value, step=1):
+		'''
+		Method: set_wall_span
+		Description: Modifies only the given cells' side of the wall in the given direction, for a span of flat indices.
+		Parameters: start, end, direction, value, step=1
+			start: Int - The first flat index of the span
+			end: Int - One past the last flat index of the span
+			direction: Direction - The direction of the wall
+			value: Boolean - Whether the wall should exist or not
+			step: Int - The flat index stride of the span (1 for a row, the width for a column)
+		Return: None
+		'''
+
+		table = self.RAISE_TABLES[direction.value] if value else self.LOWER_TABLES[direction.value]
+		self.m_cells[start:end:step] = bytes(self.m_cells[start:end:step]).translate(table)
@@ -0,0 +1,477 @@
+'''
+Module: hierarchical
+Author: David Frye
+Description: Contains the HierarchicalSolver class, a hierarchical (HPA*) maze solving algorithm.
+'''
+
+import heapq
+
+from grid import Grid
+from observer import MazeObserver
+from solver import Solver
+from utility import Direction
+
+class HierarchicalSolver(Solver, MazeObserver):
+	'''
+	Class: HierarchicalSolver
+	Description: Solves a maze with hierarchical pathfinding (HPA*). The maze is partitioned into square clusters, and every open wall crossing a cluster border becomes a transition between two entrance cells. An A* search runs over the entrance cells first, then the abstract path is refined into cells a cluster at a time.
+		The distances between the entrances of a cluster are only computed when the search first reaches one of them, and are cached until the cluster is mutated. A mutation only rescans the borders of the clusters it touches, so long-range queries stay cheap on very large mazes which are mutated a region at a time. Every border crossing is an entrance, so the paths found are shortest paths.
+	'''
+
+	DEFAULT_CLUSTER_SIZE = 32
+
+	def __init__(self, cluster_size=DEFAULT_CLUSTER_SIZE):
+		'''
+		Method: __init__
+		Description: HierarchicalSolver constructor.
+		Parameters: cluster_size=DEFAULT_CLUSTER_SIZE
+			cluster_size: Int - The side length of the square clusters the maze is partitioned into
+		Return: None
+		'''
+
+		self.m_cluster_size = cluster_size
+		# The maze the abstraction was built for (it is rebuilt if another maze is solved).
+		self.m_maze = None
+		# The cells reachable through each entrance cell's open border walls, keyed by flat index.
+		self.m_transitions = {}
+		# The distances from each entrance cell to the other entrance cells of its cluster, keyed by flat index.
+		self.m_edges = {}
+		# The local graph of each cluster, keyed by cluster.
+		self.m_graphs = {}
+		# The clusters whose borders must be rescanned.
+		self.m_dirty = set()
+
+	def attach(self, maze):
+		'''
+		Method: attach
+		Description: Builds the abstraction of a maze and registers the solver as an observer of it, detaching from any previous maze.
+		Parameters: maze
+			maze: Maze - The maze to solve
+		Return: None
+		'''
+
+		self.detach()
+
+		grid = maze.m_grid
+		self.m_maze = maze
+		self.m_clusters_x = (grid.m_width + self.m_cluster_size - 1) // self.m_cluster_size
+		self.m_clusters_y = (grid.m_height + self.m_cluster_size - 1) // self.m_cluster_size
+		self.m_transitions = {}
+		self.m_edges = {}
+		self.m_graphs = {}
+		self.m_dirty = set(range(self.m_clusters_x * self.m_clusters_y))
+
+		maze.add_observer(self)
+
+	def detach(self):
+		'''
+		Method: detach
+		Description: Stops observing the current maze, if any.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		if self.m_maze is not None:
+			self.m_maze.remove_observer(self)
+			self.m_maze = None
+
+	def precompute(self, maze):
+		'''
+		Method: precompute
+		Description: Builds the whole abstraction of a maze up front, including the distances between the entrances of every cluster, rather than on first use.
+		Parameters: maze
+			maze: Maze - The maze to solve
+		Return: None
+		'''
+
+		if maze is not self.m_maze:
+			self.attach(maze)
+		self.update()
+
+		for index in list(self.m_transitions):
+			self.get_edges(index)
+
+	def on_mutation(self, maze, regions, kind):
+		'''
+		Method: on_mutation
+		Description: Marks every cluster touched by a mutation, to be rescanned at the next solve.
+		Parameters: maze, regions, kind
+			maze: Maze - The mutated maze
+			regions: [Region] - The regions containing every cell whose walls may have changed
+			kind: String - Maze.MUTATION_OPEN or Maze.MUTATION_CLOSE
+		Return: None
+		'''
+
+		cluster_size = self.m_cluster_size
+		for region in regions:
+			(x0, x1), (y0, y1) = region.m_range
+			for cluster_y in range(y0 // cluster_size, y1 // cluster_size + 1):
+				self.m_dirty.update(range(cluster_y * self.m_clusters_x + x0 // cluster_size, cluster_y * self.m_clusters_x + x1 // cluster_size + 1))
+
+	def solve(self, maze, start_index, end_index):
+		'''
+		Method: solve
+		Description: Finds a path between the given start and end cells.
+		Parameters: maze, start_index, end_index
+			maze: Maze - The maze to solve
+			start_index: Int - The flat index of the cell to begin searching from
+			end_index: Int - The flat index of the cell to target in the search
+		Return: [Int] - The flat indices of the cells along the solution path (from start to end), or None if no solution is found
+		'''
+
+		if maze is not self.m_maze:
+			self.attach(maze)
+		self.update()
+
+		if start_index == end_index:
+			return [start_index]
+
+		abstract_path = self.search(start_index, end_index)
+		if abstract_path is None:
+			return None
+
+		return self.refine(abstract_path)
+
+	def update(self):
+		'''
+		Method: update
+		Description: Rescans the borders of every dirty cluster, dropping the local graph of every dirty cluster and the cached entrance distances of every cluster sharing a rescanned border.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		touched = set()
+		for cluster in self.m_dirty:
+			touched.update(self.rescan(cluster))
+			self.m_graphs.pop(cluster, None)
+		self.m_dirty = set()
+
+		for cluster in touched:
+			for index in self.border_cells(cluster):
+				self.m_edges.pop(index, None)
+
+	def rescan(self, cluster):
+		'''
+		Method: rescan
+		Description: Rebuilds the transitions across every border of a cluster.
+		Parameters: cluster
+			cluster: Int - The index of the cluster (row-major)
+		Return: [Int] - The cluster and every cluster sharing one of its borders
+		'''
+
+		grid = self.m_maze.m_grid
+		cells = grid.m_cells
+		width = grid.m_width
+		(x0, x1), (y0, y1) = self.cluster_range(cluster)
+
+		touched = [cluster]
+		crossings = []
+		if y0 > 0:
+			crossings += [(y0 * width + x, Direction.NORTH) for x in range(x0, x1 + 1)]
+			touched.append(cluster - self.m_clusters_x)
+		if x1 < width - 1:
+			crossings += [(y * width + x1, Direction.EAST) for y in range(y0, y1 + 1)]
+			touched.append(cluster + 1)
+		if y1 < grid.m_height - 1:
+			crossings += [(y1 * width + x, Direction.SOUTH) for x in range(x0, x1 + 1)]
+			touched.append(cluster + self.m_clusters_x)
+		if x0 > 0:
+			crossings += [(y * width + x0, Direction.WEST) for y in range(y0, y1 + 1)]
+			touched.append(cluster - 1)
+
+		for index, direction in crossings:
+			neighbor = grid.neighbor(index, direction)
+			self.set_transition(index, neighbor, not cells[index] & Grid.WALL_BITS[direction.value])
+			self.set_transition(neighbor, index, not cells[neighbor] & Grid.WALL_BITS[Direction.get_opposite(direction).value])
+
+		return touched
+
+	def set_transition(self, index, neighbor, value):
+		'''
+		Method: set_transition
+		Description: Adds or removes the transition from an entrance cell to a cell across a cluster border.
+		Parameters: index, neighbor, value
+			index: Int - The flat index of the entrance cell
+			neighbor: Int - The flat index of the cell across the border
+			value: Boolean - Whether or not the transition should exist
+		Return: None
+		'''
+
+		transitions = self.m_transitions.get(index)
+		if value:
+			if transitions is None:
+				self.m_transitions[index] = [neighbor]
+			elif neighbor not in transitions:
+				transitions.append(neighbor)
+		elif transitions is not None and neighbor in transitions:
+			transitions.remove(neighbor)
+			if not transitions:
+				del self.m_transitions[index]
+
+	def search(self, start_index, end_index):
+		'''
+		Method: search
+		Description: Finds a shortest path over the abstract graph of entrance cells with an A* search guided by the Manhattan distance. The start cell is joined to the entrances of its cluster, and the entrances of the end cell's cluster are joined to the end cell.
+		Parameters: start_index, end_index
+			start_index: Int - The flat index of the cell to begin searching from
+			end_index: Int - The flat index of the cell to target in the search
+		Return: [Int] - The flat indices of the start cell, the entrance cells passed through and the end cell, or None if no solution is found
+		'''
+
+		width = self.m_maze.m_grid.m_width
+		end_y, end_x = divmod(end_index, width)
+		end_cluster = self.cluster_of(end_index)
+
+		# The distances from the start cell within its cluster, and to the end cell from within its cluster.
+		start_graph, start_distances = self.search_cluster(start_index)[:2]
+		end_graph, end_distances = self.search_cluster(end_index, reverse=True)[:2]
+		start_edges = [(entrance, start_distances[self.to_local(start_graph, entrance)]) for entrance in self.get_entrances(self.cluster_of(start_index)) if entrance != start_index]
+		start_edges = [(entrance, cost) for entrance, cost in start_edges if cost >= 0]
+		if self.cluster_of(start_index) == end_cluster and start_distances[self.to_local(start_graph, end_index)] >= 0:
+			start_edges.append((end_index, start_distances[self.to_local(start_graph, end_index)]))
+
+		parents = {start_index: start_index}
+		distances = {start_index: 0}
+		start_y, start_x = divmod(start_index, width)
+		heap = [(abs(start_x - end_x) + abs(start_y - end_y), 0, start_index)]
+
+		while heap:
+			estimate, distance, current = heapq.heappop(heap)
+			if current == end_index:
+				path = self.backtrace(parents, end_index)
+				path.reverse()
+				return path
+
+			# Skip stale heap entries.
+			if distance > distances[current]:
+				continue
+
+			# Step within the cluster to its other entrances (and to the end cell), then across the border.
+			if current == start_index:
+				edges = list(start_edges)
+			else:
+				edges = list(self.get_edges(current))
+				if self.cluster_of(current) == end_cluster and end_distances[self.to_local(end_graph, current)] >= 0:
+					edges.append((end_index, end_distances[self.to_local(end_graph, current)]))
+			edges += [(neighbor, 1) for neighbor in self.m_transitions.get(current, ())]
+
+			for neighbor, cost in edges:
+				if neighbor not in distances or distance + cost < distances[neighbor]:
+					distances[neighbor] = distance + cost
+					parents[neighbor] = current
+					neighbor_y, neighbor_x = divmod(neighbor, width)
+					heapq.heappush(heap, (distance + cost + abs(neighbor_x - end_x) + abs(neighbor_y - end_y), distance + cost, neighbor))
+
+		return None
+
+	def refine(self, abstract_path):
+		'''
+		Method: refine
+		Description: Refines an abstract path into cells, searching each cluster along it from the cell where the path enters to the cell where it leaves.
+		Parameters: abstract_path
+			abstract_path: [Int] - The flat indices of the start cell, the entrance cells passed through and the end cell
+		Return: [Int] - The flat indices of the cells along the path (from start to end)
+		'''
+
+		path = [abstract_path[0]]
+		for current, target in zip(abstract_path, abstract_path[1:]):
+			# Border crossings are a single step.
+			if self.cluster_of(current) != self.cluster_of(target):
+				path.append(target)
+				continue
+
+			graph, distances, parents = self.search_cluster(current, target)
+			segment = self.backtrace(parents, self.to_local(graph, target))
+			segment.reverse()
+			path += [self.to_global(graph, local) for local in segment[1:]]
+
+		return path
+
+	def get_edges(self, index):
+		'''
+		Method: get_edges
+		Description: Gets the distances from an entrance cell to the other entrance cells of its cluster, computing and caching them on first use.
+		Parameters: index
+			index: Int - The flat index of the entrance cell
+		Return: [2-Tuple] - The flat index of and distance to each entrance reachable within the cluster
+		'''
+
+		edges = self.m_edges.get(index)
+		if edges is None:
+			graph, distances = self.search_cluster(index)[:2]
+			edges = [(entrance, distances[self.to_local(graph, entrance)]) for entrance in self.get_entrances(self.cluster_of(index)) if entrance != index]
+			edges = [(entrance, cost) for entrance, cost in edges if cost >= 0]
+			self.m_edges[index] = edges
+
+		return edges
+
+	def get_entrances(self, cluster):
+		'''
+		Method: get_entrances
+		Description: Gets the entrance cells of a cluster (the border cells with a transition out of it).
+		Parameters: cluster
+			cluster: Int - The index of the cluster (row-major)
+		Return: [Int] - The flat indices of the entrance cells
+		'''
+
+		return [index for index in self.border_cells(cluster) if index in self.m_transitions]
+
+	def get_graph(self, cluster):
+		'''
+		Method: get_graph
+		Description: Gets the local graph of a cluster, building and caching it on first use. Cells are numbered locally (row-major within the cluster), and each cell lists the local numbers of the neighbors its open walls lead to, so that searches within the cluster need neither bounds checks nor dictionaries.
+		Parameters: cluster
+			cluster: Int - The index of the cluster (row-major)
+		Return: 4-Tuple - The local graph
+			[0] = Int - The x-position of the cluster's first cell
+			[1] = Int - The y-position of the cluster's first cell
+			[2] = Int - The x-dimensional length of the cluster
+			[3] = [Tuple(Int)] - The neighbors of each cell, indexed by local number
+		'''
+
+		graph = self.m_graphs.get(cluster)
+		if graph is not None:
+			return graph
+
+		cells = self.m_maze.m_grid.m_cells
+		width = self.m_maze.m_grid.m_width
+		(x0, x1), (y0, y1) = self.cluster_range(cluster)
+		cluster_width = x1 - x0 + 1
+		cluster_height = y1 - y0 + 1
+
+		adjacency = []
+		for y in range(cluster_height):
+			for x in range(cluster_width):
+				walls = cells[(y0 + y) * width + x0 + x]
+				local = y * cluster_width + x
+				neighbors = []
+				if not walls & 1 and y > 0:
+					neighbors.append(local - cluster_width)
+				if not walls & 2 and x < cluster_width - 1:
+					neighbors.append(local + 1)
+				if not walls & 4 and y < cluster_height - 1:
+					neighbors.append(local + cluster_width)
+				if not walls & 8 and x > 0:
+					neighbors.append(local - 1)
+				adjacency.append(tuple(neighbors))
+
+		graph = (x0, y0, cluster_width, adjacency)
+		self.m_graphs[cluster] = graph
+
+		return graph
+
+	def to_local(self, graph, index):
+		'''
+		Method: to_local
+		Description: Converts a flat index to a local number within a cluster's graph.
+		Parameters: graph, index
+			graph: 4-Tuple - The local graph of the cluster
+			index: Int - The flat index of a cell within the cluster
+		Return: Int - The local number of the cell
+		'''
+
+		y, x = divmod(index, self.m_maze.m_grid.m_width)
+		return (y - graph[1]) * graph[2] + x - graph[0]
+
+	def to_global(self, graph, local):
+		'''
+		Method: to_global
+		Description: Converts a local number within a cluster's graph to a flat index.
+		Parameters: graph, local
+			graph: 4-Tuple - The local graph of the cluster
+			local: Int - The local number of a cell within the cluster
+		Return: Int - The flat index of the cell
+		'''
+
+		y, x = divmod(local, graph[2])
+		return (graph[1] + y) * self.m_maze.m_grid.m_width + graph[0] + x
+
+	def search_cluster(self, source_index, target_index=None, reverse=False):
+		'''
+		Method: search_cluster
+		Description: Performs a breadth-first search confined to the cluster of a cell, over the cluster's local graph.
+		Parameters: source_index, target_index=None, reverse=False
+			source_index: Int - The flat index of the cell to begin searching from
+			target_index: Int - The flat index of a cell at which to stop searching (the whole cluster is searched if None)
+			reverse: Boolean - Whether or not to follow the walls backwards (finding the distances to the source cell rather than from it)
+		Return: 3-Tuple - The search results
+			[0] = 4-Tuple - The local graph of the cluster
+			[1] = [Int] - The distance of each cell (-1 for unreached cells), indexed by local number
+			[2] = [Int] - The parent of each reached cell in the search, indexed by local number
+		'''
+
+		graph = self.get_graph(self.cluster_of(source_index))
+		adjacency = graph[3]
+		if reverse:
+			reverse_adjacency = [[] for _ in adjacency]
+			for local, neighbors in enumerate(adjacency):
+				for neighbor in neighbors:
+					reverse_adjacency[neighbor].append(local)
+			adjacency = reverse_adjacency
+
+		source = self.to_local(graph, source_index)
+		target = self.to_local(graph, target_index) if target_index is not None else -1
+		distances = [-1] * len(adjacency)
+		parents = [-1] * len(adjacency)
+		distances[source] = 0
+		parents[source] = source
+		queue = [source]
+		for current in queue:
+			if current == target:
+				break
+
+			distance = distances[current] + 1
+			for neighbor in adjacency[current]:
+				if distances[neighbor] < 0:
+					distances[neighbor] = distance
+					parents[neighbor] = current
+					queue.append(neighbor)
+
+		return (graph, distances, parents)
+
+	def cluster_of(self, index):
+		'''
+		Method: cluster_of
+		Description: Gets the cluster containing a cell.
+		Parameters: index
+			index: Int - The flat index of the cell
+		Return: Int - The index of the cluster (row-major)
+		'''
+
+		y, x = divmod(index, self.m_maze.m_grid.m_width)
+		return (y // self.m_cluster_size) * self.m_clusters_x + x // self.m_cluster_size
+
+	def cluster_range(self, cluster):
+		'''
+		Method: cluster_range
+		Description: Gets the span of a cluster, clipped to the maze.
+		Parameters: cluster
+			cluster: Int - The index of the cluster (row-major)
+		Return: 2-Tuple - The x-dimensional and y-dimensional (first, last) ranges of the cluster
+		'''
+
+		grid = self.m_maze.m_grid
+		cluster_y, cluster_x = divmod(cluster, self.m_clusters_x)
+		x0 = cluster_x * self.m_cluster_size
+		y0 = cluster_y * self.m_cluster_size
+
+		return ((x0, min(x0 + self.m_cluster_size, grid.m_width) - 1), (y0, min(y0 + self.m_cluster_size, grid.m_height) - 1))
+
+	def border_cells(self, cluster):
+		'''
+		Method: border_cells
+		Description: Gets the cells along the borders of a cluster.
+		Parameters: cluster
+			cluster: Int - The index of the cluster (row-major)
+		Return: Set(Int) - The flat indices of the cells along the borders of the cluster
+		'''
+
+		width = self.m_maze.m_grid.m_width
+		(x0, x1), (y0, y1) = self.cluster_range(cluster)
+
+		border = set(range(y0 * width + x0, y0 * width + x1 + 1))
+		border.update(range(y1 * width + x0, y1 * width + x1 + 1))
+		border.update(range(y0 * width + x0, y1 * width + x0 + 1, width))
+		border.update(range(y0 * width + x1, y1 * width + x1 + 1, width))
+
+		return border
\ No newline at end of file
@@ -0,0 +1,461 @@
+'''
+Module: junction
+Author: David Frye
+Description: Contains the JunctionGraph class, which contracts the corridors of a maze into weighted edges between its junctions and dead ends, along with the JunctionSolver which searches it.
+'''
+
+import array
+import heapq
+
+from grid import Grid
+from observer import MazeObserver
+from solver import Solver
+
+class JunctionGraph(MazeObserver):
+	'''
+	Class: JunctionGraph
+	Description: Represents a maze as a graph of its nodes (junctions, dead ends and isolated cells), joined by edges weighted with the length of the corridor between them. Corridor cells are never visited by a search, only walked when a path is expanded back into cells.
+		The maze is split into square blocks, each with its own graph in compact CSR form (an edge offset per node, and the target, weight and first direction of each edge). Corridors are cut where they cross a block border, so a mutation only rebuilds the blocks it touches, lazily at the next query.
+	'''
+
+	DEFAULT_BLOCK_SIZE = 64
+	# The opposite of each direction value.
+	OPPOSITE_DIRECTIONS = (2, 3, 0, 1)
+	# The way on through a corridor cell, indexed by its 4-bit wall mask and the direction value walked in through (-1 unless exactly two walls are open).
+	CORRIDOR_DIRECTIONS = tuple(tuple(([direction for direction in Solver.OPEN_DIRECTIONS[mask] if direction != (back + 2) % 4] + [-1])[0] if len(Solver.OPEN_DIRECTIONS[mask]) == 2 and (back + 2) % 4 in Solver.OPEN_DIRECTIONS[mask] else -1 for back in range(4)) for mask in range(16))
+
+	def __init__(self, maze, block_size=DEFAULT_BLOCK_SIZE):
+		'''
+		Method: __init__
+		Description: JunctionGraph constructor, which registers the graph as an observer of the maze.
+		Parameters: maze, block_size=DEFAULT_BLOCK_SIZE
+			maze: Maze - The maze to contract
+			block_size: Int - The side length of the square blocks the maze is split into
+		Return: None
+		'''
+
+		grid = maze.m_grid
+		self.m_maze = maze
+		self.m_block_size = block_size
+		self.m_blocks_x = (grid.m_width + block_size - 1) // block_size
+		self.m_blocks_y = (grid.m_height + block_size - 1) // block_size
+
+		# The node number of each cell within its block (-1 for corridor cells), indexed by flat index.
+		self.m_node_ids = array.array("i", [-1]) * grid.m_area
+		# Whether or not each cell is a dead end, which a search never needs to pass through, indexed by flat index.
+		self.m_dead_ends = bytearray(grid.m_area)
+		# The graph of each block: its nodes, edge offsets, edge targets, edge weights and edge first directions (None while the block is dirty).
+		self.m_blocks = [None] * (self.m_blocks_x * self.m_blocks_y)
+		self.m_dirty = set(range(len(self.m_blocks)))
+
+		maze.add_observer(self)
+
+	def detach(self):
+		'''
+		Method: detach
+		Description: Stops keeping the graph up to date, unregistering it as an observer.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		self.m_maze.remove_observer(self)
+
+	def on_mutation(self, maze, regions, kind):
+		'''
+		Method: on_mutation
+		Description: Marks every block touched by a mutation, to be rebuilt at the next query.
+		Parameters: maze, regions, kind
+			maze: Maze - The mutated maze
+			regions: [Region] - The regions containing every cell whose walls may have changed
+			kind: String - Maze.MUTATION_OPEN or Maze.MUTATION_CLOSE
+		Return: None
+		'''
+
+		block_size = self.m_block_size
+		for region in regions:
+			(x0, x1), (y0, y1) = region.m_range
+			for block_y in range(y0 // block_size, y1 // block_size + 1):
+				self.m_dirty.update(range(block_y * self.m_blocks_x + x0 // block_size, block_y * self.m_blocks_x + x1 // block_size + 1))
+
+	def update(self):
+		'''
+		Method: update
+		Description: Rebuilds every dirty block.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		for block in self.m_dirty:
+			self.build_block(block)
+		self.m_dirty = set()
+
+	def get_node_count(self):
+		'''
+		Method: get_node_count
+		Description: Gets the number of nodes of the graph.
+		Parameters: No parameters
+		Return: Int - The number of nodes
+		'''
+
+		self.update()
+
+		return sum(len(block[0]) for block in self.m_blocks)
+
+	def get_edge_count(self):
+		'''
+		Method: get_edge_count
+		Description: Gets the number of edges of the graph (each direction of a corridor counting separately).
+		Parameters: No parameters
+		Return: Int - The number of edges
+		'''
+
+		self.update()
+
+		return sum(len(block[2]) for block in self.m_blocks)
+
+	def get_dead_ends(self):
+		'''
+		Method: get_dead_ends
+		Description: Gets every dead end of the maze (the cells with a single open wall).
+		Parameters: No parameters
+		Return: [2-Tuple] - The positions of the dead ends
+		'''
+
+		return self.get_nodes_of_degree(1, 1)
+
+	def get_junctions(self):
+		'''
+		Method: get_junctions
+		Description: Gets every junction of the maze (the cells with three or more open walls).
+		Parameters: No parameters
+		Return: [2-Tuple] - The positions of the junctions
+		'''
+
+		return self.get_nodes_of_degree(3, 4)
+
+	def get_nodes_of_degree(self, minimum, maximum):
+		'''
+		Method: get_nodes_of_degree
+		Description: Gets every node with a number of open walls within the given bounds.
+		Parameters: minimum, maximum
+			minimum: Int - The fewest open walls
+			maximum: Int - The most open walls
+		Return: [2-Tuple] - The positions of the nodes
+		'''
+
+		self.update()
+
+		grid = self.m_maze.m_grid
+		return [grid.position(index) for block in self.m_blocks for index in block[0] if minimum <= len(self.open_directions(index)) <= maximum]
+
+	def find_path(self, start_index, end_index):
+		'''
+		Method: find_path
+		Description: Finds a shortest path between two cells with an A* search over the nodes of the graph guided by the Manhattan distance (which never exceeds the length of a corridor), never entering dead ends. A start or end cell inside a corridor is joined to the nodes at both ends of it.
+		Parameters: start_index, end_index
+			start_index: Int - The flat index of the cell to begin searching from
+			end_index: Int - The flat index of the cell to target in the search
+		Return: [Int] - The flat indices of the cells along the path (from start to end), or None if no path exists
+		'''
+
+		self.update()
+
+		if start_index == end_index:
+			return [start_index]
+
+		node_ids = self.m_node_ids
+		dead_ends = self.m_dead_ends
+
+		# The edges out of a corridor start cell, which may run straight into the end cell.
+		start_edges = None
+		if node_ids[start_index] < 0:
+			start_edges = []
+			for direction in self.open_directions(start_index):
+				target, weight = self.walk(start_index, direction, end_index)[:2]
+				if target >= 0:
+					start_edges.append((target, weight, direction))
+
+		# The edges into a corridor end cell, from the nodes at both ends of its corridor.
+		end_edges = {}
+		if node_ids[end_index] < 0:
+			for direction in self.open_directions(end_index):
+				target, weight, last_direction = self.walk(end_index, direction)
+				if target >= 0 and (target not in end_edges or weight < end_edges[target][0]):
+					end_edges[target] = (weight, self.OPPOSITE_DIRECTIONS[last_direction])
+
+		blocks = self.m_blocks
+		width = self.m_maze.m_grid.m_width
+		block_size = self.m_block_size
+		blocks_x = self.m_blocks_x
+
+		end_y, end_x = divmod(end_index, width)
+
+		distances = {start_index: 0}
+		parents = {start_index: (start_index, -1)}
+		heap = [(0, 0, start_index)]
+		while heap:
+			estimate, distance, current = heapq.heappop(heap)
+			if current == end_index:
+				return self.expand(parents, end_index)
+
+			# Skip stale heap entries.
+			if distance > distances[current]:
+				continue
+
+			if current == start_index and start_edges is not None:
+				edges = start_edges
+			else:
+				y, x = divmod(current, width)
+				nodes, offsets, targets, weights, directions = blocks[(y // block_size) * blocks_x + x // block_size]
+				node = node_ids[current]
+				edges = zip(targets[offsets[node]:offsets[node + 1]], weights[offsets[node]:offsets[node + 1]], directions[offsets[node]:offsets[node + 1]])
+			if current in end_edges:
+				edges = list(edges) + [(end_index,) + end_edges[current]]
+
+			for target, weight, direction in edges:
+				if dead_ends[target] and target != end_index:
+					continue
+				if target not in distances or distance + weight < distances[target]:
+					distances[target] = distance + weight
+					parents[target] = (current, direction)
+					target_y, target_x = divmod(target, width)
+					heapq.heappush(heap, (distance + weight + abs(target_x - end_x) + abs(target_y - end_y), distance + weight, target))
+
+		return None
+
+	def edges(self, index):
+		'''
+		Method: edges
+		Description: Gets the edges out of a node.
+		Parameters: index
+			index: Int - The flat index of the node
+		Return: [3-Tuple] - The flat index of the target node, the corridor length and the first direction value of each edge
+		'''
+
+		nodes, offsets, targets, weights, directions = self.m_blocks[self.block_of(index)]
+		node = self.m_node_ids[index]
+
+		return [(targets[edge], weights[edge], directions[edge]) for edge in range(offsets[node], offsets[node + 1])]
+
+	def expand(self, parents, index):
+		'''
+		Method: expand
+		Description: Expands the nodes of a search back into cells, walking each corridor from its first direction.
+		Parameters: parents, index
+			parents: Dict - The (parent node, first direction value) of each node reached by the search, keyed by flat index
+			index: Int - The flat index of the last node
+		Return: [Int] - The flat indices of the cells from the root of the search to the given node
+		'''
+
+		hops = []
+		while parents[index][0] != index:
+			hops.append((parents[index][0], parents[index][1], index))
+			index = parents[index][0]
+		hops.reverse()
+
+		path = [index]
+		for source, direction, target in hops:
+			path += self.walk(source, direction, target, True)
+
+		return path
+
+	def walk(self, index, direction, target_index=-1, record=False):
+		'''
+		Method: walk
+		Description: Walks a corridor from a cell in a direction until reaching a node or the target cell.
+		Parameters: index, direction, target_index=-1, record=False
+			index: Int - The flat index of the cell to walk from
+			direction: Int - The direction value of the first step
+			target_index: Int - The flat index of a cell to stop at, even inside the corridor
+			record: Boolean - Whether or not to return the cells walked rather than the end of the walk
+		Return: 3-Tuple - The flat index of the cell reached (-1 if the corridor loops without one), the number of steps and the direction value of the last step; or [Int] - The flat indices of the cells walked, if recording
+		'''
+
+		grid = self.m_maze.m_grid
+		cells = grid.m_cells
+		node_ids = self.m_node_ids
+		offsets = grid.m_offsets
+		corridor_directions = self.CORRIDOR_DIRECTIONS
+		walked = []
+		steps = 0
+
+		current = index
+		while True:
+			current += offsets[direction]
+			steps += 1
+			if record:
+				walked.append(current)
+			if node_ids[current] >= 0 or current == target_index:
+				break
+
+			# Corridor cells have two open walls: carry on through the one not walked in through (looking up the common case of no open outer walls).
+			if current == index:
+				current = -1
+				break
+			next_direction = corridor_directions[cells[current] & Grid.WALL_MASK][direction]
+			if next_direction < 0:
+				back = self.OPPOSITE_DIRECTIONS[direction]
+				forward = [next_direction for next_direction in self.open_directions(current) if next_direction != back]
+				if not forward:
+					current = -1
+					break
+				next_direction = forward[0]
+			direction = next_direction
+
+		if record:
+			return walked
+
+		return (current, steps, direction)
+
+	def build_block(self, block):
+		'''
+		Method: build_block
+		Description: Rebuilds the graph of a block. Every cell whose number of open walls is not two is a node, as is every cell with an open wall across the block border; each remaining loop of corridor cells gets a single node of its own. The corridors leaving each node are then walked to the nodes at their other ends.
+		Parameters: block
+			block: Int - The index of the block (row-major)
+		Return: None
+		'''
+
+		grid = self.m_maze.m_grid
+		width = grid.m_width
+		node_ids = self.m_node_ids
+		dead_ends = self.m_dead_ends
+		offsets = grid.m_offsets
+		block_y, block_x = divmod(block, self.m_blocks_x)
+		x0 = block_x * self.m_block_size
+		y0 = block_y * self.m_block_size
+		x1 = min(x0 + self.m_block_size, width) - 1
+		y1 = min(y0 + self.m_block_size, grid.m_height) - 1
+
+		nodes = []
+		corridors = []
+		for y in range(y0, y1 + 1):
+			for index in range(y * width + x0, y * width + x1 + 1):
+				directions = self.open_directions(index)
+				x = index - y * width
+				crosses = (0 in directions and y == y0) or (1 in directions and x == x1) or (2 in directions and y == y1) or (3 in directions and x == x0)
+				dead_ends[index] = len(directions) == 1
+				if len(directions) != 2 or crosses:
+					node_ids[index] = len(nodes)
+					nodes.append(index)
+				else:
+					node_ids[index] = -1
+					corridors.append(index)
+
+		# Walk every corridor out of every node, remembering the corridor cells passed.
+		walked = set()
+		edges = []
+		position = 0
+		while True:
+			while position < len(nodes):
+				index = nodes[position]
+				node_edges = []
+				for direction in self.open_directions(index):
+					neighbor = index + offsets[direction]
+					if not (x0 <= neighbor % width <= x1 and y0 <= neighbor // width <= y1):
+						node_edges.append((neighbor, 1, direction))
+						continue
+
+					cells = self.walk(index, direction, -1, True)
+					walked.update(cells)
+					if cells[-1] != index and node_ids[cells[-1]] >= 0:
+						node_edges.append((cells[-1], len(cells), direction))
+				edges.append(node_edges)
+				position += 1
+
+			# Give a node to a loop of corridor cells which no walk passed through.
+			loop = next((index for index in corridors if index not in walked and node_ids[index] < 0), None)
+			if loop is None:
+				break
+			node_ids[loop] = len(nodes)
+			nodes.append(loop)
+
+		edge_offsets = array.array("i", [0])
+		targets = array.array("i")
+		weights = array.array("i")
+		first_directions = bytearray()
+		for node_edges in edges:
+			for target, weight, direction in node_edges:
+				targets.append(target)
+				weights.append(weight)
+				first_directions.append(direction)
+			edge_offsets.append(len(targets))
+
+		self.m_blocks[block] = (array.array("i", nodes), edge_offsets, targets, weights, bytes(first_directions))
+
+	def open_directions(self, index):
+		'''
+		Method: open_directions
+		Description: Gets the direction values of the open walls of a cell which lead to another cell of the maze.
+		Parameters: index
+			index: Int - The flat index of the cell
+		Return: [Int] - The direction values of the open walls
+		'''
+
+		grid = self.m_maze.m_grid
+		y, x = divmod(index, grid.m_width)
+		directions = []
+		for direction in Solver.OPEN_DIRECTIONS[grid.m_cells[index] & Grid.WALL_MASK]:
+			if direction == 0:
+				if y == 0:
+					continue
+			elif direction == 1:
+				if x == grid.m_width - 1:
+					continue
+			elif direction == 2:
+				if y == grid.m_height - 1:
+					continue
+			elif x == 0:
+				continue
+			directions.append(direction)
+
+		return directions
+
+	def block_of(self, index):
+		'''
+		Method: block_of
+		Description: Gets the block containing a cell.
+		Parameters: index
+			index: Int - The flat index of the cell
+		Return: Int - The index of the block (row-major)
+		'''
+
+		y, x = divmod(index, self.m_maze.m_grid.m_width)
+		return (y // self.m_block_size) * self.m_blocks_x + x // self.m_block_size
+
+class JunctionSolver(Solver):
+	'''
+	Class: JunctionSolver
+	Description: Solves a maze with an A* search over its JunctionGraph, so that only junctions and dead ends are searched rather than every corridor cell. Finds a shortest path. The graph is kept up to date as the maze is mutated.
+	'''
+
+	def __init__(self, block_size=JunctionGraph.DEFAULT_BLOCK_SIZE):
+		'''
+		Method: __init__
+		Description: JunctionSolver constructor.
+		Parameters: block_size=JunctionGraph.DEFAULT_BLOCK_SIZE
+			block_size: Int - The side length of the square blocks the graph is split into
+		Return: None
+		'''
+
+		self.m_block_size = block_size
+		# The graph of the maze last solved (it is rebuilt if another maze is solved).
+		self.m_graph = None
+
+	def solve(self, maze, start_index, end_index):
+		'''
+		Method: solve
+		Description: Finds a path between the given start and end cells.
+		Parameters: maze, start_index, end_index
+			maze: Maze - The maze to solve
+			start_index: Int - The flat index of the cell to begin searching from
+			end_index: Int - The flat index of the cell to target in the search
+		Return: [Int] - The flat indices of the cells along the solution path (from start to end), or None if no solution is found
+		'''
+
+		if self.m_graph is None or self.m_graph.m_maze is not maze:
+			if self.m_graph is not None:
+				self.m_graph.detach()
+			self.m_graph = JunctionGraph(maze, self.m_block_size)
+
+		return self.m_graph.find_path(start_index, end_index)
\ No newline at end of file
@@ -4,16 +4,395 @@ Author: David Frye
 Description: Contains the Map class.
 '''
 
-import maze
-import player
+import random
+
+from maze import Maze
+from region import Region
+from utility import Direction
+from utility import derive_random
 
 class Map:
 	'''
+	Class: Map
+	Description: Represents a world: a maze along with the players inside of it. Players are kept in a spatial index of square buckets of cells, so that finding the players inside or near a region costs the buckets it overlaps and the players within them, rather than every player. Mutations made through the map avoid the cells players occupy.
 	'''
 
-	def __init__(self, maze=Maze(), player=Player()):
+	DEFAULT_BUCKET_SIZE = 16
+
+	def __init__(self, maze=None, bucket_size=DEFAULT_BUCKET_SIZE):
 		'''
+		Method: __init__
+		Description: Map constructor.
+		Parameters: maze=None, bucket_size=DEFAULT_BUCKET_SIZE
+			maze: Maze - The maze of the world (a new default maze if None)
+			bucket_size: Int - The side length of the spatial index's square buckets, in cells
+		Return: None
 		'''
 
+		if maze is None:
+			maze = Maze()
+
 		self.m_maze = maze
-		self.m_player = player
\ No newline at end of file
+		self.m_bucket_size = bucket_size
+		# The bucket key of every player on the map.
+		self.m_players = {}
+		# The players within each occupied bucket, keyed by bucket key (x-position // bucket size, y-position // bucket size).
+		self.m_buckets = {}
+
+	def add_player(self, player, position=None):
+		'''
+		Method: add_player
+		Description: Places a player on the map.
+		Parameters: player, position=None
+			player: Player - The player to place
+			position: 2-Tuple - The cell position to place the player at (the player's own position if None)
+		Return: None
+		'''
+
+		if player.m_map is not None:
+			raise ValueError("Player is already on a map")
+
+		if position is None:
+			position = player.m_position
+		if not self.m_maze.is_valid_cell_position(position):
+			raise ValueError("Player position " + str(position) + " lies outside of the maze")
+
+		player.m_map = self
+		player.m_position = position
+		key = self.bucket_key(position)
+		self.m_players[player] = key
+		self.m_buckets.setdefault(key, set()).add(player)
+		self.draw_cell(position)
+
+	def remove_player(self, player):
+		'''
+		Method: remove_player
+		Description: Takes a player off of the map.
+		Parameters: player
+			player: Player - The player to take off
+		Return: None
+		'''
+
+		key = self.m_players.pop(player)
+		self.remove_from_bucket(player, key)
+		player.m_map = None
+		self.draw_cell(player.m_position)
+
+	def move_player(self, player, position):
+		'''
+		Method: move_player
+		Description: Moves a player straight to the given cell, regardless of walls.
+		Parameters: player, position
+			player: Player - The player to move
+			position: 2-Tuple - The cell position to move the player to
+		Return: None
+		'''
+
+		if not self.m_maze.is_valid_cell_position(position):
+			raise ValueError("Player position " + str(position) + " lies outside of the maze")
+
+		old_position = player.m_position
+		player.m_position = position
+
+		# Only move the player between buckets when it crosses into another one.
+		old_key = self.m_players[player]
+		key = self.bucket_key(position)
+		if key != old_key:
+			self.remove_from_bucket(player, old_key)
+			self.m_buckets.setdefault(key, set()).add(player)
+			self.m_players[player] = key
+
+		self.draw_cell(old_position)
+		self.draw_cell(position)
+
+	def step_player(self, player, direction):
+		'''
+		Method: step_player
+		Description: Moves a player one cell in the given direction, if no wall stands in the way.
+		Parameters: player, direction
+			player: Player - The player to move
+			direction: Direction - The direction to move in
+		Return: Boolean - Whether or not the player moved
+		'''
+
+		maze = self.m_maze
+		position = player.m_position
+		offset = maze.direction_to_offset(direction)
+		target = (position[0] + offset[0], position[1] + offset[1])
+		if not maze.is_valid_cell_position(target) or maze.m_grid.get_wall(maze.m_grid.index(position), direction):
+			return False
+
+		self.move_player(player, target)
+		return True
+
+	def players_in(self, region):
+		'''
+		Method: players_in
+		Description: Finds every player inside the given region.
+		Parameters: region
+			region: Region - The region to search
+		Return: [Player] - The players inside the region
+		'''
+
+		region = self.m_maze.m_region.intersect(region)
+		if region is None:
+			return []
+
+		(x0, x1), (y0, y1) = region.m_range
+		size = self.m_bucket_size
+		(bx0, bx1), (by0, by1) = (x0 // size, x1 // size), (y0 // size, y1 // size)
+
+		# Look up the buckets the region overlaps, or walk the occupied buckets instead if there are fewer of them.
+		if (bx1 - bx0 + 1) * (by1 - by0 + 1) <= len(self.m_buckets):
+			buckets = [self.m_buckets.get((bx, by)) for by in range(by0, by1 + 1) for bx in range(bx0, bx1 + 1)]
+		else:
+			buckets = [bucket for (bx, by), bucket in self.m_buckets.items() if bx0 <= bx <= bx1 and by0 <= by <= by1]
+
+		# Filter the players of the buckets down to those inside the region.
+		players = []
+		for bucket in buckets:
+			if bucket:
+				players.extend([player for player in bucket if x0 <= player.m_position[0] <= x1 and y0 <= player.m_position[1] <= y1])
+
+		return players
+
+	def players_near(self, position, radius):
+		'''
+		Method: players_near
+		Description: Finds every player within the given number of cells of the given position along each axis (within the square centered on the position).
+		Parameters: position, radius
+			position: 2-Tuple - The cell position to search around
+			radius: Int - The greatest distance to search along each axis, in cells
+		Return: [Player] - The players near the position
+		'''
+
+		return self.players_in(Region((position[0] - radius, position[1] - radius), (2 * radius + 1, 2 * radius + 1)))
+
+	def occupied_regions(self, region=None, margin=0):
+		'''
+		Method: occupied_regions
+		Description: Constructs a region around each cell occupied by a player, for mutations to avoid.
+		Parameters: region=None, margin=0
+			region: Region - The region to find occupied cells for (the whole maze if None); cells whose margin reaches into the region count too
+			margin: Int - The number of cells around each occupied cell to avoid as well
+		Return: [Region] - A region for each distinct occupied cell, grown by the margin
+		'''
+
+		if region is None:
+			region = self.m_maze.m_region
+
+		positions = set([player.m_position for player in self.players_in(region.grow(margin))])
+		return [Region(position, (1, 1)).grow(margin) for position in sorted(positions)]
+
+	def exemptions(self, region=None, exemptions=None, margin=0):
+		'''
+		Method: exemptions
+		Description: Adds the regions occupied by players to a collection of exemptions, for mutating the maze directly (or through a MutationEngine) without touching any occupied cell.
+		Parameters: region=None, exemptions=None, margin=0
+			region: Region - The region to be mutated (the whole maze if None)
+			exemptions: Regions - A collection of regions for the mutation to avoid already
+			margin: Int - The number of cells around each occupied cell to avoid as well
+		Return: [Region] - The given exemptions, followed by the occupied regions
+		'''
+
+		return list(exemptions if exemptions is not None else []) + self.occupied_regions(region, margin)
+
+	def generate(self, region=None, exemptions=None, open_chance=Maze.DEFAULT_OPEN_CHANCE, generator=None, seed=None, margin=0):
+		'''
+		Method: generate
+		Description: Generates the maze within the provided bounds, avoiding the cells players occupy. Generation leaves exempt regions walled off from the cells it carves (but for an occasional plow), so passages are then carved from the players (see connect_occupied), keeping every player joined to the rest of the maze.
+		Parameters: region=None, exemptions=None, open_chance=Maze.DEFAULT_OPEN_CHANCE, generator=None, seed=None, margin=0
+			region: Region - A region for maze generation to span
+			exemptions: Regions - A collection of regions for maze generation to avoid
+			open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+			generator: Generator - The maze generation algorithm to use (a RecursiveBacktracker if None)
+			seed: Int - The seed from which the random stream of the region is derived (the maze's seed if None)
+			margin: Int - The number of cells around each occupied cell to avoid as well
+		Return: None
+		'''
+
+		occupied = self.occupied_regions(region, margin)
+		all_exemptions = list(exemptions if exemptions is not None else []) + occupied
+		self.m_maze.generate(region, all_exemptions, open_chance, generator, seed)
+		self.connect_occupied(region, occupied, all_exemptions, seed)
+
+	def connect_occupied(self, region, occupied, exemptions, seed=None):
+		'''
+		Method: connect_occupied
+		Description: Joins the players of the occupied regions to the rest of the maze. The cells of the given region and of the occupied regions are split into the parts joined by open walls (every cell outside of them counting as one part), and passages are carved from each player's part into neighboring parts (through occupied cells, or into visited, unexempt cells of the region) until it is joined to the main part: the one reaching outside of the region, or the largest if the region spans the whole maze.
+		Parameters: region, occupied, exemptions, seed=None
+			region: Region - The region whose cells the passages lead into (the whole maze if None)
+			occupied: [Region] - The occupied regions to connect
+			exemptions: Regions - A collection of regions for the passages not to lead into (besides the occupied regions)
+			seed: Int - The seed from which the random choice of each passage is derived (the maze's seed if None)
+		Return: None
+		'''
+
+		maze = self.m_maze
+		grid = maze.m_grid
+		width = grid.m_width
+		region = maze.m_region.intersect(region if region is not None else maze.m_region)
+		if region is None:
+			return
+		if seed is None:
+			seed = maze.m_seed
+
+		areas = [area for area in [maze.m_region.intersect(occupied_region) for occupied_region in occupied] if area is not None]
+		occupied_cells = set([grid.index(position) for area in areas for position in area.to_set()])
+		starts = sorted(set([grid.index(player.m_position) for area in areas for player in self.players_in(area)]))
+		if not starts:
+			return
+
+		(x0, x1), (y0, y1) = region.m_range
+		cells = set([y * width + x for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]) | occupied_cells
+
+		def neighbors(index):
+			x, y = grid.position(index)
+			for direction in list(Direction):
+				offset = maze.direction_to_offset(direction)
+				if maze.is_valid_cell_position((x + offset[0], y + offset[1])):
+					yield direction, (x + offset[0], y + offset[1]), index + offset[1] * width + offset[0]
+
+		# Label the parts of the cells joined by open walls, with part 0 standing for every cell outside of them.
+		labels = {}
+		members = [[]]
+		parents = [0]
+		outside = False
+		for index in sorted(cells):
+			if index in labels:
+				continue
+			label = len(members)
+			members.append([index])
+			parents.append(label)
+			labels[index] = label
+			for current in members[label]:
+				for direction, neighbor, neighbor_index in neighbors(current):
+					if grid.get_wall(current, direction):
+						continue
+					if neighbor_index not in cells:
+						parents[label] = 0
+						outside = True
+					elif neighbor_index not in labels:
+						labels[neighbor_index] = label
+						members[label].append(neighbor_index)
+
+		def find(label):
+			while parents[label] != label:
+				parents[label] = parents[parents[label]]
+				label = parents[label]
+			return label
+
+		main = 0 if outside else max(range(1, len(members)), key=lambda label: len(members[label]))
+
+		# Carve passages from each player's part into neighboring parts until it is joined to the main part.
+		for start in starts:
+			rng = derive_random(seed, "occupied", start % width, start // width) if seed is not None else random
+			while find(labels[start]) != find(main):
+				root = find(labels[start])
+				walls = []
+				for label in range(1, len(members)):
+					if find(label) != root:
+						continue
+					for index in members[label]:
+						for direction, neighbor, neighbor_index in neighbors(index):
+							if neighbor_index not in cells or find(labels[neighbor_index]) == root:
+								continue
+							if neighbor_index in occupied_cells or (grid.is_visited(neighbor_index) and not any(exemption.contains(neighbor) for exemption in exemptions)):
+								walls.append((index, direction, neighbor_index))
+				if not walls:
+					break
+
+				index, direction, neighbor_index = rng.choice(walls)
+				maze.set_wall(maze.get_cell(grid.position(index)), direction, False)
+				parents[root] = find(labels[neighbor_index])
+
+	def reset(self, region=None, exemptions=None, margin=0):
+		'''
+		Method: reset
+		Description: Resets the maze within the provided bounds, avoiding the cells players occupy.
+		Parameters: region=None, exemptions=None, margin=0
+			region: Region - A region for maze reset to span
+			exemptions: Regions - A collection of regions for maze reset to avoid
+			margin: Int - The number of cells around each occupied cell to avoid as well
+		Return: None
+		'''
+
+		self.m_maze.reset(region, self.exemptions(region, exemptions, margin))
+
+	def open(self, region=None, exemptions=None, open_border=True, margin=0):
+		'''
+		Method: open
+		Description: Opens the maze within the provided bounds, avoiding the cells players occupy.
+		Parameters: region=None, exemptions=None, open_border=True, margin=0
+			region: Region - A region for maze opening to span
+			exemptions: Regions - A collection of regions for maze opening to avoid
+			open_border: Boolean - Whether or not to open the walls on the border of the region
+			margin: Int - The number of cells around each occupied cell to avoid as well
+		Return: None
+		'''
+
+		self.m_maze.open(region, self.exemptions(region, exemptions, margin), open_border)
+
+	def bucket_key(self, position):
+		'''
+		Method: bucket_key
+		Description: Gets the key of the spatial index bucket containing the given cell.
+		Parameters: position
+			position: 2-Tuple - The cell position
+		Return: 2-Tuple - The bucket key
+		'''
+
+		return (position[0] // self.m_bucket_size, position[1] // self.m_bucket_size)
+
+	def remove_from_bucket(self, player, key):
+		'''
+		Method: remove_from_bucket
+		Description: Removes a player from a spatial index bucket, dropping the bucket once it is empty.
+		Parameters: player, key
+			player: Player - The player to remove
+			key: 2-Tuple - The key of the bucket holding the player
+		Return: None
+		'''
+
+		bucket = self.m_buckets[key]
+		bucket.discard(player)
+		if not bucket:
+			del self.m_buckets[key]
+
+	def draw_cell(self, position):
+		'''
+		Method: draw_cell
+		Description: Draws the symbol of a player occupying the given cell onto the maze's player overlay, or unmarks the cell if no player occupies it.
+		Parameters: position
+			position: 2-Tuple - The cell position
+		Return: None
+		'''
+
+		overlay = self.m_maze.get_overlay(Maze.OVERLAY_PLAYER)
+		index = self.m_maze.m_grid.index(position)
+		bucket = self.m_buckets.get(self.bucket_key(position), ())
+		occupant = next((player for player in bucket if player.m_position == position), None)
+		if occupant is None:
+			overlay.remove(index)
+		else:
+			overlay.set(index, occupant.m_symbol)
+
+	def get_maze(self):
+		'''
+		Method: get_maze
+		Description: Gets the maze of the world.
+		Parameters: No parameters
+		Return: Maze - The maze of the world
+		'''
+
+		return self.m_maze
+
+	def get_players(self):
+		'''
+		Method: get_players
+		Description: Gets every player on the map.
+		Parameters: No parameters
+		Return: [Player] - The players on the map
+		'''
+
+		return list(self.m_players)
\ No newline at end of file
@@ -0,0 +1,149 @@
+'''
+Module: mapped
+Author: David Frye
+Description: Contains the MappedMaze class, a maze whose cells live in a memory-mapped file.
+'''
+
+import mmap
+import struct
+
+from grid import Grid
+from maze import Maze
+from solver import SparseAStarSolver
+
+class MappedMaze(Maze):
+	'''
+	Class: MappedMaze
+	Description: Represents a maze whose cell bytes live in a memory-mapped file rather than in memory, for mazes larger than RAM. The grid reads and writes the mapping directly, so the operating system pages in only the rows being touched, and opening an existing maze reads nothing but its footer. The file holds the cell bytes in Grid's format from its first byte (so that they can be mapped without an offset), followed by the seed and a footer holding the size and scale.
+	'''
+
+	# The magic number and version in the footer of every mapped maze file.
+	MAGIC = b"DMAP"
+	VERSION = 1
+	# The footer (seed length, width, height, scale, version, magic), preceded by the seed bytes.
+	FOOTER = struct.Struct(">BIIIH4s")
+	# The number of bytes written at a time while filling a new file.
+	FILL_BLOCK_SIZE = 1 << 20
+
+	def __init__(self, path, size=None, scale=Maze.DEFAULT_SCALE, seed=None, writable=True):
+		'''
+		Method: __init__
+		Description: MappedMaze constructor, which either creates a new maze file (filled with unvisited cells) or maps an existing one.
+		Parameters: path, size=None, scale=Maze.DEFAULT_SCALE, seed=None, writable=True
+			path: String - The path of the maze file
+			size: 2-Tuple - The dimensional lengths of a new maze (an existing maze is opened if None)
+				[0] - Maze x-dimensional length
+				[1] - Maze y-dimensional length
+			scale: The printing scale of a new maze, used to determine spacing
+			seed: Int - The default seed for generation of a new maze
+			writable: Boolean - Whether or not changes to an existing maze are written to its file (always True for a new maze)
+		Return: None
+		'''
+
+		if size is not None:
+			self.m_file = open(path, "w+b")
+			self.create(size, scale, seed)
+			writable = True
+		else:
+			self.m_file = open(path, "r+b" if writable else "rb")
+			size, scale, seed = self.read_footer()
+		self.m_writable = writable
+
+		if size[0] * size[1] <= 0:
+			self.m_file.close()
+			raise ValueError("A mapped maze must contain at least one cell")
+
+		# The mapping of the cell bytes, which the grid uses as its storage.
+		self.m_map = mmap.mmap(self.m_file.fileno(), size[0] * size[1], access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+
+		super().__init__(size, scale, seed, self.m_map)
+
+	def create(self, size, scale, seed):
+		'''
+		Method: create
+		Description: Writes a new maze file of unvisited cells, a block at a time.
+		Parameters: size, scale, seed
+			size: 2-Tuple - The dimensional lengths of the maze
+			scale: The printing scale of the maze, used to determine spacing
+			seed: Int - The default seed for generation (None for no seed)
+		Return: None
+		'''
+
+		remaining = size[0] * size[1]
+		block = bytes([Grid.UNVISITED_CELL]) * min(self.FILL_BLOCK_SIZE, remaining)
+		while remaining > 0:
+			self.m_file.write(block[:remaining])
+			remaining -= len(block)
+
+		# Write the seed and the footer after the cells.
+		seed_bytes = b""
+		if seed is not None:
+			seed_bytes = seed.to_bytes((seed.bit_length() + 8) // 8, "big", signed=True)
+		self.m_file.write(seed_bytes)
+		self.m_file.write(self.FOOTER.pack(len(seed_bytes), size[0], size[1], scale, self.VERSION, self.MAGIC))
+		self.m_file.flush()
+
+	def read_footer(self):
+		'''
+		Method: read_footer
+		Description: Reads the size, scale and seed from the footer of an existing maze file.
+		Parameters: No parameters
+		Return: 3-Tuple - The footer
+			[0] = (2-Tuple) - The dimensional lengths of the maze
+			[1] = (Int) - The printing scale of the maze
+			[2] = (Int) - The default seed for generation (None if there is no seed)
+		'''
+
+		self.m_file.seek(-self.FOOTER.size, 2)
+		seed_length, width, height, scale, version, magic = self.FOOTER.unpack(self.m_file.read(self.FOOTER.size))
+		if magic != self.MAGIC:
+			self.m_file.close()
+			raise ValueError("Not a mapped maze file")
+		if version != self.VERSION:
+			self.m_file.close()
+			raise ValueError("Unsupported mapped maze file version " + str(version))
+
+		seed = None
+		if seed_length:
+			self.m_file.seek(-self.FOOTER.size - seed_length, 2)
+			seed = int.from_bytes(self.m_file.read(seed_length), "big", signed=True)
+
+		return ((width, height), scale, seed)
+
+	def solve_steps(self, start_cell_position, end_cell_position, breadcrumbs=False, solver=None, steps=0):
+		'''
+		Method: solve_steps
+		Description: Finds a path between the given start and end cells, resumably, with a SparseAStarSolver by default (whose memory use scales with the cells explored rather than the maze). Maze.solve goes through this too.
+		Parameters: start_cell_position, end_cell_position, breadcrumbs=False, solver=None, steps=0
+			start_cell_position: 2-Tuple - The cell position to begin searching from
+			end_cell_position: 2-Tuple - The cell position to target in the search
+			breadcrumbs: Boolean - Whether or not to change the content of cells along the solution path for pretty-printing
+			solver: Solver - The maze solving algorithm to use (a SparseAStarSolver if None)
+			steps: Int - The number of search steps in each slice of work (never yielding if 0)
+		Return: Generator - Yields None after each slice of work, returning a list of cell positions denoting the solution path, or None if no solution is found
+		'''
+
+		return (yield from super().solve_steps(start_cell_position, end_cell_position, breadcrumbs, solver if solver is not None else SparseAStarSolver(), steps))
+
+	def flush(self):
+		'''
+		Method: flush
+		Description: Writes every change to the cells back to the file.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		if self.m_writable:
+			self.m_map.flush()
+
+	def close(self):
+		'''
+		Method: close
+		Description: Flushes and unmaps the cells and closes the file. The maze cannot be used afterwards.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		self.flush()
+		self.m_map.close()
+		self.m_file.close()
\ No newline at end of file
@@ -4,13 +4,17 @@ Author: David Frye
 Description: Contains the Maze class.
 '''
 
-import collections
-import random
-import time
-
 from cell import Cell
+from generator import RecursiveBacktracker
+from grid import Grid
+from overlay import Overlay
 from region import Region
+from region import subtract_regions
+from renderer import Renderer
+from solver import BreadthFirstSolver
 from utility import Direction
+from utility import derive_random
+from utility import exhaust
 
 class Maze:
 	'''
@@ -22,16 +26,26 @@ class Maze:
 	DEFAULT_HEIGHT = 30
 	DEFAULT_SCALE = 2
 	DEFAULT_OPEN_CHANCE = 50
+	# The overlay layers, from the bottom to the top of the drawing order.
+	OVERLAY_PATH = "path"
+	OVERLAY_MARKERS = "markers"
+	OVERLAY_PLAYER = "player"
+	OVERLAY_ORDER = (OVERLAY_PATH, OVERLAY_MARKERS, OVERLAY_PLAYER)
+	# The kinds of wall mutation reported to observers.
+	MUTATION_OPEN = "open"
+	MUTATION_CLOSE = "close"
 
-	def __init__(self, size=(DEFAULT_WIDTH, DEFAULT_HEIGHT), scale=DEFAULT_SCALE):
+	def __init__(self, size=(DEFAULT_WIDTH, DEFAULT_HEIGHT), scale=DEFAULT_SCALE, seed=None, buffer=None):
 		'''
 		Method: __init__
 		Description: Maze constructor
-		Parameters: size=(DEFAULT_WIDTH, DEFAULT_HEIGHT), scale=DEFAULT_SCALE
+		Parameters: size=(DEFAULT_WIDTH, DEFAULT_HEIGHT), scale=DEFAULT_SCALE, seed=None, buffer=None
 			size: 2-Tuple - The dimensional lengths of the maze
 				[0] - Maze x-dimensional length
 				[1] - Maze y-dimensional length
 			scale: The printing scale of the maze, used to determine spacing
+			seed: Int - The default seed for generation (the global random module is used if None)
+			buffer: Buffer - A writable buffer of at least width * height bytes holding the cell bytes (such as a memory map), used in place of freshly allocated cells
 		Return: None
 		'''
 
@@ -39,79 +53,75 @@ class Maze:
 		self.m_size = size
 		# Scale must be an even number for proper pretty-printing.
 		self.m_scale = 2 * scale
-		# The individual cells of the maze.
-		self.m_cells = [[Cell(Cell.UNVISITED_STRING, (x, y)) for x in range(self.get_width())] for y in range(self.get_height())]
+		# The compact storage of the individual cells of the maze.
+		self.m_grid = Grid(self.m_size, buffer)
+		# The sparse overlay layers drawn over the cells, keyed by name.
+		self.m_overlays = dict([(name, Overlay(name)) for name in self.OVERLAY_ORDER])
 		# A region representing the span of the maze.
 		self.m_region = Region((0, 0), (self.get_width(), self.get_height()))
+		# The default seed for generation.
+		self.m_seed = seed
+		# The observers notified of every wall mutation.
+		self.m_observers = []
+		# The renderer used for pretty-printing, created on first use.
+		self.m_renderer = None
 
-	def generate(self, region=None, exemptions=None, open_chance=DEFAULT_OPEN_CHANCE):
+	def generate(self, region=None, exemptions=None, open_chance=DEFAULT_OPEN_CHANCE, generator=None, seed=None, processes=None):
 		'''
 		Method: generate
-		Description: Generate a maze within the provided bounds.
-		Parameters: region=None, exemptions=None, open_chance=DEFAULT_OPEN_CHANCE
-			region: Region - A region for maze generation to span
+		Description: Generate a maze within the provided bounds. Given a list of disjoint regions, they are generated in parallel across a pool of processes and their seams stitched afterwards (see parallel.generate_parallel).
+		Parameters: region=None, exemptions=None, open_chance=DEFAULT_OPEN_CHANCE, generator=None, seed=None, processes=None
+			region: Region or [Region] - A region for maze generation to span, or a list of disjoint regions to generate in parallel
 			exemptions: Regions - A collection of regions for maze generation to avoid
 			open_chance: The percent chance that each cell will 
+			generator: Generator - The maze generation algorithm to use (a RecursiveBacktracker if None)
+			seed: Int - The seed from which the random stream of the region is derived (the maze's seed if None). Generating the same region from the same seed and the same starting walls always carves the same walls, in any order and in any process.
+			processes: Int - The number of processes to generate a list of regions with (one per CPU if None)
 		Return: None
 		'''
 
-		# Ensure that valid boundaries are set.
-		if region is None:
-			region = Region((0, 0), (self.get_width(), self.get_height()))
-
-		# Construct a set of valid cells.
-		valid_cell = self.valid_cell_set(region, exemptions)
-
-		# If there are no valid cells for generation, return.
-		if not valid_cell:
+		if isinstance(region, (list, tuple)):
+			# Imported here, as the parallel module builds on this one.
+			from parallel import generate_parallel
+			generate_parallel(self, region, exemptions, open_chance, generator, seed, processes)
 			return
 
-		# Randomly choose a starting cell from the valid cells.
-		start_cell = random.sample(valid_cell, 1)[0]
-
-		# Visit the starting cell and push it onto the cell stack.
-		self.trailblaze(start_cell, None)
-		cell_stack = [start_cell]
-
-		# Crawl the entire maze.
-		while cell_stack:
-
-			# Grab the top cell from the cell stack.
-			current_cell = cell_stack[-1]
-
-			# Initialize the list of travel directions.
-			directions = set([Direction(x) for x in range(0, 4)])
-			while True:
-
-				# If all directions have been tried, backtrack through the cell stack.
-				if not directions:
-					cell_stack.pop()
-					break
+		exhaust(self.generate_steps(region, exemptions, open_chance, generator, seed))
 
-				# Find a valid direction to trailblaze in.
-				direction = random.sample(directions, 1)[0]
-
-				# Attempt to trailblaze to the neighboring cell.
-				target = self.trailblaze(current_cell, direction, region, exemptions)
+	def generate_steps(self, region=None, exemptions=None, open_chance=DEFAULT_OPEN_CHANCE, generator=None, seed=None, steps=0):
+		'''
+		Method: generate_steps
+		Description: Generate a maze within the provided bounds, resumably, yielding after each slice of work so that generation can be interleaved with other work. Observers are notified once the whole region has been generated, and nothing else may mutate the region in the meantime.
+		Parameters: region=None, exemptions=None, open_chance=DEFAULT_OPEN_CHANCE, generator=None, seed=None, steps=0
+			region: Region - A region for maze generation to span
+			exemptions: Regions - A collection of regions for maze generation to avoid
+			open_chance: The percent chance that each cell will 
+			generator: Generator - The maze generation algorithm to use (a RecursiveBacktracker if None)
+			seed: Int - The seed from which the random stream of the region is derived (the maze's seed if None)
+			steps: Int - The number of generation steps in each slice of work (never yielding if 0)
+		Return: Generator - Yields None after each slice of work
+		'''
 
-				# If the trailblaze was successful, move on to the next cell, opening up the maze in the process if desired.
-				if target is not None:
+		# Ensure that valid boundaries are set.
+		if region is None:
+			region = Region((0, 0), (self.get_width(), self.get_height()))
 
-					# Add the next cell to the cell stack.
-					cell_stack.append(target)
+		# Default to the recursive backtracker.
+		if generator is None:
+			generator = RecursiveBacktracker()
 
-					# Open up the maze by plowing through walls at random.
-					if random.randint(1, 100) <= open_chance:
-						direction = random.sample(directions, 1)[0]
-						if direction is not None:
-							neighbor = self.get_neighbor_cell(current_cell, direction)
-							if neighbor is not None and neighbor.is_visited():
-								self.set_wall(current_cell, direction, False)
+		# Derive an independent random stream for the region, if seeded.
+		if seed is None:
+			seed = self.m_seed
+		if seed is not None:
+			(x0, x1), (y0, y1) = region.m_range
+			generator = generator.with_random(derive_random(seed, "generate", x0, y0, x1, y1))
 
-					break
+		self.prepare([region], self.MUTATION_OPEN)
+		yield from generator.generate_steps(self, region, exemptions, open_chance, steps)
 
-				# If direction is invalid, remove it before trying again.
-				directions.remove(direction)
+		# Generation only ever carves, never raises walls.
+		self.notify([region], self.MUTATION_OPEN)
 
 	def trailblaze(self, source_cell, direction=None, region=None, exemptions=None):
 		'''
@@ -172,39 +182,54 @@ class Maze:
 		if region is None:
 			region = Region((0, 0), (self.get_width(), self.get_height()))
 
-		# Reset all cells that do not fall inside any of the provided exempt ranges.
-		for row in self.m_cells:
+		grid = self.m_grid
+		width = self.get_width()
 
-			# If the current row is inside the reset boundary, check for cells to reset inside that row.
-			for cell in row:
-				exempt = False
+		# Only cells inside both the maze and the reset boundary are touched.
+		region = self.m_region.intersect(region)
+		if region is None:
+			return
+		self.prepare([region], self.MUTATION_CLOSE)
 
-				# If the current cell is outside the reset boundary, move on to the next cell.
-				if not region.contains(cell.m_position):
+		# Reset the boundary walls of the provided exempt ranges by walking only their perimeters (an exempt cell only has the borders of the exemptions up to and including the first one containing it reset).
+		if exemptions is not None:
+			for i, exemption in enumerate(exemptions):
+				overlap = exemption.intersect(region)
+				if overlap is None:
 					continue
 
-				# Check for the inclusion of each cell in each provided exempt range.
-				if exemptions is not None:
-					for exemption in exemptions:
-
-						# Reset the boundary walls of the provided exempt ranges.
-						border_directions = exemption.on_border(cell.m_position)
-						for border_direction in border_directions:
-							self.set_wall(cell, border_direction, True)
-
-						# If the cell falls inside any of the provided exempt ranges, do not reset it.
-						if exemption.contains(cell.m_position):
-							exempt = True
-							break
-
-					# Do not reset exempt cells.
-					if exempt:
-						continue
-
-				# Completely reset non-exempt cells.
-				self.unvisit(cell)
-				for direction in list(Direction):
-					self.set_wall(cell, direction, True)
+				(x0, x1), (y0, y1) = overlap.m_range
+				perimeter = []
+				if y0 == exemption.m_range[1][0]:
+					perimeter += [((x, y0), Direction.NORTH) for x in range(x0, x1 + 1)]
+				if x1 == exemption.m_range[0][1]:
+					perimeter += [((x1, y), Direction.EAST) for y in range(y0, y1 + 1)]
+				if y1 == exemption.m_range[1][1]:
+					perimeter += [((x, y1), Direction.SOUTH) for x in range(x0, x1 + 1)]
+				if x0 == exemption.m_range[0][0]:
+					perimeter += [((x0, y), Direction.WEST) for y in range(y0, y1 + 1)]
+
+				for position, border_direction in perimeter:
+					if not any(earlier.contains(position) for earlier in exemptions[:i]):
+						grid.set_wall(grid.index(position), border_direction, True)
+
+		# Completely reset non-exempt cells a row slice at a time, then raise the shared walls of the neighbors just outside of each reset range.
+		valid_regions = self.valid_regions(region, exemptions)
+		for valid_region in valid_regions:
+			(x0, x1), (y0, y1) = valid_region.m_range
+			for y in range(y0, y1 + 1):
+				grid.fill(y * width + x0, y * width + x1 + 1, Grid.UNVISITED_CELL)
+
+			if y0 > 0:
+				grid.set_wall_span((y0 - 1) * width + x0, (y0 - 1) * width + x1 + 1, Direction.SOUTH, True)
+			if y1 < self.get_height() - 1:
+				grid.set_wall_span((y1 + 1) * width + x0, (y1 + 1) * width + x1 + 1, Direction.NORTH, True)
+			if x0 > 0:
+				grid.set_wall_span(y0 * width + x0 - 1, y1 * width + x0, Direction.EAST, True, width)
+			if x1 < width - 1:
+				grid.set_wall_span(y0 * width + x1 + 1, y1 * width + x1 + 2, Direction.WEST, True, width)
+
+		self.notify([region], self.MUTATION_CLOSE)
 
 	def open(self, region=None, exemptions=None, open_border=True):
 		'''
@@ -220,117 +245,179 @@ class Maze:
 		if region is None:
 			region = Region((0, 0), (self.get_width(), self.get_height()))
 
-		# Construct a set of valid cells.
-		valid_cells = self.valid_cell_set(region, exemptions)
-
-		# Visit all valid cells and open the walls as necessary (region borders only open if open_border is True).
-		for cell in valid_cells:
-			cell.visit()
-			border_directions = region.on_border(cell.m_position)
-			for direction in list(Direction):
-
-				# Ensure that the border is allowed to be destroyed.
-				if (self.get_neighbor_cell(cell, direction) is not None) and (open_border) or (direction not in border_directions):
-					self.set_wall(cell, direction, False)
-
-
-	def solve(self, start_cell_position, end_cell_position, breadcrumbs=False):
+		grid = self.m_grid
+		cells = grid.m_cells
+		width = self.get_width()
+		height = self.get_height()
+
+		# Visit all valid cells and destroy all of their walls a row slice at a time, then patch up the edges of each range (region borders only open if open_border is True).
+		valid_regions = self.valid_regions(region, exemptions)
+		self.prepare(valid_regions, self.MUTATION_OPEN)
+		for valid_region in valid_regions:
+			(x0, x1), (y0, y1) = valid_region.m_range
+			for y in range(y0, y1 + 1):
+				start = y * width + x0
+				end = y * width + x1 + 1
+				edges = [(start, Direction.WEST, (x0, y)), (end - 1, Direction.EAST, (x1, y))]
+				if y == y0:
+					edges += [(start + x, Direction.NORTH, (x0 + x, y)) for x in range(end - start)]
+				if y == y1:
+					edges += [(start + x, Direction.SOUTH, (x0 + x, y)) for x in range(end - start)]
+
+				previous_cells = bytes(cells[start:end])
+				grid.fill(start, end, Grid.OPEN_CELL)
+
+				for index, direction, position in edges:
+					neighbor_index = grid.neighbor(index, direction)
+
+					# Ensure that the border is allowed to be destroyed, restoring the previous wall otherwise.
+					if (neighbor_index >= 0) and (open_border) or (direction not in region.on_border(position)):
+						if neighbor_index >= 0:
+							grid.set_wall_side(neighbor_index, Direction.get_opposite(direction), False)
+					else:
+						cells[index] |= previous_cells[index - start] & Grid.WALL_BITS[direction.value]
+
+		self.notify(valid_regions, self.MUTATION_OPEN)
+
+	def solve(self, start_cell_position, end_cell_position, breadcrumbs=False, solver=None):
 		'''
 		Method: solve
 		Description: Finds a path between the given start and end cells.
-		Parameters: start_cell_position, end_cell_position, breadcrumbs=False
+		Parameters: start_cell_position, end_cell_position, breadcrumbs=False, solver=None
 			start_cell_position: 2-Tuple - The cell position to begin searching from
 			end_cell_position: 2-Tuple - The cell position to target in the search
 			breadcrumbs: Boolean - Whether or not to change the content of cells along the solution path for pretty-printing
-		Return: [Cell] - A list of cells denoting the solution path, or None if no solution is found
+			solver: Solver - The maze solving algorithm to use (a BreadthFirstSolver if None)
+		Return: [2-Tuple] - A list of cell positions denoting the solution path, or None if no solution is found
+		'''
+
+		return exhaust(self.solve_steps(start_cell_position, end_cell_position, breadcrumbs, solver))
+
+	def solve_steps(self, start_cell_position, end_cell_position, breadcrumbs=False, solver=None, steps=0):
+		'''
+		Method: solve_steps
+		Description: Finds a path between the given start and end cells, resumably, yielding after each slice of work so that solving can be interleaved with other work. The maze must not be mutated in the meantime.
+		Parameters: start_cell_position, end_cell_position, breadcrumbs=False, solver=None, steps=0
+			start_cell_position: 2-Tuple - The cell position to begin searching from
+			end_cell_position: 2-Tuple - The cell position to target in the search
+			breadcrumbs: Boolean - Whether or not to change the content of cells along the solution path for pretty-printing
+			solver: Solver - The maze solving algorithm to use (a BreadthFirstSolver if None)
+			steps: Int - The number of search steps in each slice of work (never yielding if 0)
+		Return: Generator - Yields None after each slice of work, returning a list of cell positions denoting the solution path, or None if no solution is found
 		'''
 
 		# Reset any residual solution breadcrumb trails.
-		for row in self.m_cells:
-			for cell in row:
-				if self.get_cell_content(cell.m_position) == "*":
-					self.set_cell_content(cell.m_position, " ")
+		path_overlay = self.get_overlay(self.OVERLAY_PATH)
+		path_overlay.clear()
 
 		# If the start and end positions are the same, return the one cell as the entire solution path list.
 		if start_cell_position == end_cell_position:
 			return [start_cell_position]
 
-		# Ensure that the starting cell position is a valid cell.
-		start_cell = self.get_cell(start_cell_position)
-		if start_cell is None:
+		# Ensure that the starting and ending cell positions are valid cells.
+		if not self.is_valid_cell_position(start_cell_position) or not self.is_valid_cell_position(end_cell_position):
 			return None
 
-		# Enqueue the starting cell into the cell queue.
-		cell_queue = collections.deque([start_cell])
-		# Maintain traversal pathways throughout the maze.
-		pathways = {}
+		# Default to the breadth-first search.
+		if solver is None:
+			solver = BreadthFirstSolver()
 
-		# Crawl the entire maze for as long as the end cell is not found.
-		while cell_queue:
+		path = yield from solver.solve_steps(self, self.m_grid.index(start_cell_position), self.m_grid.index(end_cell_position), steps)
+		if path is None:
+			return None
 
-			# Grab the first cell from the cell queue.
-			current_cell = cell_queue.popleft()
+		# If breadcrumbs are enabled, leave breadcrumbs along the final pathway.
+		if breadcrumbs:
+			for index in path:
+				path_overlay.set(index, "*")
 
-			# If the end cell has been found, perform a backtrace and return the solution path.
-			if current_cell.m_position == end_cell_position:
+		return [self.m_grid.position(index) for index in path]
+
+	def print_maze(self, outfile=None):
+		'''
+		Method: print_maze
+		Description: Pretty-prints the maze to a file, re-rendering only the rows which changed since it was last printed.
+		Parameters: outfile=None
+			outfile: File - The text file (or buffer) to write to (maze.txt if None)
+		Return: None
+		'''
 
-				final_pathway = []
+		if self.m_renderer is None:
+			self.m_renderer = Renderer(self)
 
-				# Backtrace to the starting cell.
-				while current_cell.m_position != start_cell_position:
+		if outfile is None:
+			with open("maze.txt", "w") as outfile:
+				self.m_renderer.render(outfile)
+		else:
+			self.m_renderer.render(outfile)
 
-					# Add the current cell to the final pathway.
-					final_pathway.append(current_cell)
+	def add_observer(self, observer):
+		'''
+		Method: add_observer
+		Description: Registers an observer to be notified of every wall mutation.
+		Parameters: observer
+			observer: MazeObserver - The observer to register
+		Return: None
+		'''
 
-					# Backtrace to the previous cell.
-					current_cell = pathways[current_cell]
+		self.m_observers.append(observer)
 
-				# Add the starting cell to the final pathway.
-				final_pathway.append(current_cell)
+	def remove_observer(self, observer):
+		'''
+		Method: remove_observer
+		Description: Unregisters an observer, if it is registered.
+		Parameters: observer
+			observer: MazeObserver - The observer to unregister
+		Return: None
+		'''
 
-				# Reverse the pathway due to its formation during backtracing.
-				final_pathway.reverse()
+		if observer in self.m_observers:
+			self.m_observers.remove(observer)
 
-				# If breadcrumbs are enabled, leave breadcrumbs along the final pathway.
-				if breadcrumbs:
-					for cell in final_pathway:
-						cell.set_content("*")
+	def prepare(self, regions, kind):
+		'''
+		Method: prepare
+		Description: Notifies every observer that the walls within the given regions are about to be mutated, growing and clipping each region as notify does.
+		Parameters: regions, kind
+			regions: Regions - A collection of regions containing every cell about to be mutated
+			kind: String - MUTATION_OPEN if walls will only be knocked down, and MUTATION_CLOSE if any may be raised
+		Return: None
+		'''
 
-				return final_pathway
+		if not self.m_observers:
+			return
 
-			# Add all accessible neighbor cells to the cell queue.
-			accessible_neighbors = self.get_accessible_neighbor_cells(current_cell)
-			for neighbor in accessible_neighbors:
-				if (neighbor is not None) and (neighbor not in pathways):
-					cell_queue.append(neighbor)
-					pathways[neighbor] = current_cell
+		mutated_regions = self.affected_regions(regions)
+		for observer in list(self.m_observers):
+			observer.before_mutation(self, mutated_regions, kind)
 
-	def print_maze(self):
+	def notify(self, regions, kind):
 		'''
-		Method: print_maze
-		Description: Pretty-prints the maze to a file.
-		Parameters: No parameters
+		Method: notify
+		Description: Notifies every observer that the walls within the given regions have been mutated. Each region is grown by a cell, covering the shared walls of the neighbors just outside of it, and clipped to the maze.
+		Parameters: regions, kind
+			regions: Regions - A collection of regions containing every mutated cell
+			kind: String - MUTATION_OPEN if walls were only knocked down, and MUTATION_CLOSE if any may have been raised
 		Return: None
 		'''
 
-		with open("maze.txt", "w") as outfile:
-			# Print maze header.
-			outfile.write("Maze (" + str(self.get_width()) + " x " + str(self.get_height()) + "):\n")
-			for row in self.m_cells:
-				# Print the rows between the cells.
-				for cell in row:
-					outfile.write(Cell.WALL_VERTICAL_STRING) if cell.m_walls.get(Direction.WEST) else outfile.write(Cell.WALL_HORIZONTAL_STRING)
-					outfile.write(self.m_scale * Cell.WALL_HORIZONTAL_STRING) if cell.m_walls.get(Direction.NORTH) else outfile.write(self.m_scale * " ")
-				outfile.write(Cell.WALL_VERTICAL_STRING)
-				outfile.write("\n")
-				# Print the rows containing the cells.
-				for cell in row:
-					outfile.write(Cell.WALL_VERTICAL_STRING + " ") if cell.m_walls.get(Direction.WEST) else outfile.write("  ")
-					outfile.write((((self.m_scale - 1) // 2) * " ") + cell.m_content + (((self.m_scale - 1) // 2) * " "))
-				outfile.write(Cell.WALL_VERTICAL_STRING)
-				outfile.write("\n")
-			# Print bottom maze border.
-			outfile.write(Cell.WALL_VERTICAL_STRING + (((self.m_scale + 1) * self.get_width() - 1) * Cell.WALL_HORIZONTAL_STRING) + Cell.WALL_VERTICAL_STRING + "\n")
+		if not self.m_observers:
+			return
+
+		mutated_regions = self.affected_regions(regions)
+		for observer in list(self.m_observers):
+			observer.on_mutation(self, mutated_regions, kind)
+
+	def affected_regions(self, regions):
+		'''
+		Method: affected_regions
+		Description: Grows each of the given regions by a cell, covering the shared walls of the neighbors just outside of it, and clips it to the maze.
+		Parameters: regions
+			regions: Regions - A collection of regions containing every mutated cell
+		Return: [Region] - The grown and clipped regions (omitting those lying outside of the maze)
+		'''
+
+		return [mutated_region for mutated_region in [self.m_region.intersect(region.grow(1)) for region in regions] if mutated_region is not None]
 
 	def visit(self, cell):
 		'''
@@ -393,10 +480,7 @@ class Maze:
 		Return: Boolean - Whether or not the given position is a valid cell within the maze
 		'''
 
-		if position in self.m_region.to_set():
-			return True
-		else:
-			return False
+		return self.m_region.contains(position)
 
 	def valid_cell_set(self, region, exemptions):
 		'''
@@ -408,12 +492,40 @@ class Maze:
 		Return: Set([Cell]) - A set of valid cells (cells that are in the intersection of the maze cell set and the region cell set, subtracting those in the exempt region sets)
 		'''
 
-		valid_cell_positions = self.m_region.to_set() & region.to_set()
-		if exemptions is not None:
-			for exemption in exemptions:
-				valid_cell_positions -= exemption.to_set()
+		return set([Cell(self, self.m_grid.position(x)) for x in self.valid_index_set(region, exemptions)])
+
+	def valid_index_set(self, region, exemptions):
+		'''
+		Method: valid_index_set
+		Description: Constructs a set of valid flat cell indices (cells that are in the intersection of the maze cell set and the region cell set, subtracting those in the exempt region sets).
+		Parameters: region, exemptions
+			region: Region - A region of cells to intersect with the cells of the maze
+			exemptions: Regions - A collection of regions to subtract from the valid cell set
+		Return: Set([Int]) - A set of valid flat cell indices
+		'''
+
+		valid_indices = set([])
+		for valid_region in self.valid_regions(region, exemptions):
+			for y in valid_region.get_range_y():
+				valid_indices.update(range(self.m_grid.index((valid_region.m_range[0][0], y)), self.m_grid.index((valid_region.m_range[0][1], y)) + 1))
+
+		return valid_indices
+
+	def valid_regions(self, region, exemptions):
+		'''
+		Method: valid_regions
+		Description: Constructs a list of disjoint regions covering the valid cells (cells that are in the intersection of the maze region and the given region, subtracting the exempt regions).
+		Parameters: region, exemptions
+			region: Region - A region to intersect with the region of the maze
+			exemptions: Regions - A collection of regions to subtract from the valid regions
+		Return: [Region] - A list of disjoint regions covering the valid cells
+		'''
+
+		valid_region = self.m_region.intersect(region)
+		if valid_region is None:
+			return []
 
-		return set([self.get_cell(x) for x in valid_cell_positions])
+		return subtract_regions([valid_region], exemptions)
 
 	def get_accessible_neighbor_cells(self, source_cell):
 		'''
@@ -448,7 +560,7 @@ class Maze:
 	def get_cell(self, position):
 		'''
 		Method: get_cell
-		Description: Gets the Cell at a given position, transposing column-major positional input into row-major positional input.
+		Description: Gets a view of the Cell at a given position.
 		Parameters: position
 			position: 2-Tuple - A position value
 				[0] = The x-position
@@ -457,7 +569,7 @@ class Maze:
 		'''
 
 		if self.is_valid_cell_position(position):
-			return self.m_cells[position[1]][position[0]]
+			return Cell(self, position)
 		else:
 			return None
 
@@ -472,7 +584,35 @@ class Maze:
 		Return: String - A string visually representing the cell
 		'''
 
-		return self.get_cell(position).get_content()
+		return self.get_index_content(self.m_grid.index(position))
+
+	def get_index_content(self, index):
+		'''
+		Method: get_index_content
+		Description: Gets the cell content of the cell at the given flat index.
+		Parameters: index
+			index: Int - A flat cell index
+		Return: String - A string visually representing the cell
+		'''
+
+		# The topmost overlay marking the cell takes precedence.
+		for name in reversed(self.OVERLAY_ORDER):
+			content = self.m_overlays[name].get(index)
+			if content is not None:
+				return content
+
+		return Cell.VISITED_STRING if self.m_grid.is_visited(index) else Cell.UNVISITED_STRING
+
+	def get_overlay(self, name):
+		'''
+		Method: get_overlay
+		Description: Gets the overlay layer of the given name.
+		Parameters: name
+			name: String - The name of the layer (one of OVERLAY_ORDER)
+		Return: Overlay - The overlay layer of the given name
+		'''
+
+		return self.m_overlays[name]
 
 	def get_height(self):
 		'''
@@ -494,7 +634,7 @@ class Maze:
 		Return: Boolean - Whether the wall exists or not
 		'''
 
-		return source_cell.get_wall(direction)
+		return self.m_grid.get_wall(source_cell.m_index, direction)
 
 	def get_width(self):
 		'''
@@ -518,7 +658,7 @@ class Maze:
 		Return: None
 		'''
 
-		self.get_cell(position).set_content(value)
+		self.get_overlay(self.OVERLAY_MARKERS).set(self.m_grid.index(position), value)
 
 	def set_height(self, height):
 		'''
@@ -542,14 +682,11 @@ class Maze:
 		Return: None
 		'''
 
-		# Modify wall on the given source_cell's side.
+		# Modify both the given source_cell's side and the shared side of the neighbor cell in the given direction.
 		if self.is_valid_cell_position(source_cell.m_position):
-			source_cell.set_wall(direction, value)
-
-		# Modify shared wall of the neighbor cell in the given direction.
-		neighbor_cell = self.get_neighbor_cell(source_cell, direction)
-		if neighbor_cell is not None and self.is_valid_cell_position(neighbor_cell.m_position):
-			neighbor_cell.set_wall(Direction.get_opposite(direction), value)
+			self.prepare([Region(source_cell.m_position, (1, 1))], self.MUTATION_CLOSE if value else self.MUTATION_OPEN)
+			self.m_grid.set_wall(source_cell.m_index, direction, value)
+			self.notify([Region(source_cell.m_position, (1, 1))], self.MUTATION_CLOSE if value else self.MUTATION_OPEN)
 
 	def set_width(self, width):
 		'''
@@ -0,0 +1,37 @@
+'''
+Module: observer
+Author: David Frye
+Description: Contains the MazeObserver class.
+'''
+
+class MazeObserver:
+	'''
+	Class: MazeObserver
+	Description: Represents a structure derived from a maze (such as a tracked path or an index), which is notified of every mutation of the maze's walls so that it can be kept up to date incrementally.
+	'''
+
+	def before_mutation(self, maze, regions, kind):
+		'''
+		Method: before_mutation
+		Description: Called before the walls within the given regions of the maze are mutated, with the same regions and kind as the on_mutation call which follows. Does nothing unless overridden.
+		Parameters: maze, regions, kind
+			maze: Maze - The maze about to be mutated
+			regions: [Region] - The regions containing every cell whose walls may change (clipped to the maze)
+			kind: String - Maze.MUTATION_OPEN if walls will only be knocked down, and Maze.MUTATION_CLOSE if any may be raised
+		Return: None
+		'''
+
+		pass
+
+	def on_mutation(self, maze, regions, kind):
+		'''
+		Method: on_mutation
+		Description: Called after the walls within the given regions of the maze have been mutated. Does nothing unless overridden.
+		Parameters: maze, regions, kind
+			maze: Maze - The mutated maze
+			regions: [Region] - The regions containing every cell whose walls may have changed (clipped to the maze)
+			kind: String - Maze.MUTATION_OPEN if walls were only knocked down, and Maze.MUTATION_CLOSE if any may have been raised
+		Return: None
+		'''
+
+		pass
\ No newline at end of file
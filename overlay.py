@@ -0,0 +1,125 @@
+'''
+Module: overlay
+Author: David Frye
+Description: Contains the Overlay class.
+'''
+
+class Overlay:
+	'''
+	Class: Overlay
+	Description: Represents a sparse layer of cell content (such as breadcrumbs, labels or players) drawn over a maze, independently of the state of its cells. Only marked cells are stored, so clearing costs O(number of marked cells).
+	'''
+
+	def __init__(self, name):
+		'''
+		Method: __init__
+		Description: Overlay constructor.
+		Parameters: name
+			name: String - The name of the layer
+		Return: None
+		'''
+
+		self.m_name = name
+		# The content of each marked cell, keyed by flat cell index.
+		self.m_marks = {}
+		# The sets collecting the flat index of every cell whose content changes (registered by change logs).
+		self.m_change_sets = []
+
+	def get(self, index):
+		'''
+		Method: get
+		Description: Gets the content marked on the given cell.
+		Parameters: index
+			index: Int - The flat index of the cell
+		Return: String - The content marked on the cell, or None if it is unmarked
+		'''
+
+		return self.m_marks.get(index)
+
+	def set(self, index, content):
+		'''
+		Method: set
+		Description: Marks the given cell with the given content.
+		Parameters: index, content
+			index: Int - The flat index of the cell
+			content: String - A string visually representing the cell
+		Return: None
+		'''
+
+		self.m_marks[index] = content
+		for change_set in self.m_change_sets:
+			change_set.add(index)
+
+	def remove(self, index):
+		'''
+		Method: remove
+		Description: Unmarks the given cell, if it is marked.
+		Parameters: index
+			index: Int - The flat index of the cell
+		Return: None
+		'''
+
+		self.m_marks.pop(index, None)
+		for change_set in self.m_change_sets:
+			change_set.add(index)
+
+	def clear(self):
+		'''
+		Method: clear
+		Description: Unmarks every cell.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		for change_set in self.m_change_sets:
+			change_set.update(self.m_marks)
+		self.m_marks.clear()
+
+	def clear_regions(self, grid, regions):
+		'''
+		Method: clear_regions
+		Description: Unmarks every cell within the given regions, walking whichever is smaller: the marked cells, or the cells of the regions.
+		Parameters: grid, regions
+			grid: Grid - The compact cell storage of the maze the layer is drawn over
+			regions: Regions - A collection of disjoint regions to unmark
+		Return: None
+		'''
+
+		marks = self.m_marks
+		if not marks:
+			return
+
+		if len(marks) < sum(region.get_area() for region in regions):
+			for index in list(marks):
+				position = grid.position(index)
+				if any(region.contains(position) for region in regions):
+					del marks[index]
+					for change_set in self.m_change_sets:
+						change_set.add(index)
+		else:
+			for region in regions:
+				for y in region.get_range_y():
+					for index in range(grid.index((region.m_range[0][0], y)), grid.index((region.m_range[0][1], y)) + 1):
+						if marks.pop(index, None) is not None:
+							for change_set in self.m_change_sets:
+								change_set.add(index)
+
+	def is_empty(self):
+		'''
+		Method: is_empty
+		Description: Determines whether or not no cells are marked.
+		Parameters: No parameters
+		Return: Boolean - Whether or not no cells are marked
+		'''
+
+		return not self.m_marks
+
+	def indices(self):
+		'''
+		Method: indices
+		Description: Gets the flat indices of every marked cell.
+		Parameters: No parameters
+		Return: [Int] - The flat indices of every marked cell
+		'''
+
+		return list(self.m_marks)
\ No newline at end of file
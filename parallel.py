@@ -0,0 +1,167 @@
+'''
+Module: parallel
+Author: David Frye
+Description: Contains the functions generating disjoint regions of a maze in parallel, across a pool of processes sharing the maze's cells.
+'''
+
+import concurrent.futures
+import itertools
+import random
+import traceback
+
+from multiprocessing import shared_memory
+
+from generator import RecursiveBacktracker
+from grid import Grid
+from maze import Maze
+from utility import Direction
+from utility import derive_random
+
+def generate_region(name, size, region, exemptions, open_chance, generator, seed):
+	'''
+	Function: generate_region
+	Description: Generates a single region of a maze whose cells live in shared memory (or in a buffer of this process, if no name is given). Plowing is bounded to the region, so that no cell outside of it is ever written while other processes generate the neighboring regions.
+	Parameters: name, size, region, exemptions, open_chance, generator, seed
+		name: String - The name of the shared memory block holding the cells (None to generate within the buffer passed as size's maze)
+		size: 2-Tuple or Maze - The dimensional lengths of the maze, or the maze itself when no name is given
+		region: Region - The region to generate
+		exemptions: Regions - A collection of regions for maze generation to avoid
+		open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+		generator: Generator - The maze generation algorithm to use (whose configuration is copied, with a random stream of the region's own)
+		seed: Int - The seed from which the random stream of the region is derived
+	Return: None
+	'''
+
+	if name is None:
+		maze = size
+		(x0, x1), (y0, y1) = region.m_range
+		generator.with_random(derive_random(seed, "generate", x0, y0, x1, y1)).generate(maze, region, exemptions, open_chance, True)
+		return
+
+	memory = shared_memory.SharedMemory(name)
+	try:
+		generate_region(None, Maze(size, buffer=memory.buf), region, exemptions, open_chance, generator, seed)
+	except BaseException as error:
+		# The traceback keeps the failed call's views of the block alive, so they are dropped before it is closed.
+		traceback.clear_frames(error.__traceback__)
+		raise
+	finally:
+		memory.close()
+
+def generate_parallel(maze, regions, exemptions=None, open_chance=Maze.DEFAULT_OPEN_CHANCE, generator=None, seed=None, processes=None, executor=None):
+	'''
+	Function: generate_parallel
+	Description: Generates disjoint regions of a maze at once, across a pool of processes writing into a shared-memory copy of the cells. Since each region is generated on its own with plowing bounded to it, the seams are stitched afterwards in a single pass: a random passage is carved between each pair of adjacent regions needed to connect them all, and walls across the regions' borders are plowed through at random, towards visited cells, at the rate generation itself would have. The result depends only on the seed, never on the number of processes.
+	Parameters: maze, regions, exemptions=None, open_chance=Maze.DEFAULT_OPEN_CHANCE, generator=None, seed=None, processes=None, executor=None
+		maze: Maze - The maze to generate within
+		regions: [Region] - The disjoint regions to generate
+		exemptions: Regions - A collection of regions for maze generation to avoid
+		open_chance: The percent chance that each carved cell will have a wall to an already-visited neighbor knocked down
+		generator: Generator - The maze generation algorithm to use (a RecursiveBacktracker if None; its configuration is kept, but not its source of randomness)
+		seed: Int - The seed from which the random stream of each region is derived (the maze's seed if None, or a random seed if the maze has none)
+		processes: Int - The number of processes to generate with (one per CPU if None, and within this process if 1)
+		executor: Executor - A process pool to generate with, in place of a new one
+	Return: None
+	'''
+
+	# Only cells inside the maze are generated, and no two regions may overlap.
+	regions = [clipped for clipped in [maze.m_region.intersect(region) for region in regions] if clipped is not None]
+	for region, other in itertools.combinations(regions, 2):
+		if region.intersect(other) is not None:
+			raise ValueError("Regions generated in parallel must be disjoint")
+	if not regions:
+		return
+
+	# The generator is sent to each process without its source of randomness, which every region replaces anyway.
+	generator = (generator if generator is not None else RecursiveBacktracker()).with_random(None)
+	if seed is None:
+		seed = maze.m_seed if maze.m_seed is not None else random.getrandbits(64)
+
+	maze.prepare(regions, maze.MUTATION_OPEN)
+
+	cells = maze.m_grid.m_cells
+	if processes == 1 and executor is None:
+		for region in regions:
+			generate_region(None, maze, region, exemptions, open_chance, generator, seed)
+	else:
+		memory = shared_memory.SharedMemory(create=True, size=len(cells))
+		try:
+			memory.buf[:len(cells)] = cells
+			pool = executor if executor is not None else concurrent.futures.ProcessPoolExecutor(processes)
+			try:
+				futures = [pool.submit(generate_region, memory.name, maze.m_size, region, exemptions, open_chance, generator, seed) for region in regions]
+				for future in futures:
+					future.result()
+			finally:
+				if executor is None:
+					pool.shutdown()
+			cells[:] = memory.buf[:len(cells)]
+		finally:
+			memory.close()
+			memory.unlink()
+
+	stitch_seams(maze, regions, exemptions, open_chance, seed)
+
+	maze.notify(regions, maze.MUTATION_OPEN)
+
+def stitch_seams(maze, regions, exemptions, open_chance, seed):
+	'''
+	Function: stitch_seams
+	Description: Stitches the seams between separately-generated regions: carves a random passage between each pair of adjacent regions needed to connect them all, then plows through the walls across the regions' borders towards visited cells at random.
+	Parameters: maze, regions, exemptions, open_chance, seed
+		maze: Maze - The maze the regions were generated within
+		regions: [Region] - The disjoint generated regions
+		exemptions: Regions - A collection of regions generation avoided
+		open_chance: The percent chance that each carved cell had a wall to an already-visited neighbor knocked down
+		seed: Int - The seed the regions' random streams were derived from
+	Return: None
+	'''
+
+	grid = maze.m_grid
+	cells = grid.m_cells
+	rng = derive_random(seed, "stitch", *[corner for region in regions for corner in region.m_range])
+	exemptions = exemptions if exemptions is not None else []
+	offsets = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+	def valid(position):
+		return maze.is_valid_cell_position(position) and not any(exemption.contains(position) for exemption in exemptions)
+
+	# The walls across each region's border, as (cell position, direction value), keyed by the region on the other side (None for cells outside of every region).
+	borders = []
+	for region in regions:
+		(x0, x1), (y0, y1) = region.m_range
+		walls = [((x, y0), 0) for x in range(x0, x1 + 1)] + [((x1, y), 1) for y in range(y0, y1 + 1)] + [((x, y1), 2) for x in range(x0, x1 + 1)] + [((x0, y), 3) for y in range(y0, y1 + 1)]
+		neighbors = {}
+		for position, direction in walls:
+			neighbor = (position[0] + offsets[direction][0], position[1] + offsets[direction][1])
+			if not valid(position) or not valid(neighbor):
+				continue
+			other = next((i for i, candidate in enumerate(regions) if candidate.contains(neighbor)), None)
+			neighbors.setdefault(other, []).append((position, direction))
+		borders.append(neighbors)
+
+	# Connect the regions with a random passage between each pair of adjacent regions which are not yet connected.
+	parents = list(range(len(regions)))
+
+	def find(i):
+		while parents[i] != i:
+			parents[i] = parents[parents[i]]
+			i = parents[i]
+		return i
+
+	pairs = [(i, j) for i in range(len(regions)) for j in borders[i] if j is not None and i < j]
+	rng.shuffle(pairs)
+	for i, j in pairs:
+		if find(i) != find(j):
+			position, direction = rng.choice(borders[i][j])
+			grid.set_wall(grid.index(position), Direction(direction), False)
+			parents[find(i)] = find(j)
+
+	# Plow through each border wall towards a visited cell with the chance that generation would have (a carved cell plows with open_chance, in one of four directions).
+	for neighbors in borders:
+		for other, walls in neighbors.items():
+			for position, direction in walls:
+				if rng.random() * 400 < open_chance:
+					index = grid.index(position)
+					if cells[index + grid.m_offsets[direction]] & Grid.VISITED_BIT and cells[index] & Grid.VISITED_BIT:
+						grid.set_wall(index, Direction(direction), False)
\ No newline at end of file
@@ -6,10 +6,83 @@ Description: Contains the Player class.
 
 class Player:
 	'''
+	Class: Player
+	Description: Represents a player occupying a cell of a maze. Players are moved through the Map holding them, which keeps its spatial index and the maze's player overlay in step with their positions.
 	'''
 
-	def __init__(self):
+	DEFAULT_SYMBOL = "P"
+
+	def __init__(self, name=None, position=(0, 0), symbol=DEFAULT_SYMBOL):
+		'''
+		Method: __init__
+		Description: Player constructor.
+		Parameters: name=None, position=(0, 0), symbol=DEFAULT_SYMBOL
+			name: String - The name of the player
+			position: 2-Tuple - The cell position of the player
+				[0] = The x-position
+				[1] = The y-position
+			symbol: String - A string visually representing the player
+		Return: None
+		'''
+
+		self.m_name = name
+		self.m_position = position
+		self.m_symbol = symbol
+		# The map holding the player, if any.
+		self.m_map = None
+
+	def move(self, direction):
+		'''
+		Method: move
+		Description: Moves the player one cell in the given direction, if no wall stands in the way.
+		Parameters: direction
+			direction: Direction - The direction to move in
+		Return: Boolean - Whether or not the player moved
+		'''
+
+		if self.m_map is None:
+			return False
+
+		return self.m_map.step_player(self, direction)
+
+	def get_map(self):
+		'''
+		Method: get_map
+		Description: Gets the map holding the player.
+		Parameters: No parameters
+		Return: Map - The map holding the player, or None if the player is not on a map
+		'''
+
+		return self.m_map
+
+	def get_name(self):
+		'''
+		Method: get_name
+		Description: Gets the name of the player.
+		Parameters: No parameters
+		Return: String - The name of the player
+		'''
+
+		return self.m_name
+
+	def get_position(self):
+		'''
+		Method: get_position
+		Description: Gets the cell position of the player.
+		Parameters: No parameters
+		Return: 2-Tuple - The cell position of the player
+			[0] = The x-position
+			[1] = The y-position
+		'''
+
+		return self.m_position
+
+	def get_symbol(self):
 		'''
+		Method: get_symbol
+		Description: Gets the string visually representing the player.
+		Parameters: No parameters
+		Return: String - A string visually representing the player
 		'''
 
-		return
\ No newline at end of file
+		return self.m_symbol
\ No newline at end of file
@@ -0,0 +1,245 @@
+'''
+Module: raster
+Author: David Frye
+Description: Contains the RasterExporter class, which exports mazes as binary Netpbm (PBM/PGM/PPM) images.
+'''
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+from grid import Grid
+from maze import Maze
+
+class RasterExporter:
+	'''
+	Class: RasterExporter
+	Description: Rasterizes mazes into binary Netpbm images, without any imaging library. Each cell is drawn as a square of floor pixels with wall pixels along its northern and western sides, and the image is written a band of maze rows at a time, so that very large images are never held in memory whole. Each band is rasterized with NumPy when it is available, and with byte-string lookup tables otherwise (both produce identical images).
+	'''
+
+	KIND_PBM = "pbm"
+	KIND_PGM = "pgm"
+	KIND_PPM = "ppm"
+	# The Netpbm magic number of each image kind.
+	MAGIC_NUMBERS = {KIND_PBM: "P4", KIND_PGM: "P5", KIND_PPM: "P6"}
+
+	ROLE_WALL = "wall"
+	ROLE_FLOOR = "floor"
+	ROLE_UNVISITED = "unvisited"
+	# Every role a pixel may be drawn in, from lowest to highest priority (the overlay layers being drawn over the cells).
+	ROLES = (ROLE_WALL, ROLE_FLOOR, ROLE_UNVISITED) + Maze.OVERLAY_ORDER
+
+	DEFAULT_COLORS = {
+		ROLE_WALL: (0, 0, 0),
+		ROLE_FLOOR: (255, 255, 255),
+		ROLE_UNVISITED: (128, 128, 128),
+		Maze.OVERLAY_PATH: (255, 0, 0),
+		Maze.OVERLAY_MARKERS: (0, 0, 255),
+		Maze.OVERLAY_PLAYER: (0, 160, 0)}
+	DEFAULT_CELL_SIZE = 4
+	DEFAULT_WALL_SIZE = 1
+	DEFAULT_BAND_ROWS = 64
+
+	def __init__(self, kind=KIND_PPM, cell_size=DEFAULT_CELL_SIZE, wall_size=DEFAULT_WALL_SIZE, colors=None, band_rows=DEFAULT_BAND_ROWS):
+		'''
+		Method: __init__
+		Description: RasterExporter constructor.
+		Parameters: kind=KIND_PPM, cell_size=DEFAULT_CELL_SIZE, wall_size=DEFAULT_WALL_SIZE, colors=None, band_rows=DEFAULT_BAND_ROWS
+			kind: String - The kind of image to write (KIND_PBM, KIND_PGM or KIND_PPM)
+			cell_size: Int - The side length of each cell's floor, in pixels
+			wall_size: Int - The thickness of each wall, in pixels
+			colors: Dict - The (red, green, blue) color of each role, overriding DEFAULT_COLORS (grayscale and bitmap images use the luminance of each color, bitmaps drawing dark colors black)
+			band_rows: Int - The number of maze rows rasterized at a time
+		Return: None
+		'''
+
+		if kind not in self.MAGIC_NUMBERS:
+			raise ValueError("Unknown image kind " + str(kind))
+
+		self.m_kind = kind
+		self.m_cell_size = cell_size
+		self.m_wall_size = wall_size
+		self.m_band_rows = band_rows
+
+		palette = dict(self.DEFAULT_COLORS)
+		if colors is not None:
+			palette.update(colors)
+		self.m_palette = [palette[role] for role in self.ROLES]
+
+		# Translation tables from the role index of a pixel to each of its output bytes.
+		unused = bytes(256 - len(self.ROLES))
+		self.m_red = bytes([color[0] for color in self.m_palette]) + unused
+		self.m_green = bytes([color[1] for color in self.m_palette]) + unused
+		self.m_blue = bytes([color[2] for color in self.m_palette]) + unused
+		self.m_gray = bytes([(299 * color[0] + 587 * color[1] + 114 * color[2] + 500) // 1000 for color in self.m_palette]) + unused
+		self.m_bits = bytes([gray < 128 for gray in self.m_gray[:len(self.ROLES)]]) + unused
+
+		# The role indices of a pixel row through the top (wall) and the interior (floor) of each possible cell byte.
+		wall = self.ROLES.index(self.ROLE_WALL)
+		floor = self.ROLES.index(self.ROLE_FLOOR)
+		unvisited = self.ROLES.index(self.ROLE_UNVISITED)
+		self.m_top_table = tuple(bytes([wall]) * wall_size + bytes([wall if value & Grid.WALL_BITS[0] else floor]) * cell_size for value in range(256))
+		self.m_interior_table = tuple(bytes([wall if value & Grid.WALL_BITS[3] else floor]) * wall_size + bytes([floor if value & Grid.VISITED_BIT else unvisited]) * cell_size for value in range(256))
+
+	def get_image_size(self, width, height):
+		'''
+		Method: get_image_size
+		Description: Computes the size of the image of a maze.
+		Parameters: width, height
+			width: Int - The x-dimensional length of the maze
+			height: Int - The y-dimensional length of the maze
+		Return: 2-Tuple - The width and height of the image, in pixels
+		'''
+
+		tile_size = self.m_cell_size + self.m_wall_size
+		return (width * tile_size + self.m_wall_size, height * tile_size + self.m_wall_size)
+
+	def export(self, maze, outfile):
+		'''
+		Method: export
+		Description: Writes an image of a maze, with its overlays drawn over the cells.
+		Parameters: maze, outfile
+			maze: Maze - The maze to export
+			outfile: File - The binary file (or buffer) to write to
+		Return: None
+		'''
+
+		grid = maze.m_grid
+		width = grid.m_width
+
+		# Collect the overlay role of each marked cell by row, with the higher layers drawn over the lower ones.
+		marks = {}
+		for name in maze.OVERLAY_ORDER:
+			role = self.ROLES.index(name)
+			for index in maze.get_overlay(name).m_marks:
+				y, x = divmod(index, width)
+				marks.setdefault(y, {})[x] = role
+
+		rows = (bytes(grid.m_cells[y * width:(y + 1) * width]) for y in range(grid.m_height))
+		self.write_rows(rows, width, grid.m_height, outfile, marks)
+
+	def write_rows(self, rows, width, height, outfile, marks=None):
+		'''
+		Method: write_rows
+		Description: Writes an image of a maze given a row at a time (such as the rows of a MazeStream), a band of rows at a time.
+		Parameters: rows, width, height, outfile, marks=None
+			rows: Iterable(Bytes) - The cell bytes of each row
+			width: Int - The x-dimensional length of the maze
+			height: Int - The y-dimensional length of the maze (the number of rows)
+			outfile: File - The binary file (or buffer) to write to
+			marks: Dict - The role index of each marked cell, keyed by offset within the row, keyed by row
+		Return: None
+		'''
+
+		image_width, image_height = self.get_image_size(width, height)
+		header = self.MAGIC_NUMBERS[self.m_kind] + "\n" + str(image_width) + " " + str(image_height) + "\n"
+		if self.m_kind != self.KIND_PBM:
+			header += "255\n"
+		outfile.write(header.encode("ascii"))
+
+		marks = marks if marks is not None else {}
+		band = []
+		y = 0
+		for row in rows:
+			band.append(row)
+			if len(band) == self.m_band_rows:
+				outfile.write(self.render_band(band, y, marks))
+				y += len(band)
+				band = []
+		if band:
+			outfile.write(self.render_band(band, y, marks))
+
+		# Draw the bottom border.
+		outfile.write(self.encode(bytes(image_width)) * self.m_wall_size)
+
+	def render_band(self, band, first_y, marks):
+		'''
+		Method: render_band
+		Description: Rasterizes and encodes a band of maze rows, along with the eastern border.
+		Parameters: band, first_y, marks
+			band: [Bytes] - The cell bytes of each row of the band
+			first_y: Int - The y-position of the first row of the band
+			marks: Dict - The role index of each marked cell, keyed by offset within the row, keyed by row
+		Return: Bytes - The encoded pixel rows of the band
+		'''
+
+		if numpy is not None:
+			return self.render_band_vectorized(band, first_y, marks)
+
+		wall_size = self.m_wall_size
+		cell_size = self.m_cell_size
+		border = bytes(wall_size)
+		encoded = []
+		for y, row in enumerate(band):
+			interior = list(map(self.m_interior_table.__getitem__, row))
+			for x, role in marks.get(first_y + y, {}).items():
+				interior[x] = interior[x][:wall_size] + bytes([role]) * cell_size
+
+			encoded.append(self.encode(b"".join(map(self.m_top_table.__getitem__, row)) + border) * wall_size)
+			encoded.append(self.encode(b"".join(interior) + border) * cell_size)
+
+		return b"".join(encoded)
+
+	def render_band_vectorized(self, band, first_y, marks):
+		'''
+		Method: render_band_vectorized
+		Description: Rasterizes and encodes a band of maze rows, along with the eastern border, with NumPy. Each cell's tile is filled by broadcasting its wall bits over a (row, tile row, cell, tile column) view of the band's pixels.
+		Parameters: band, first_y, marks
+			band: [Bytes] - The cell bytes of each row of the band
+			first_y: Int - The y-position of the first row of the band
+			marks: Dict - The role index of each marked cell, keyed by offset within the row, keyed by row
+		Return: Bytes - The encoded pixel rows of the band
+		'''
+
+		wall_size = self.m_wall_size
+		tile_size = self.m_cell_size + wall_size
+		width = len(band[0])
+		wall = self.ROLES.index(self.ROLE_WALL)
+		floor = self.ROLES.index(self.ROLE_FLOOR)
+		unvisited = self.ROLES.index(self.ROLE_UNVISITED)
+
+		cells = numpy.frombuffer(b"".join(band), dtype=numpy.uint8).reshape(len(band), width)
+		interior = numpy.where(cells & Grid.VISITED_BIT, floor, unvisited).astype(numpy.uint8)
+		for y in range(len(band)):
+			for x, role in marks.get(first_y + y, {}).items():
+				interior[y, x] = role
+
+		tiles = numpy.empty((len(band), tile_size, width, tile_size), dtype=numpy.uint8)
+		tiles[:, :wall_size, :, :wall_size] = wall
+		tiles[:, :wall_size, :, wall_size:] = numpy.where(cells & Grid.WALL_BITS[0], wall, floor)[:, None, :, None]
+		tiles[:, wall_size:, :, :wall_size] = numpy.where(cells & Grid.WALL_BITS[3], wall, floor)[:, None, :, None]
+		tiles[:, wall_size:, :, wall_size:] = interior[:, None, :, None]
+
+		pixels = numpy.full((len(band) * tile_size, width * tile_size + wall_size), wall, dtype=numpy.uint8)
+		pixels[:, :width * tile_size] = tiles.reshape(len(band) * tile_size, width * tile_size)
+
+		if self.m_kind == self.KIND_PPM:
+			return numpy.array(self.m_palette, dtype=numpy.uint8)[pixels].tobytes()
+		elif self.m_kind == self.KIND_PGM:
+			return numpy.frombuffer(self.m_gray, dtype=numpy.uint8)[pixels].tobytes()
+		else:
+			return numpy.packbits(numpy.frombuffer(self.m_bits, dtype=numpy.uint8)[pixels], axis=1).tobytes()
+
+	def encode(self, pixels):
+		'''
+		Method: encode
+		Description: Encodes a row of pixels into the bytes of the image kind.
+		Parameters: pixels
+			pixels: Bytes - The role index of each pixel of the row
+		Return: Bytes - The encoded row
+		'''
+
+		if self.m_kind == self.KIND_PPM:
+			encoded = bytearray(3 * len(pixels))
+			encoded[0::3] = pixels.translate(self.m_red)
+			encoded[1::3] = pixels.translate(self.m_green)
+			encoded[2::3] = pixels.translate(self.m_blue)
+			return bytes(encoded)
+		elif self.m_kind == self.KIND_PGM:
+			return pixels.translate(self.m_gray)
+
+		# Pack the bits of a bitmap row by reading it as a binary number, padding it to a whole number of bytes.
+		digits = pixels.translate(self.m_bits).translate(b"01" + bytes(254))
+		digits += b"0" * (-len(digits) % 8)
+		return int(digits, 2).to_bytes(len(digits) // 8, "big")
\ No newline at end of file
@@ -1,7 +1,7 @@
 '''
 Module: region
 Author: David Frye
-Description: Contains the Region class.
+Description: Contains the Region class, along with helpers for treating lists of Regions as sets of points.
 '''
 
 from utility import Direction
@@ -51,10 +51,7 @@ class Region:
 		Return: Boolean - Whether or not the candidate position is included in the region
 		'''
 
-		if candidate_position in self.to_set():
-			return True
-		else:
-			return False
+		return (self.m_range[0][0] <= candidate_position[0] <= self.m_range[0][1]) and (self.m_range[1][0] <= candidate_position[1] <= self.m_range[1][1])
 
 	def on_border(self, candidate_position):
 		'''
@@ -86,6 +83,105 @@ class Region:
 
 		return borders
 
+	def is_empty(self):
+		'''
+		Method: is_empty
+		Description: Determines whether or not the region contains no points at all.
+		Parameters: No parameters
+		Return: Boolean - Whether or not the region contains no points at all
+		'''
+
+		return self.m_range[0][0] > self.m_range[0][1] or self.m_range[1][0] > self.m_range[1][1]
+
+	def get_area(self):
+		'''
+		Method: get_area
+		Description: Gets the number of points contained within the region.
+		Parameters: No parameters
+		Return: Int - The number of points contained within the region
+		'''
+
+		if self.is_empty():
+			return 0
+
+		return len(self.get_range_x()) * len(self.get_range_y())
+
+	def intersect(self, other):
+		'''
+		Method: intersect
+		Description: Computes the region of points contained within both this region and the given region.
+		Parameters: other
+			other: Region - The region to intersect with
+		Return: Region - The intersection of both regions, or None if they do not overlap
+		'''
+
+		lower_endpoint = (max(self.m_range[0][0], other.m_range[0][0]), max(self.m_range[1][0], other.m_range[1][0]))
+		upper_endpoint = (min(self.m_range[0][1], other.m_range[0][1]), min(self.m_range[1][1], other.m_range[1][1]))
+
+		if lower_endpoint[0] > upper_endpoint[0] or lower_endpoint[1] > upper_endpoint[1]:
+			return None
+
+		return Region(lower_endpoint, (upper_endpoint[0] - lower_endpoint[0] + 1, upper_endpoint[1] - lower_endpoint[1] + 1))
+
+	def subtract(self, other):
+		'''
+		Method: subtract
+		Description: Computes the points contained within this region but not within the given region, as a list of disjoint regions.
+		Parameters: other
+			other: Region - The region to subtract
+		Return: [Region] - Up to four disjoint regions covering the difference (a full band above and below the overlap, then the remainders to its left and right)
+		'''
+
+		if self.is_empty():
+			return []
+
+		overlap = self.intersect(other)
+		if overlap is None:
+			return [self]
+
+		(x0, x1), (y0, y1) = self.m_range
+		(ox0, ox1), (oy0, oy1) = overlap.m_range
+		pieces = []
+
+		# The band above the overlap, spanning the full width of this region.
+		if y0 < oy0:
+			pieces.append(Region((x0, y0), (x1 - x0 + 1, oy0 - y0)))
+		# The band below the overlap, spanning the full width of this region.
+		if oy1 < y1:
+			pieces.append(Region((x0, oy1 + 1), (x1 - x0 + 1, y1 - oy1)))
+		# The remainder to the left of the overlap.
+		if x0 < ox0:
+			pieces.append(Region((x0, oy0), (ox0 - x0, oy1 - oy0 + 1)))
+		# The remainder to the right of the overlap.
+		if ox1 < x1:
+			pieces.append(Region((ox1 + 1, oy0), (x1 - ox1, oy1 - oy0 + 1)))
+
+		return pieces
+
+	def translate(self, offset):
+		'''
+		Method: translate
+		Description: Computes the region of the same size shifted by the given offset.
+		Parameters: offset
+			offset: 2-Tuple - The offset to shift by
+				[0] = The x-dimensional offset
+				[1] = The y-dimensional offset
+		Return: Region - The shifted region
+		'''
+
+		return Region((self.m_range[0][0] + offset[0], self.m_range[1][0] + offset[1]), (self.m_range[0][1] - self.m_range[0][0] + 1, self.m_range[1][1] - self.m_range[1][0] + 1))
+
+	def grow(self, amount):
+		'''
+		Method: grow
+		Description: Computes the region extended by the given amount in every direction.
+		Parameters: amount
+			amount: Int - The number of points to extend each border by
+		Return: Region - The grown region
+		'''
+
+		return Region((self.m_range[0][0] - amount, self.m_range[1][0] - amount), (self.m_range[0][1] - self.m_range[0][0] + 1 + 2 * amount, self.m_range[1][1] - self.m_range[1][0] + 1 + 2 * amount))
+
 	def to_set(self):
 		'''
 		Method: to_set
@@ -120,4 +216,55 @@ class Region:
 		Return: Range(y0, y1) - The y-dimensional range of the region
 		'''
 
-		return range(self.m_range[1][0], self.m_range[1][1] + 1)
\ No newline at end of file
+		return range(self.m_range[1][0], self.m_range[1][1] + 1)
+
+def intersect_regions(regions, others):
+	'''
+	Function: intersect_regions
+	Description: Computes the points contained within both of the given collections of regions, as a list of regions.
+	Parameters: regions, others
+		regions: Regions - A collection of disjoint regions
+		others: Regions - A collection of disjoint regions to intersect with
+	Return: [Region] - Disjoint regions covering the intersection
+	'''
+
+	intersection = []
+	for region in regions:
+		for other in others:
+			overlap = region.intersect(other)
+			if overlap is not None:
+				intersection.append(overlap)
+
+	return intersection
+
+def subtract_regions(regions, exemptions):
+	'''
+	Function: subtract_regions
+	Description: Computes the points contained within the given regions but not within any of the given exemptions, as a list of regions.
+	Parameters: regions, exemptions
+		regions: Regions - A collection of disjoint regions
+		exemptions: Regions - A collection of (possibly overlapping) regions to subtract
+	Return: [Region] - Disjoint regions covering the difference
+	'''
+
+	difference = list(regions)
+	if exemptions is not None:
+		for exemption in exemptions:
+			difference = [piece for region in difference for piece in region.subtract(exemption)]
+
+	return difference
+
+def union_regions(regions):
+	'''
+	Function: union_regions
+	Description: Computes the points contained within any of the given regions, as a list of disjoint regions.
+	Parameters: regions
+		regions: Regions - A collection of (possibly overlapping) regions
+	Return: [Region] - Disjoint regions covering the union
+	'''
+
+	union = []
+	for region in regions:
+		union += subtract_regions([region], union)
+
+	return union
\ No newline at end of file
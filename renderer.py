@@ -0,0 +1,162 @@
+'''
+Module: renderer
+Author: David Frye
+Description: Contains the Renderer class, which pretty-prints mazes as text, along with the row-rendering helpers it shares with streamed mazes.
+'''
+
+from cell import Cell
+from grid import Grid
+from observer import MazeObserver
+
+def build_tables(scale):
+	'''
+	Function: build_tables
+	Description: Builds the text of every possible cell, for each of the two text rows of a maze row, indexed by the cell's byte.
+	Parameters: scale
+		scale: Int - The (doubled) printing scale of the maze, used to determine spacing
+	Return: 2-Tuple - The rendering tables
+		[0] = (String) - The text of each cell in the row between the cells (its western corner and northern wall)
+		[1] = (String) - The text of each cell in the row containing the cells (its western wall and visited/unvisited content)
+	'''
+
+	padding = ((scale - 1) // 2) * " "
+	west_bit = Grid.WALL_BITS[3]
+
+	top_table = tuple((Cell.WALL_VERTICAL_STRING if value & west_bit else Cell.WALL_HORIZONTAL_STRING) + scale * (Cell.WALL_HORIZONTAL_STRING if value & Grid.WALL_BITS[0] else " ") for value in range(256))
+	cell_table = tuple((Cell.WALL_VERTICAL_STRING + " " if value & west_bit else "  ") + padding + (Cell.VISITED_STRING if value & Grid.VISITED_BIT else Cell.UNVISITED_STRING) + padding for value in range(256))
+
+	return (top_table, cell_table)
+
+def render_row(row, tables, scale, contents=None):
+	'''
+	Function: render_row
+	Description: Renders both text rows of a maze row.
+	Parameters: row, tables, scale, contents=None
+		row: Bytes - The cell bytes of the row
+		tables: 2-Tuple - The rendering tables returned by build_tables
+		scale: Int - The (doubled) printing scale of the maze, used to determine spacing
+		contents: Dict - Content replacing the visited/unvisited content of some cells, keyed by offset within the row
+	Return: String - The text of the row, ending with a newline
+	'''
+
+	top_table, cell_table = tables
+
+	cell_strings = list(map(cell_table.__getitem__, row))
+	if contents:
+		padding = ((scale - 1) // 2) * " "
+		for x, content in contents.items():
+			cell_strings[x] = (Cell.WALL_VERTICAL_STRING + " " if row[x] & Grid.WALL_BITS[3] else "  ") + padding + content + padding
+
+	return "".join(map(top_table.__getitem__, row)) + Cell.WALL_VERTICAL_STRING + "\n" + "".join(cell_strings) + Cell.WALL_VERTICAL_STRING + "\n"
+
+def render_bottom(width, scale):
+	'''
+	Function: render_bottom
+	Description: Renders the bottom border of a maze.
+	Parameters: width, scale
+		width: Int - The x-dimensional length of the maze
+		scale: Int - The (doubled) printing scale of the maze, used to determine spacing
+	Return: String - The text of the bottom border, ending with a newline
+	'''
+
+	return Cell.WALL_VERTICAL_STRING + (((scale + 1) * width - 1) * Cell.WALL_HORIZONTAL_STRING) + Cell.WALL_VERTICAL_STRING + "\n"
+
+class Renderer(MazeObserver):
+	'''
+	Class: Renderer
+	Description: Pretty-prints a maze as text, caching the text of every row. Only the rows touched by a mutation since the last frame, and the rows holding overlay content in this frame or the last one, are rendered again, each from lookup tables keyed by cell byte. Every frame is then written with a single call.
+	'''
+
+	def __init__(self, maze):
+		'''
+		Method: __init__
+		Description: Renderer constructor, which registers the renderer as an observer of the maze.
+		Parameters: maze
+			maze: Maze - The maze to render
+		Return: None
+		'''
+
+		self.m_maze = maze
+		self.m_tables = build_tables(maze.m_scale)
+		# The cached text of each row (None for rows which must be rendered again).
+		self.m_rows = [None] * maze.get_height()
+		# The rows holding overlay content in the last frame.
+		self.m_marked_rows = set()
+
+		maze.add_observer(self)
+
+	def detach(self):
+		'''
+		Method: detach
+		Description: Stops caching rows, unregistering the renderer as an observer.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		self.m_maze.remove_observer(self)
+
+	def on_mutation(self, maze, regions, kind):
+		'''
+		Method: on_mutation
+		Description: Drops the cached text of every row touched by a mutation.
+		Parameters: maze, regions, kind
+			maze: Maze - The mutated maze
+			regions: [Region] - The regions containing every cell whose walls may have changed
+			kind: String - Maze.MUTATION_OPEN or Maze.MUTATION_CLOSE
+		Return: None
+		'''
+
+		for region in regions:
+			self.invalidate(region)
+
+	def invalidate(self, region=None):
+		'''
+		Method: invalidate
+		Description: Drops the cached text of every row spanned by a region, for changes the maze does not report to its observers (such as visiting cells directly).
+		Parameters: region=None
+			region: Region - The region whose rows must be rendered again (the whole maze if None)
+		Return: None
+		'''
+
+		if region is None:
+			self.m_rows = [None] * len(self.m_rows)
+			return
+
+		for y in range(max(region.m_range[1][0], 0), min(region.m_range[1][1] + 1, len(self.m_rows))):
+			self.m_rows[y] = None
+
+	def render(self, outfile=None):
+		'''
+		Method: render
+		Description: Renders a frame of the maze, in the format of the original print_maze.
+		Parameters: outfile=None
+			outfile: File - The text file (or buffer) to write the frame to
+		Return: String - The text of the frame, if no file is given
+		'''
+
+		maze = self.m_maze
+		grid = maze.m_grid
+		width = grid.m_width
+		cells = grid.m_cells
+
+		# Collect the overlay content of each row, with the higher layers drawn over the lower ones.
+		marks = {}
+		for name in maze.OVERLAY_ORDER:
+			for index, content in maze.get_overlay(name).m_marks.items():
+				y, x = divmod(index, width)
+				marks.setdefault(y, {})[x] = content
+
+		rows = self.m_rows
+		for y in self.m_marked_rows.union(marks):
+			rows[y] = None
+		self.m_marked_rows = set(marks)
+
+		for y, row in enumerate(rows):
+			if row is None:
+				rows[y] = render_row(cells[y * width:(y + 1) * width], self.m_tables, maze.m_scale, marks.get(y))
+
+		frame = "Maze (" + str(width) + " x " + str(grid.m_height) + "):\n" + "".join(rows) + render_bottom(width, maze.m_scale)
+		if outfile is None:
+			return frame
+
+		outfile.write(frame)
\ No newline at end of file
@@ -0,0 +1,394 @@
+'''
+Module: solver
+Author: David Frye
+Description: Contains the maze solving algorithms, each a Solver strategy operating on flat cell indices.
+'''
+
+import array
+import heapq
+
+from grid import Grid
+from utility import exhaust
+
+class Solver:
+	'''
+	Class: Solver
+	Description: Represents a maze solving algorithm, which finds a path between two cells by following the walls of the maze's compact cell storage.
+	'''
+
+	# The direction values whose walls are open, indexed by the 4-bit wall mask of a cell.
+	OPEN_DIRECTIONS = tuple(tuple(direction for direction in range(4) if not mask & Grid.WALL_BITS[direction]) for mask in range(16))
+
+	def solve(self, maze, start_index, end_index):
+		'''
+		Method: solve
+		Description: Finds a path between the given start and end cells. Implemented by each algorithm.
+		Parameters: maze, start_index, end_index
+			maze: Maze - The maze to solve
+			start_index: Int - The flat index of the cell to begin searching from
+			end_index: Int - The flat index of the cell to target in the search
+		Return: [Int] - The flat indices of the cells along the solution path (from start to end), or None if no solution is found
+		'''
+
+		raise NotImplementedError
+
+	def solve_steps(self, maze, start_index, end_index, steps=0):
+		'''
+		Method: solve_steps
+		Description: Finds a path between the given start and end cells, resumably. Between slices, the maze must not be mutated. Algorithms which do not override this solve in a single slice.
+		Parameters: maze, start_index, end_index, steps=0
+			maze: Maze - The maze to solve
+			start_index: Int - The flat index of the cell to begin searching from
+			end_index: Int - The flat index of the cell to target in the search
+			steps: Int - The number of steps in each slice of work (never yielding if 0)
+		Return: Generator - Yields None after each slice of work, returning the flat indices of the cells along the solution path (from start to end), or None if no solution is found
+		'''
+
+		yield from ()
+		return self.solve(maze, start_index, end_index)
+
+	def neighbors(self, grid, index):
+		'''
+		Method: neighbors
+		Description: Gets the flat indices of all neighboring cells which are directly-accessible from the given cell, never leaving the maze (even through missing outer walls).
+		Parameters: grid, index
+			grid: Grid - The compact cell storage of the maze
+			index: Int - The flat index of the cell
+		Return: [Int] - The flat indices of the accessible neighboring cells
+		'''
+
+		width = grid.m_width
+		offsets = grid.m_offsets
+		neighbors = []
+		for direction in self.OPEN_DIRECTIONS[grid.m_cells[index] & Grid.WALL_MASK]:
+			neighbor = index + offsets[direction]
+			if direction & 1:
+				if neighbor // width != index // width:
+					continue
+			elif not 0 <= neighbor < grid.m_area:
+				continue
+			neighbors.append(neighbor)
+
+		return neighbors
+
+	def backtrace(self, parents, index):
+		'''
+		Method: backtrace
+		Description: Follows a parent array from the given cell back to the root of the search (the cell which is its own parent).
+		Parameters: parents, index
+			parents: Array(Int) - The parent of each cell in the search, indexed by flat index
+			index: Int - The flat index of the cell to backtrace from
+		Return: [Int] - The flat indices of the cells from the given cell to the root
+		'''
+
+		path = [index]
+		while parents[index] != index:
+			index = parents[index]
+			path.append(index)
+
+		return path
+
+class BreadthFirstSolver(Solver):
+	'''
+	Class: BreadthFirstSolver
+	Description: Solves a maze with a breadth-first search over flat indices, recording the search tree in a parent array rather than a dictionary. Finds a shortest path.
+	'''
+
+	def solve(self, maze, start_index, end_index):
+		'''
+		Method: solve
+		Description: Finds a path between the given start and end cells.
+		Parameters: maze, start_index, end_index
+			maze: Maze - The maze to solve
+			start_index: Int - The flat index of the cell to begin searching from
+			end_index: Int - The flat index of the cell to target in the search
+		Return: [Int] - The flat indices of the cells along the solution path (from start to end), or None if no solution is found
+		'''
+
+		return exhaust(self.solve_steps(maze, start_index, end_index))
+
+	def solve_steps(self, maze, start_index, end_index, steps=0):
+		'''
+		Method: solve_steps
+		Description: Finds a path between the given start and end cells, resumably. The search's queue and parent array live in the generator, so each slice picks up exactly where the last one left off.
+		Parameters: maze, start_index, end_index, steps=0
+			maze: Maze - The maze to solve
+			start_index: Int - The flat index of the cell to begin searching from
+			end_index: Int - The flat index of the cell to target in the search
+			steps: Int - The number of steps (cells dequeued) in each slice of work (never yielding if 0)
+		Return: Generator - Yields None after each slice of work, returning the flat indices of the cells along the solution path (from start to end), or None if no solution is found
+		'''
+
+		grid = maze.m_grid
+		cells = grid.m_cells
+		width = grid.m_width
+		area = grid.m_area
+		offsets = grid.m_offsets
+		open_directions = self.OPEN_DIRECTIONS
+
+		parents = array.array("i", [-1]) * area
+		parents[start_index] = start_index
+		queue = [start_index]
+		countdown = steps
+
+		# Crawl the maze for as long as the end cell is not found (the queue is never popped, only walked).
+		for current in queue:
+
+			# Yield at the end of each slice (the countdown only reaches 0 again if steps is not 0).
+			countdown -= 1
+			if countdown == 0:
+				yield
+				countdown = steps
+
+			if current == end_index:
+				path = self.backtrace(parents, end_index)
+				path.reverse()
+				return path
+
+			for direction in open_directions[cells[current] & 15]:
+				neighbor = current + offsets[direction]
+				if direction & 1:
+					if neighbor // width != current // width:
+						continue
+				elif not 0 <= neighbor < area:
+					continue
+				if parents[neighbor] < 0:
+					parents[neighbor] = current
+					queue.append(neighbor)
+
+		return None
+
+	def search_tree(self, maze, root_index, target_indices):
+		'''
+		Method: search_tree
+		Description: Grows a single breadth-first search tree from the given root until every target cell has been reached (or the root's part of the maze is exhausted), so that the shortest paths between the root and many cells cost one search.
+		Parameters: maze, root_index, target_indices
+			maze: Maze - The maze to search
+			root_index: Int - The flat index of the cell to grow the tree from
+			target_indices: [Int] - The flat indices of the cells to reach
+		Return: Array(Int) - The parent of each cell in the tree (the root is its own parent, and unreached cells are -1), indexed by flat index, which Solver.backtrace follows from any reached cell back to the root
+		'''
+
+		grid = maze.m_grid
+		cells = grid.m_cells
+		width = grid.m_width
+		area = grid.m_area
+		offsets = grid.m_offsets
+		open_directions = self.OPEN_DIRECTIONS
+
+		parents = array.array("i", [-1]) * area
+		parents[root_index] = root_index
+		queue = [root_index]
+		remaining = set(target_indices)
+		remaining.discard(root_index)
+
+		# Crawl the maze for as long as any target cell is not found (the queue is never popped, only walked).
+		for current in queue:
+			if not remaining:
+				break
+
+			for direction in open_directions[cells[current] & 15]:
+				neighbor = current + offsets[direction]
+				if direction & 1:
+					if neighbor // width != current // width:
+						continue
+				elif not 0 <= neighbor < area:
+					continue
+				if parents[neighbor] < 0:
+					parents[neighbor] = current
+					queue.append(neighbor)
+					remaining.discard(neighbor)
+
+		return parents
+
+class BidirectionalSolver(Solver):
+	'''
+	Class: BidirectionalSolver
+	Description: Solves a maze with two breadth-first searches, one from each end, expanding the smaller frontier a level at a time until they meet. Finds a shortest path while typically exploring far fewer cells than a single search.
+	'''
+
+	def solve(self, maze, start_index, end_index):
+		'''
+		Method: solve
+		Description: Finds a path between the given start and end cells.
+		Parameters: maze, start_index, end_index
+			maze: Maze - The maze to solve
+			start_index: Int - The flat index of the cell to begin searching from
+			end_index: Int - The flat index of the cell to target in the search
+		Return: [Int] - The flat indices of the cells along the solution path (from start to end), or None if no solution is found
+		'''
+
+		if start_index == end_index:
+			return [start_index]
+
+		grid = maze.m_grid
+		cells = grid.m_cells
+		width = grid.m_width
+		area = grid.m_area
+		offsets = grid.m_offsets
+		opposite_bits = (Grid.WALL_BITS[2], Grid.WALL_BITS[3], Grid.WALL_BITS[0], Grid.WALL_BITS[1])
+
+		# The parent arrays of both searches; the backward search records each cell's successor towards the end.
+		forward = array.array("i", [-1]) * area
+		backward = array.array("i", [-1]) * area
+		forward[start_index] = start_index
+		backward[end_index] = end_index
+		forward_frontier = [start_index]
+		backward_frontier = [end_index]
+
+		while forward_frontier and backward_frontier:
+			is_forward = len(forward_frontier) <= len(backward_frontier)
+			frontier = forward_frontier if is_forward else backward_frontier
+			parents, others = (forward, backward) if is_forward else (backward, forward)
+			next_frontier = []
+
+			for current in frontier:
+				for direction in range(4):
+					neighbor = current + offsets[direction]
+					if direction & 1:
+						if neighbor // width != current // width:
+							continue
+					elif not 0 <= neighbor < area:
+						continue
+
+					# The forward search leaves through the current cell's walls, the backward search enters through the neighbor's.
+					if is_forward:
+						if cells[current] & Grid.WALL_BITS[direction]:
+							continue
+					elif cells[neighbor] & opposite_bits[direction]:
+						continue
+
+					if parents[neighbor] >= 0:
+						continue
+					parents[neighbor] = current
+
+					# The searches have met: join both halves of the path.
+					if others[neighbor] >= 0:
+						path = self.backtrace(forward, neighbor)
+						path.reverse()
+						return path + self.backtrace(backward, neighbor)[1:]
+
+					next_frontier.append(neighbor)
+
+			if is_forward:
+				forward_frontier = next_frontier
+			else:
+				backward_frontier = next_frontier
+
+		return None
+
+class AStarSolver(Solver):
+	'''
+	Class: AStarSolver
+	Description: Solves a maze with an A* search guided by the Manhattan distance to the end cell. Finds a shortest path, exploring the cells towards the end first.
+	'''
+
+	def solve(self, maze, start_index, end_index):
+		'''
+		Method: solve
+		Description: Finds a path between the given start and end cells.
+		Parameters: maze, start_index, end_index
+			maze: Maze - The maze to solve
+			start_index: Int - The flat index of the cell to begin searching from
+			end_index: Int - The flat index of the cell to target in the search
+		Return: [Int] - The flat indices of the cells along the solution path (from start to end), or None if no solution is found
+		'''
+
+		grid = maze.m_grid
+		cells = grid.m_cells
+		width = grid.m_width
+		area = grid.m_area
+		offsets = grid.m_offsets
+		open_directions = self.OPEN_DIRECTIONS
+		end_y, end_x = divmod(end_index, width)
+
+		parents = array.array("i", [-1]) * area
+		distances = array.array("i", [-1]) * area
+		parents[start_index] = start_index
+		distances[start_index] = 0
+		start_y, start_x = divmod(start_index, width)
+		heap = [(abs(start_x - end_x) + abs(start_y - end_y), 0, start_index)]
+
+		while heap:
+			estimate, distance, current = heapq.heappop(heap)
+			if current == end_index:
+				path = self.backtrace(parents, end_index)
+				path.reverse()
+				return path
+
+			# Skip stale heap entries.
+			if distance > distances[current]:
+				continue
+
+			for direction in open_directions[cells[current] & 15]:
+				neighbor = current + offsets[direction]
+				if direction & 1:
+					if neighbor // width != current // width:
+						continue
+				elif not 0 <= neighbor < area:
+					continue
+
+				if distances[neighbor] < 0 or distance + 1 < distances[neighbor]:
+					distances[neighbor] = distance + 1
+					parents[neighbor] = current
+					neighbor_y, neighbor_x = divmod(neighbor, width)
+					heapq.heappush(heap, (distance + 1 + abs(neighbor_x - end_x) + abs(neighbor_y - end_y), distance + 1, neighbor))
+
+		return None
+
+class SparseAStarSolver(Solver):
+	'''
+	Class: SparseAStarSolver
+	Description: Solves a maze with the same A* search as AStarSolver, but keeps its search state in dictionaries rather than per-cell arrays, so that its memory use scales with the cells explored rather than with the maze. Suited to mazes too large to allocate per-cell arrays for, such as memory-mapped ones.
+	'''
+
+	def solve(self, maze, start_index, end_index):
+		'''
+		Method: solve
+		Description: Finds a path between the given start and end cells.
+		Parameters: maze, start_index, end_index
+			maze: Maze - The maze to solve
+			start_index: Int - The flat index of the cell to begin searching from
+			end_index: Int - The flat index of the cell to target in the search
+		Return: [Int] - The flat indices of the cells along the solution path (from start to end), or None if no solution is found
+		'''
+
+		grid = maze.m_grid
+		cells = grid.m_cells
+		width = grid.m_width
+		area = grid.m_area
+		offsets = grid.m_offsets
+		open_directions = self.OPEN_DIRECTIONS
+		end_y, end_x = divmod(end_index, width)
+
+		parents = {start_index: start_index}
+		distances = {start_index: 0}
+		start_y, start_x = divmod(start_index, width)
+		heap = [(abs(start_x - end_x) + abs(start_y - end_y), 0, start_index)]
+
+		while heap:
+			estimate, distance, current = heapq.heappop(heap)
+			if current == end_index:
+				path = self.backtrace(parents, end_index)
+				path.reverse()
+				return path
+
+			# Skip stale heap entries.
+			if distance > distances[current]:
+				continue
+
+			for direction in open_directions[cells[current] & 15]:
+				neighbor = current + offsets[direction]
+				if direction & 1:
+					if neighbor // width != current // width:
+						continue
+				elif not 0 <= neighbor < area:
+					continue
+
+				if distance + 1 < distances.get(neighbor, area):
+					distances[neighbor] = distance + 1
+					parents[neighbor] = current
+					neighbor_y, neighbor_x = divmod(neighbor, width)
+					heapq.heappush(heap, (distance + 1 + abs(neighbor_x - end_x) + abs(neighbor_y - end_y), distance + 1, neighbor))
+
+		return None
\ No newline at end of file
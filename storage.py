@@ -0,0 +1,325 @@
+'''
+Module: storage
+Author: David Frye
+Description: Contains the compact binary maze file format, along with the MazeReader class, which loads whole mazes or single regions from it.
+'''
+
+import struct
+import zlib
+
+try:
+	import lzma
+except ImportError:
+	lzma = None
+
+from grid import Grid
+from maze import Maze
+
+# The magic number and version at the start of every maze file.
+MAGIC = b"DMAZ"
+VERSION = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_LZMA = 2
+
+# The approximate number of cells stored in each chunk, when no chunk height is given.
+DEFAULT_CHUNK_CELLS = 1 << 18
+
+# The header (magic, version, compression, seed length, width, height, scale, chunk height), followed by the seed bytes.
+HEADER = struct.Struct(">4sHBBIIII")
+# Each index entry (chunk offset, chunk length).
+INDEX_ENTRY = struct.Struct(">QI")
+# The footer at the end of the file (index offset, chunk count).
+FOOTER = struct.Struct(">QI")
+
+# Byte translation tables mapping each cell byte to the ASCII digit of one of its bits, for packing through int().
+EAST_DIGITS = bytes([48 + bool(value & Grid.WALL_BITS[1]) for value in range(256)])
+SOUTH_DIGITS = bytes([48 + bool(value & Grid.WALL_BITS[2]) for value in range(256)])
+VISITED_DIGITS = bytes([48 + bool(value & Grid.VISITED_BIT) for value in range(256)])
+NORTH_DIGITS = bytes([48 + bool(value & Grid.WALL_BITS[0]) for value in range(256)])
+WEST_DIGITS = bytes([48 + bool(value & Grid.WALL_BITS[3]) for value in range(256)])
+# Byte translation table mapping ASCII digits back to bit values.
+DIGIT_BITS = bytes(48) + bytes([0, 1]) + bytes(206)
+
+def pack_digits(digits):
+	'''
+	Function: pack_digits
+	Description: Packs a string of ASCII binary digits into bytes, eight digits to a byte, by reading it as a single binary number.
+	Parameters: digits
+		digits: Bytes - The ASCII digits (b"0" or b"1") to pack
+	Return: Bytes - The packed bits, the last byte padded with zeros
+	'''
+
+	if not digits:
+		return b""
+
+	digits += b"0" * (-len(digits) % 8)
+	return int(digits, 2).to_bytes(len(digits) // 8, "big")
+
+def unpack_bits(data, count):
+	'''
+	Function: unpack_bits
+	Description: Unpacks bytes written by pack_digits into one byte (0 or 1) per bit.
+	Parameters: data, count
+		data: Bytes - The packed bits
+		count: Int - The number of bits to unpack
+	Return: Bytes - The value of each bit
+	'''
+
+	if count == 0:
+		return b""
+
+	return format(int.from_bytes(data, "big"), "0" + str(8 * len(data)) + "b").encode("ascii")[:count].translate(DIGIT_BITS)
+
+def compress(data, compression):
+	'''
+	Function: compress
+	Description: Compresses a chunk with the given compression method.
+	Parameters: data, compression
+		data: Bytes - The chunk to compress
+		compression: Int - COMPRESSION_NONE, COMPRESSION_ZLIB or COMPRESSION_LZMA
+	Return: Bytes - The compressed chunk
+	'''
+
+	if compression == COMPRESSION_ZLIB:
+		return zlib.compress(data, 6)
+	elif compression == COMPRESSION_LZMA:
+		if lzma is None:
+			raise ValueError("LZMA compression is not available")
+		return lzma.compress(data)
+	elif compression == COMPRESSION_NONE:
+		return data
+
+	raise ValueError("Unknown compression method " + str(compression))
+
+def decompress(data, compression):
+	'''
+	Function: decompress
+	Description: Decompresses a chunk compressed with the given compression method.
+	Parameters: data, compression
+		data: Bytes - The compressed chunk
+		compression: Int - COMPRESSION_NONE, COMPRESSION_ZLIB or COMPRESSION_LZMA
+	Return: Bytes - The chunk
+	'''
+
+	if compression == COMPRESSION_ZLIB:
+		return zlib.decompress(data)
+	elif compression == COMPRESSION_LZMA:
+		if lzma is None:
+			raise ValueError("LZMA compression is not available")
+		return lzma.decompress(data)
+	elif compression == COMPRESSION_NONE:
+		return data
+
+	raise ValueError("Unknown compression method " + str(compression))
+
+def encode_chunk(cells, width):
+	'''
+	Function: encode_chunk
+	Description: Bit-packs a chunk of whole rows. Since neighboring cells share their walls, only the eastern and southern walls and the visited bit of each cell are stored, along with the northern walls of the chunk's first row and the western walls of its first column.
+	Parameters: cells, width
+		cells: Bytes - The cell bytes of the rows
+		width: Int - The x-dimensional length of the maze
+	Return: Bytes - The encoded chunk
+	'''
+
+	return b"".join((
+		pack_digits(cells.translate(EAST_DIGITS)),
+		pack_digits(cells.translate(SOUTH_DIGITS)),
+		pack_digits(cells.translate(VISITED_DIGITS)),
+		pack_digits(cells[:width].translate(NORTH_DIGITS)),
+		pack_digits(cells[::width].translate(WEST_DIGITS))))
+
+def decode_chunk(data, width, rows):
+	'''
+	Function: decode_chunk
+	Description: Rebuilds the cell bytes of a chunk encoded by encode_chunk. Each bit plane is unpacked into one byte per cell and read as a single big integer, so that the planes can be shifted into their wall bits and summed in a few integer operations.
+	Parameters: data, width, rows
+		data: Bytes - The encoded chunk
+		width: Int - The x-dimensional length of the maze
+		rows: Int - The number of rows in the chunk
+	Return: Bytes - The cell bytes of the rows
+	'''
+
+	count = width * rows
+	plane_length = (count + 7) // 8
+	north_offset = 3 * plane_length
+	west_offset = north_offset + (width + 7) // 8
+
+	east = unpack_bits(data[:plane_length], count)
+	south = unpack_bits(data[plane_length:2 * plane_length], count)
+	visited = unpack_bits(data[2 * plane_length:north_offset], count)
+	first_north = unpack_bits(data[north_offset:west_offset], width)
+	first_west = unpack_bits(data[west_offset:], rows)
+
+	# Each cell's northern wall is the southern wall of the cell above, and its western wall is the eastern wall of the cell to its left.
+	north = first_north + south[:count - width]
+	west = b"".join([first_west[y:y + 1] + east[y * width:(y + 1) * width - 1] for y in range(rows)])
+
+	value = int.from_bytes(north, "big") * Grid.WALL_BITS[0]
+	value += int.from_bytes(east, "big") * Grid.WALL_BITS[1]
+	value += int.from_bytes(south, "big") * Grid.WALL_BITS[2]
+	value += int.from_bytes(west, "big") * Grid.WALL_BITS[3]
+	value += int.from_bytes(visited, "big") * Grid.VISITED_BIT
+
+	return value.to_bytes(count, "big")
+
+def save_maze(maze, outfile, compression=COMPRESSION_ZLIB, chunk_rows=None):
+	'''
+	Function: save_maze
+	Description: Writes a maze to a binary file, as a header (size, scale and seed), independently compressed chunks of rows, and an index of the chunks. Overlay content is not saved.
+	Parameters: maze, outfile, compression=COMPRESSION_ZLIB, chunk_rows=None
+		maze: Maze - The maze to save
+		outfile: File - The seekable binary file (or buffer) to write to
+		compression: Int - COMPRESSION_NONE, COMPRESSION_ZLIB or COMPRESSION_LZMA
+		chunk_rows: Int - The number of rows in each chunk (about DEFAULT_CHUNK_CELLS cells per chunk if None)
+	Return: None
+	'''
+
+	grid = maze.m_grid
+	width = grid.m_width
+	height = grid.m_height
+	if chunk_rows is None:
+		chunk_rows = max(1, DEFAULT_CHUNK_CELLS // max(width, 1))
+
+	# Write the header.
+	seed = b""
+	if maze.m_seed is not None:
+		seed = maze.m_seed.to_bytes((maze.m_seed.bit_length() + 8) // 8, "big", signed=True)
+	start = outfile.tell()
+	outfile.write(HEADER.pack(MAGIC, VERSION, compression, len(seed), width, height, maze.m_scale // 2, chunk_rows))
+	outfile.write(seed)
+
+	# Write each chunk, recording where it lies relative to the start of the file.
+	index = []
+	for y in range(0, height, chunk_rows):
+		chunk = compress(encode_chunk(bytes(grid.m_cells[y * width:min(y + chunk_rows, height) * width]), width), compression)
+		index.append((outfile.tell() - start, len(chunk)))
+		outfile.write(chunk)
+
+	# Write the index and the footer locating it.
+	index_offset = outfile.tell() - start
+	outfile.write(b"".join([INDEX_ENTRY.pack(offset, length) for offset, length in index]))
+	outfile.write(FOOTER.pack(index_offset, len(index)))
+
+def load_maze(infile):
+	'''
+	Function: load_maze
+	Description: Reads a maze written by save_maze.
+	Parameters: infile
+		infile: File - The seekable binary file (or buffer) to read from
+	Return: Maze - The loaded maze
+	'''
+
+	return MazeReader(infile).load()
+
+class MazeReader:
+	'''
+	Class: MazeReader
+	Description: Reads mazes written by save_maze. Only the header and the chunk index are read up front; the chunks themselves are read and decoded on demand, so that a single region of a large maze can be loaded without decoding the rest of the file.
+	'''
+
+	def __init__(self, infile):
+		'''
+		Method: __init__
+		Description: MazeReader constructor, which reads the header and the chunk index of the file.
+		Parameters: infile
+			infile: File - The seekable binary file (or buffer) to read from, positioned at the start of the maze
+		Return: None
+		'''
+
+		self.m_file = infile
+		self.m_start = infile.tell()
+
+		# Read the header.
+		magic, version, self.m_compression, seed_length, width, height, self.m_scale, self.m_chunk_rows = HEADER.unpack(infile.read(HEADER.size))
+		if magic != MAGIC:
+			raise ValueError("Not a maze file")
+		if version != VERSION:
+			raise ValueError("Unsupported maze file version " + str(version))
+
+		self.m_size = (width, height)
+		self.m_seed = int.from_bytes(infile.read(seed_length), "big", signed=True) if seed_length else None
+
+		# Read the chunk index through the footer at the end of the file.
+		infile.seek(-FOOTER.size, 2)
+		index_offset, count = FOOTER.unpack(infile.read(FOOTER.size))
+		infile.seek(self.m_start + index_offset)
+		data = infile.read(count * INDEX_ENTRY.size)
+		self.m_index = [INDEX_ENTRY.unpack_from(data, i * INDEX_ENTRY.size) for i in range(count)]
+
+	def read_chunk(self, chunk):
+		'''
+		Method: read_chunk
+		Description: Reads and decodes a single chunk.
+		Parameters: chunk
+			chunk: Int - The number of the chunk
+		Return: Bytes - The cell bytes of the chunk's rows
+		'''
+
+		offset, length = self.m_index[chunk]
+		self.m_file.seek(self.m_start + offset)
+		first_row = chunk * self.m_chunk_rows
+		rows = min(first_row + self.m_chunk_rows, self.m_size[1]) - first_row
+
+		return decode_chunk(decompress(self.m_file.read(length), self.m_compression), self.m_size[0], rows)
+
+	def read_rows(self, first_row, last_row):
+		'''
+		Method: read_rows
+		Description: Reads a span of whole rows, decoding only the chunks overlapping it.
+		Parameters: first_row, last_row
+			first_row: Int - The first row of the span
+			last_row: Int - One past the last row of the span
+		Return: Bytes - The cell bytes of the rows
+		'''
+
+		width = self.m_size[0]
+		chunk_rows = self.m_chunk_rows
+		if first_row >= last_row:
+			return b""
+
+		spans = []
+		for chunk in range(first_row // chunk_rows, (last_row - 1) // chunk_rows + 1):
+			cells = self.read_chunk(chunk)
+			chunk_first = chunk * chunk_rows
+			spans.append(cells[(max(first_row, chunk_first) - chunk_first) * width:(min(last_row, chunk_first + chunk_rows) - chunk_first) * width])
+
+		return b"".join(spans)
+
+	def read_region(self, region):
+		'''
+		Method: read_region
+		Description: Reads the cells of a single region, decoding only the chunks overlapping it.
+		Parameters: region
+			region: Region - The region to read (clipped to the maze)
+		Return: Grid - The cells of the region (empty if the region lies outside of the maze), in which the region's lowest corner lies at (0, 0)
+		'''
+
+		width, height = self.m_size
+		x0 = max(region.m_range[0][0], 0)
+		x1 = min(region.m_range[0][1] + 1, width)
+		y0 = max(region.m_range[1][0], 0)
+		y1 = min(region.m_range[1][1] + 1, height)
+		if x0 >= x1 or y0 >= y1:
+			return Grid((0, 0))
+
+		cells = self.read_rows(y0, y1)
+		if x0 > 0 or x1 < width:
+			cells = b"".join([cells[y * width + x0:y * width + x1] for y in range(y1 - y0)])
+
+		return Grid((x1 - x0, y1 - y0), bytearray(cells))
+
+	def load(self):
+		'''
+		Method: load
+		Description: Reads the whole maze.
+		Parameters: No parameters
+		Return: Maze - The loaded maze
+		'''
+
+		maze = Maze(self.m_size, self.m_scale, self.m_seed)
+		maze.m_grid.m_cells[:] = self.read_rows(0, self.m_size[1])
+
+		return maze
\ No newline at end of file
@@ -0,0 +1,175 @@
+'''
+Module: stream
+Author: David Frye
+Description: Contains the MazeStream class, which generates mazes of unbounded height one row at a time, along with writers for streamed rows.
+'''
+
+import random
+
+from generator import Eller
+from grid import Grid
+from maze import Maze
+from renderer import build_tables
+from renderer import render_bottom
+from renderer import render_row
+
+class MazeStream:
+	'''
+	Class: MazeStream
+	Description: Represents a maze of fixed width and unbounded height, generated lazily one row at a time with Eller's algorithm. Only a single row of state is kept, so memory use is independent of height. Rows are yielded as bytes in the cell byte format of Grid.
+	'''
+
+	def __init__(self, width, rng=None, state=None):
+		'''
+		Method: __init__
+		Description: MazeStream constructor.
+		Parameters: width, rng=None, state=None
+			width: Int - The x-dimensional length of the maze
+			rng: Random - The source of randomness (the global random module if None)
+			state: Tuple - A state previously returned by get_state, to resume generation from
+		Return: None
+		'''
+
+		self.m_width = width
+		self.m_random = rng if rng is not None else random
+		self.m_eller = Eller(self.m_random)
+
+		# The number of rows generated so far.
+		self.m_row = 0
+		# The set of each cell in the next row.
+		self.m_sets = list(range(width))
+		# Whether or not the wall north of each cell in the next row has been carved.
+		self.m_north = [False] * width
+		# The next unused set number.
+		self.m_next_set = width
+
+		if state is not None:
+			self.set_state(state)
+
+	def get_state(self):
+		'''
+		Method: get_state
+		Description: Gets the state of the stream, from which generation can later be resumed (including the state of the source of randomness, so that the resumed rows are identical).
+		Parameters: No parameters
+		Return: Tuple - The state of the stream
+		'''
+
+		return (self.m_width, self.m_row, list(self.m_sets), list(self.m_north), self.m_next_set, self.m_random.getstate())
+
+	def set_state(self, state):
+		'''
+		Method: set_state
+		Description: Restores a state previously returned by get_state.
+		Parameters: state
+			state: Tuple - The state of the stream
+		Return: None
+		'''
+
+		if state[0] != self.m_width:
+			raise ValueError("Stream state of width " + str(state[0]) + " cannot resume a stream of width " + str(self.m_width))
+
+		self.m_row = state[1]
+		self.m_sets = list(state[2])
+		self.m_north = list(state[3])
+		self.m_next_set = state[4]
+		self.m_random.setstate(state[5])
+
+	def next_row(self, last=False):
+		'''
+		Method: next_row
+		Description: Generates the next row of the maze.
+		Parameters: last=False
+			last: Boolean - Whether or not this is the last row (which joins every remaining set, closing the maze)
+		Return: Bytes - The cell bytes of the row
+		'''
+
+		width = self.m_width
+		east, south, self.m_sets, self.m_next_set = self.m_eller.join_row(self.m_sets, [not last] * width, last, self.m_next_set)
+
+		row = bytearray([Grid.VISITED_BIT]) * width
+		for x in range(width):
+			if not self.m_north[x]:
+				row[x] |= Grid.WALL_BITS[0]
+			if not east[x]:
+				row[x] |= Grid.WALL_BITS[1]
+			if not south[x]:
+				row[x] |= Grid.WALL_BITS[2]
+			if x == 0 or not east[x - 1]:
+				row[x] |= Grid.WALL_BITS[3]
+
+		self.m_north = south
+		self.m_row += 1
+
+		return bytes(row)
+
+	def rows(self, count=None):
+		'''
+		Method: rows
+		Description: Lazily generates rows of the maze.
+		Parameters: count=None
+			count: Int - The number of rows to generate, the last of which closes the maze (rows are generated forever if None)
+		Return: Generator(Bytes) - The cell bytes of each row
+		'''
+
+		while count is None or count > 0:
+			if count is not None:
+				count -= 1
+			yield self.next_row(count == 0)
+
+def write_text(rows, outfile, width, scale=Maze.DEFAULT_SCALE, height=None):
+	'''
+	Function: write_text
+	Description: Pretty-prints streamed rows to a file, in the format of Maze.print_maze, writing each row as soon as it is generated.
+	Parameters: rows, outfile, width, scale=Maze.DEFAULT_SCALE, height=None
+		rows: Iterable(Bytes) - The cell bytes of each row
+		outfile: File - The text file to write to
+		width: Int - The x-dimensional length of the maze
+		scale: Int - The printing scale of the maze, used to determine spacing
+		height: Int - The y-dimensional length of the maze, for the header (no header is written if None)
+	Return: None
+	'''
+
+	scale = 2 * scale
+	tables = build_tables(scale)
+
+	# Print maze header.
+	if height is not None:
+		outfile.write("Maze (" + str(width) + " x " + str(height) + "):\n")
+
+	for row in rows:
+		outfile.write(render_row(row, tables, scale))
+
+	# Print bottom maze border.
+	outfile.write(render_bottom(width, scale))
+
+def write_binary(rows, outfile):
+	'''
+	Function: write_binary
+	Description: Writes streamed rows to a binary file, one cell byte per cell, writing each row as soon as it is generated.
+	Parameters: rows, outfile
+		rows: Iterable(Bytes) - The cell bytes of each row
+		outfile: File - The binary file to write to
+	Return: Int - The number of rows written
+	'''
+
+	count = 0
+	for row in rows:
+		outfile.write(row)
+		count += 1
+
+	return count
+
+def read_binary(infile, width):
+	'''
+	Function: read_binary
+	Description: Lazily reads rows previously written by write_binary.
+	Parameters: infile, width
+		infile: File - The binary file to read from
+		width: Int - The x-dimensional length of the maze
+	Return: Generator(Bytes) - The cell bytes of each row
+	'''
+
+	row = infile.read(width)
+	while len(row) == width:
+		yield row
+		row = infile.read(width)
\ No newline at end of file
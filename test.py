@@ -4,10 +4,31 @@ Author: David Frye
 Description: Tests the dynamically-mutating maze program. A prototype for Labyrinthine.
 '''
 
+import random
 import time
-
+import tracemalloc
+
+from batch import solve_batch
+from connectivity import ConnectivityIndex
+from engine import MutationEngine
+from engine import OpenJob
+from engine import RegenerateJob
+from engine import RewallJob
+from generator import Eller
+from generator import Kruskal
+from generator import Prim
+from generator import RecursiveBacktracker
+from generator import RecursiveDivision
+from generator import Wilson
+from grid import Grid
+from map import Map
 from maze import Maze
+from player import Player
 from region import Region
+from solver import BreadthFirstSolver
+from stream import MazeStream
+from stream import write_text
+from tracker import PathTracker
 from utility import Direction
 from utility import pause
 
@@ -77,10 +98,11 @@ def test_5():
 	width = maze.get_width()
 	height = maze.get_height()
 
-	maze.generate(Region((0, 0), endpoint=(width // 2, height // 2)))
-	maze.generate(Region((width // 2, 0), endpoint=(width, height // 2)))
-	maze.generate(Region((0, height // 2), endpoint=(width // 2, height)))
-	maze.generate(Region((width // 2, height // 2), endpoint=(width, height)))
+	maze.generate([
+		Region((0, 0), (width // 2, height // 2)),
+		Region((width // 2, 0), (width - width // 2, height // 2)),
+		Region((0, height // 2), (width // 2, height - height // 2)),
+		Region((width // 2, height // 2), (width - width // 2, height - height // 2))])
 	maze.print_maze()
 	utility.pause()
 	maze.reset(Region((0, 0), (width // 2, height // 2)))
@@ -106,13 +128,13 @@ def test_7():
 def test_8():
 	maze = Maze(size=(40, 1000))
 
-	time1 = time.clock()
+	time1 = time.perf_counter()
 	maze.generate()
-	time2 = time.clock()
+	time2 = time.perf_counter()
 	print("Generated in:", time2 - time1, "seconds.")
-	time1 = time.clock()
+	time1 = time.perf_counter()
 	maze.solve((maze.get_width() // 2, maze.get_height() // 2), (maze.get_width() - 1, maze.get_height() - 1), True)
-	time2 = time.clock()
+	time2 = time.perf_counter()
 	print("Solved in:", time2 - time1, "seconds.")
 	maze.print_maze()
 
@@ -129,9 +151,9 @@ def test_9():
 	maze.print_maze()
 
 def test_10():
-	time1 = time.clock()
+	time1 = time.perf_counter()
 
-	time11 = time.clock()
+	time11 = time.perf_counter()
 	width = 20
 	height = 20
 	center = ((width // 2) - 1, (height // 2) - 1)
@@ -148,33 +170,33 @@ def test_10():
 		Region(center, size=(2, 2)))
 
 	maze = Maze(size=(width, height))
-	time12 = time.clock()
+	time12 = time.perf_counter()
 
-	time3 = time.clock()
+	time3 = time.perf_counter()
 	for i in range(0, 4):
 		maze.generate(generate_regions[i], exempt_regions)
-	time4 = time.clock()
+	time4 = time.perf_counter()
 
-	time5 = time.clock()
+	time5 = time.perf_counter()
 	for exempt_region in exempt_regions:
 		maze.open(exempt_region)
-	time6 = time.clock()
+	time6 = time.perf_counter()
 
-	time7 = time.clock()
+	time7 = time.perf_counter()
 	for exempt_region in exempt_regions:
 		for cell_position in exempt_region.to_set():
 			maze.get_cell(cell_position).set_content("H")
-	time8 = time.clock()
+	time8 = time.perf_counter()
 
-	time9 = time.clock()
+	time9 = time.perf_counter()
 	maze.solve((0, 0), (width - 1, height - 1), True)
-	time10 = time.clock()
+	time10 = time.perf_counter()
 
-	time13 = time.clock()
+	time13 = time.perf_counter()
 	maze.print_maze()
-	time14 = time.clock()
+	time14 = time.perf_counter()
 
-	time2 = time.clock()
+	time2 = time.perf_counter()
 
 	time_total = time2 - time1
 	time_generate = time4 - time3
@@ -222,14 +244,19 @@ def test_11():
 		for cell_position in exempt_region.to_set():
 			maze.get_cell(cell_position).set_content("H")
 
+	tracker = PathTracker(maze)
+	handle = tracker.track((0, 0), (width - 1, height - 1))
+	connectivity = ConnectivityIndex(maze)
+	path_overlay = maze.get_overlay(Maze.OVERLAY_PATH)
+
 	count = 0
 	while True:
-		time1 = time.clock()
-		solved1 = maze.solve((0, 0), (width - 1, height - 1), True)
-		# solved2 = maze.solve((0, height - 1), center, True)
-		# solved3 = maze.solve((width - 1, 0), center, True)
-		# solved4 = maze.solve((width - 1, height - 1), center, True)
-		time2 = time.clock()
+		time1 = time.perf_counter()
+		# Only look for a path when one is known to exist.
+		solved1 = tracker.get_path(handle) if connectivity.connected((0, 0), (width - 1, height - 1)) else None
+		# The other corners' paths share the center as a goal, so they are found with a single search.
+		solved_batch = solve_batch(maze, (((0, height - 1), center), ((width - 1, 0), center), ((width - 1, height - 1), center)))
+		time2 = time.perf_counter()
 
 		
 		if (not solved1):# or (not solved2) or (not solved3) or (not solved4):
@@ -238,6 +265,13 @@ def test_11():
 			utility.pause()
 		else:
 			print("Solved in", round(time2 - time1, 2), "!")
+			path_overlay.clear()
+			for cell_position in solved1:
+				path_overlay.set(maze.m_grid.index(cell_position), "*")
+			for path in solved_batch:
+				if path is not None:
+					for i in range(0, len(path), 2):
+						path_overlay.set(maze.m_grid.index((path[i], path[i + 1])), "*")
 
 		maze.print_maze()
 		time.sleep(2)
@@ -254,6 +288,173 @@ def test_11():
 
 		count += 1
 
+def test_12():
+	sizes = ((40, 1000), (100, 1000), (300, 1000))
+	generators = (RecursiveBacktracker, Kruskal, Prim, Wilson, RecursiveDivision, Eller)
+
+	for size in sizes:
+		print()
+		print("Generating ", size[0], " x ", size[1], " (", size[0] * size[1], " cells):", sep="")
+		for generator in generators:
+			maze = Maze(size)
+			time1 = time.perf_counter()
+			maze.generate(generator=generator())
+			time2 = time.perf_counter()
+
+			# Measure memory separately, as tracing allocations slows generation down considerably.
+			maze = Maze(size)
+			tracemalloc.start()
+			maze.generate(generator=generator())
+			memory_peak = tracemalloc.get_traced_memory()[1]
+			tracemalloc.stop()
+
+			print("\t", generator.__name__, ": ", round(time2 - time1, 3), " seconds (", round(size[0] * size[1] / (time2 - time1)), " cells/second), ", round(memory_peak / 1024), " KiB peak", sep="")
+
+	print()
+
+def test_13():
+	width = 40
+	height = 100000
+	scale = 2
+
+	stream = MazeStream(width)
+	time1 = time.perf_counter()
+	with open("maze.txt", "w") as outfile:
+		write_text(stream.rows(height), outfile, width, scale, height)
+	time2 = time.perf_counter()
+	print("Streamed in:", time2 - time1, "seconds.")
+
+def check_coverage(maze, exemptions=None):
+	# Every cell outside of the exemptions must be visited, and reachable from every other.
+	grid = maze.m_grid
+	exempt = set([grid.index(position) for exemption in (exemptions or []) for position in exemption.to_set() if maze.is_valid_cell_position(position)])
+	valid = [index for index in range(grid.m_area) if index not in exempt]
+	unvisited = [index for index in valid if not grid.m_cells[index] & Grid.VISITED_BIT]
+	assert not unvisited, "Unvisited cells: " + str([grid.position(index) for index in unvisited[:10]])
+	parents = BreadthFirstSolver().search_tree(maze, valid[0], valid)
+	unreached = [index for index in valid if parents[index] < 0]
+	assert not unreached, "Unreachable cells: " + str([grid.position(index) for index in unreached[:10]])
+
+def test_14():
+	generators = (RecursiveBacktracker, Kruskal, Prim, Wilson, RecursiveDivision, Eller)
+	exemptions = [Region((12, 7), (3, 3))]
+
+	# Generate over partially visited regions, so that each generator must carve around (and join up with) visited cells.
+	for generator in generators:
+		for seed in range(10):
+			maze = Maze((40, 30), seed=seed)
+			maze.generate(Region((0, 0), (10, 10)), generator=generator())
+			maze.generate(Region((5, 5), (20, 10)), generator=generator())
+			maze.generate(Region((8, 3), (25, 20)), exemptions, generator=generator())
+			maze.generate(None, exemptions, generator=generator())
+			check_coverage(maze, exemptions)
+		print(generator.__name__, "covers partially visited regions.")
+
+def test_15():
+	region = Region((0, 0), (40, 40))
+	exemptions = [Region((15, 15), (10, 10))]
+
+	# Regenerate through the engine with a tiny budget, so that the job is spread over many ticks, then directly.
+	for generator in (RecursiveBacktracker, Kruskal, Prim, Wilson, RecursiveDivision, Eller):
+		for open_chance in (0, Maze.DEFAULT_OPEN_CHANCE):
+			banded = Maze((40, 40), seed=1)
+			banded.generate(generator=generator())
+			engine = MutationEngine(banded, 0.0002)
+			engine.schedule(RegenerateJob(region, exemptions, open_chance, generator()))
+			while not engine.is_idle():
+				engine.tick()
+
+			direct = Maze((40, 40), seed=1)
+			direct.generate(generator=generator())
+			direct.reset(region, exemptions)
+			direct.generate(region, exemptions, open_chance, generator())
+
+			assert bytes(banded.m_grid.m_cells) == bytes(direct.m_grid.m_cells), "Banded regeneration differs from direct regeneration"
+			check_coverage(banded, exemptions)
+		print(generator.__name__, "regenerates in", engine.m_tick_count, "ticks, as directly.")
+
+	# Open random regions a row at a time (with no budget), keeping their borders, around random exemptions, then directly.
+	for seed in range(100):
+		rng = random.Random(seed)
+		size = (rng.randint(3, 12), rng.randint(3, 12))
+		region = Region((rng.randint(-2, size[0] - 1), rng.randint(-2, size[1] - 1)), (rng.randint(1, 10), rng.randint(1, 10)))
+		exemptions = [Region((rng.randint(-1, size[0]), rng.randint(-1, size[1])), (rng.randint(1, 4), rng.randint(1, 4))) for count in range(rng.randint(0, 2))]
+
+		banded = Maze(size, seed=seed)
+		banded.generate()
+		engine = MutationEngine(banded, 0)
+		engine.schedule(OpenJob(region, exemptions, False))
+		while not engine.is_idle():
+			engine.tick()
+
+		direct = Maze(size, seed=seed)
+		direct.generate()
+		direct.open(region, exemptions, False)
+
+		assert bytes(banded.m_grid.m_cells) == bytes(direct.m_grid.m_cells), "Banded opening of " + str(region.m_range) + " differs from direct opening"
+	print("OpenJob opens as directly.")
+
+def test_16():
+	width = 60
+	height = 40
+	regions = [
+		Region((0, 0), (width // 2, height // 2)),
+		Region((width // 2, 0), (width - width // 2, height // 2)),
+		Region((0, height // 2), (width // 2, height - height // 2)),
+		Region((width // 2, height // 2), (width - width // 2, height - height // 2))]
+	exemptions = [Region((25, 15), (10, 10))]
+
+	# Generate the same partially visited maze serially and across processes.
+	mazes = []
+	for processes in (1, 2):
+		maze = Maze((width, height), seed=7)
+		maze.generate(Region((20, 5), (30, 8)), exemptions)
+		maze.generate(regions, exemptions, processes=processes)
+		check_coverage(maze, exemptions)
+		mazes.append(bytes(maze.m_grid.m_cells))
+
+	assert mazes[0] == mazes[1], "Parallel generation differs from serial generation"
+	print("Parallel generation matches serial generation.")
+
+def test_17():
+	maze = Maze((20, 20), seed=1)
+	maze.generate()
+	tracker = PathTracker(maze)
+
+	# Endpoints outside of the maze are rejected up front, rather than searched from after later mutations.
+	for start, end in (((-1, 0), (5, 5)), ((5, 5), (20, 0)), ((0, -1), (0, 20))):
+		try:
+			tracker.track(start, end)
+		except ValueError:
+			continue
+		assert False, "Tracked a path from " + str(start) + " to " + str(end)
+
+	handle = tracker.track((0, 0), (19, 19))
+	maze.open(Region((5, 5), (4, 4)))
+	path = tracker.get_path(handle)
+	assert path is not None and path[0] == (0, 0) and path[-1] == (19, 19), "Tracked path was lost"
+	print("Invalid endpoints are rejected.")
+
+def test_18():
+	# Regenerate around crowds of players (some of them next to each other, or sealed in by each other), then check that none was cut off.
+	for margin, count in ((0, 40), (1, 5)):
+		for seed in range(30):
+			rng = random.Random(seed)
+			maze = Maze((20, 20), seed=seed)
+			maze.generate()
+			world = Map(maze)
+			for number in range(count):
+				world.add_player(Player(str(number)), (rng.randrange(20), rng.randrange(20)))
+
+			world.reset(margin=margin)
+			world.generate(margin=margin)
+
+			# Each player must reach most of the maze, rather than a pocket of it.
+			for player in world.get_players():
+				parents = BreadthFirstSolver().search_tree(maze, maze.m_grid.index(player.m_position), range(maze.m_grid.m_area))
+				assert sum(1 for parent in parents if parent >= 0) > maze.m_grid.m_area // 2, "Player " + player.m_name + " was cut off at " + str(player.m_position)
+		print("No player is cut off with a margin of", margin)
+
 def test_miscellaneous():
 	region = Region((0, 5), (10, 15))
 	print(region.m_range)
@@ -271,13 +472,18 @@ def test_run():
 	maze = Maze()
 	player = Region((0, 0), endpoint=(5, 5))
 	maze.generate(player)
-	maze.get_cell(player.m_position).m_content = "P"
+	player_overlay = maze.get_overlay(Maze.OVERLAY_PLAYER)
+	player_overlay.set(maze.m_grid.index(player.m_position), "P")
+	engine = MutationEngine(maze)
+
+	def on_tick(engine, latency):
+		nonlocal player
 
-	while True:
 		maze.print_maze()
-		print("Updating")
-		maze.get_cell(player.m_position).m_content = "*"
-		maze.reset(player)
+		print("Updating (last tick took", round(latency * 1000, 2), "ms)")
+		player_overlay.clear()
+		maze.set_cell_content(player.m_position, "*")
+		engine.schedule(RewallJob(player))
 
 		new_x = player.m_position[0]
 		new_y = player.m_position[1]
@@ -290,10 +496,10 @@ def test_run():
 		else:
 			new_x += 1
 		player = Region((new_x, new_y), player.m_size)
-		maze.generate(player)
-		maze.get_cell(player.m_position).m_content = "P"
+		engine.schedule(RegenerateJob(player, reset=False))
+		player_overlay.set(maze.m_grid.index(player.m_position), "P")
 
-		time.sleep(1)
+	engine.run(1, on_tick=on_tick)
 
 def test_harness():
 	user_input_prompt = "Test: "
@@ -324,6 +530,20 @@ def test_harness():
 			test_10()
 		elif user_input == "11":
 			test_11()
+		elif user_input == "12":
+			test_12()
+		elif user_input == "13":
+			test_13()
+		elif user_input == "14":
+			test_14()
+		elif user_input == "15":
+			test_15()
+		elif user_input == "16":
+			test_16()
+		elif user_input == "17":
+			test_17()
+		elif user_input == "18":
+			test_18()
 		elif user_input == "m":
 			test_miscellaneous()
 		elif user_input == "r":
@@ -0,0 +1,324 @@
+'''
+Module: tracker
+Author: David Frye
+Description: Contains the PathTracker class, which keeps registered solution paths up to date as the maze is mutated.
+'''
+
+from maze import Maze
+from observer import MazeObserver
+from region import Region
+from solver import BreadthFirstSolver
+
+class TrackedPath:
+	'''
+	Class: TrackedPath
+	Description: Represents a single start/end pair registered with a PathTracker, along with its current solution path.
+	'''
+
+	def __init__(self, start_index, end_index):
+		'''
+		Method: __init__
+		Description: TrackedPath constructor.
+		Parameters: start_index, end_index
+			start_index: Int - The flat index of the cell the path begins at
+			end_index: Int - The flat index of the cell the path ends at
+		Return: None
+		'''
+
+		self.m_start_index = start_index
+		self.m_end_index = end_index
+		# The flat indices of the cells along the path (from start to end), or None if there is no path.
+		self.m_path = None
+		# The offset of each cell along the path, keyed by flat index.
+		self.m_offsets = {}
+
+	def set_path(self, path):
+		'''
+		Method: set_path
+		Description: Replaces the path, cutting out any loops (so that every cell appears along it only once).
+		Parameters: path
+			path: [Int] - The flat indices of the cells along the new path, or None if there is no path
+		Return: None
+		'''
+
+		self.m_offsets = {}
+		if path is None:
+			self.m_path = None
+			return
+
+		# Whenever a cell is revisited, drop the loop walked since its first visit.
+		offsets = self.m_offsets
+		simple_path = []
+		for index in path:
+			offset = offsets.get(index)
+			if offset is None:
+				offsets[index] = len(simple_path)
+				simple_path.append(index)
+			else:
+				for looped_index in simple_path[offset + 1:]:
+					del offsets[looped_index]
+				del simple_path[offset + 1:]
+
+		self.m_path = simple_path
+
+class PathTracker(MazeObserver):
+	'''
+	Class: PathTracker
+	Description: Tracks the solution paths between registered start/end pairs of a maze. Mutations are collected as they happen and applied lazily, the next time a path is requested: paths which no mutated region touches are left as they are, and a broken path only has the segment running through the mutated regions re-solved, by a search confined to a window around them. A full solve is only needed when the window holds no detour. Paths remain valid after every update, but openings which do not touch a path are not searched for shortcuts.
+	'''
+
+	DEFAULT_MARGIN = 8
+
+	def __init__(self, maze, solver=None, margin=DEFAULT_MARGIN):
+		'''
+		Method: __init__
+		Description: PathTracker constructor, which registers the tracker as an observer of the maze.
+		Parameters: maze, solver=None, margin=DEFAULT_MARGIN
+			maze: Maze - The maze to track paths through
+			solver: Solver - The maze solving algorithm used for full solves (a BreadthFirstSolver if None)
+			margin: Int - The number of cells the repair search window extends past the mutated regions
+		Return: None
+		'''
+
+		self.m_maze = maze
+		self.m_solver = solver if solver is not None else BreadthFirstSolver()
+		self.m_margin = margin
+		# The tracked paths, keyed by handle.
+		self.m_paths = {}
+		self.m_next_handle = 0
+		# The (region, kind) of every mutation since the last update.
+		self.m_pending = []
+
+		maze.add_observer(self)
+
+	def detach(self):
+		'''
+		Method: detach
+		Description: Stops tracking the maze, unregistering the tracker as an observer.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		self.m_maze.remove_observer(self)
+
+	def track(self, start_cell_position, end_cell_position):
+		'''
+		Method: track
+		Description: Registers a start/end pair, solving the path between them. Both cell positions must lie within the maze.
+		Parameters: start_cell_position, end_cell_position
+			start_cell_position: 2-Tuple - The cell position the path begins at
+			end_cell_position: 2-Tuple - The cell position the path ends at
+		Return: Int - A handle to the tracked path
+		'''
+
+		maze = self.m_maze
+		for position in (start_cell_position, end_cell_position):
+			if not maze.is_valid_cell_position(position):
+				raise ValueError("Path endpoint " + str(position) + " lies outside of the maze")
+
+		# Bring the other paths up to date first, as the pending mutations do not apply to the new path.
+		self.update()
+
+		tracked_path = TrackedPath(maze.m_grid.index(start_cell_position), maze.m_grid.index(end_cell_position))
+		tracked_path.set_path(self.solve(tracked_path))
+
+		handle = self.m_next_handle
+		self.m_next_handle += 1
+		self.m_paths[handle] = tracked_path
+
+		return handle
+
+	def untrack(self, handle):
+		'''
+		Method: untrack
+		Description: Unregisters a start/end pair.
+		Parameters: handle
+			handle: Int - The handle of the tracked path
+		Return: None
+		'''
+
+		self.m_paths.pop(handle, None)
+
+	def get_path(self, handle):
+		'''
+		Method: get_path
+		Description: Gets the current path between a registered start/end pair, applying any pending mutations first.
+		Parameters: handle
+			handle: Int - The handle of the tracked path
+		Return: [2-Tuple] - A list of cell positions denoting the path, or None if there is no path
+		'''
+
+		self.update()
+
+		path = self.m_paths[handle].m_path
+		if path is None:
+			return None
+
+		return [self.m_maze.m_grid.position(index) for index in path]
+
+	def on_mutation(self, maze, regions, kind):
+		'''
+		Method: on_mutation
+		Description: Records a mutation of the maze, to be applied at the next update.
+		Parameters: maze, regions, kind
+			maze: Maze - The mutated maze
+			regions: [Region] - The regions containing every cell whose walls may have changed
+			kind: String - Maze.MUTATION_OPEN or Maze.MUTATION_CLOSE
+		Return: None
+		'''
+
+		self.m_pending += [(region, kind) for region in regions]
+
+	def update(self):
+		'''
+		Method: update
+		Description: Applies every pending mutation to every tracked path.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		if not self.m_pending:
+			return
+
+		for tracked_path in self.m_paths.values():
+			self.repair(tracked_path)
+
+		self.m_pending = []
+
+	def repair(self, tracked_path):
+		'''
+		Method: repair
+		Description: Applies every pending mutation to a tracked path, re-solving only the segment running through the mutated regions.
+		Parameters: tracked_path
+			tracked_path: TrackedPath - The tracked path to repair
+		Return: None
+		'''
+
+		path = tracked_path.m_path
+		grid = self.m_maze.m_grid
+
+		# Closing walls cannot connect an unsolvable pair, but opening them might.
+		if path is None:
+			if any(kind == Maze.MUTATION_OPEN for region, kind in self.m_pending):
+				tracked_path.set_path(self.solve(tracked_path))
+			return
+
+		# Find the first and last cells along the path touched by any mutation, visiting whichever is smaller: the mutated region or the path.
+		first = len(path)
+		last = -1
+		touching = []
+		opened = False
+		offsets = tracked_path.m_offsets
+		for region, kind in self.m_pending:
+			touched = []
+			if region.get_area() < len(path):
+				(x0, x1), (y0, y1) = region.m_range
+				for y in range(y0, y1 + 1):
+					for index in range(y * grid.m_width + x0, y * grid.m_width + x1 + 1):
+						if index in offsets:
+							touched.append(offsets[index])
+			else:
+				touched = [offset for offset, index in enumerate(path) if region.contains(grid.position(index))]
+
+			if touched:
+				first = min(first, min(touched))
+				last = max(last, max(touched))
+				touching.append(region)
+				opened = opened or kind == Maze.MUTATION_OPEN
+
+		if not touching:
+			return
+
+		# A segment which is still intact only needs re-solving if it might now be shortened.
+		if not opened and self.is_intact(path, first, last):
+			return
+
+		# Re-solve the segment within a window around the touching mutations, falling back to a full solve.
+		window = Region((min(region.m_range[0][0] for region in touching), min(region.m_range[1][0] for region in touching)), endpoint=(max(region.m_range[0][1] for region in touching), max(region.m_range[1][1] for region in touching)))
+		window = self.m_maze.m_region.intersect(window.grow(self.m_margin))
+		segment = self.search(path[first], path[last], window)
+		if segment is None:
+			tracked_path.set_path(self.solve(tracked_path))
+		else:
+			tracked_path.set_path(path[:first] + segment + path[last + 1:])
+
+	def is_intact(self, path, first, last):
+		'''
+		Method: is_intact
+		Description: Determines whether or not every wall crossed by a segment of a path is still open.
+		Parameters: path, first, last
+			path: [Int] - The flat indices of the cells along the path
+			first: Int - The offset of the first cell of the segment
+			last: Int - The offset of the last cell of the segment
+		Return: Boolean - Whether or not the segment is intact
+		'''
+
+		grid = self.m_maze.m_grid
+		cells = grid.m_cells
+		steps = {-grid.m_width: grid.WALL_BITS[0], 1: grid.WALL_BITS[1], grid.m_width: grid.WALL_BITS[2], -1: grid.WALL_BITS[3]}
+		for offset in range(first, last):
+			if cells[path[offset]] & steps[path[offset + 1] - path[offset]]:
+				return False
+
+		return True
+
+	def search(self, start_index, end_index, window):
+		'''
+		Method: search
+		Description: Finds a shortest path between two cells with a breadth-first search confined to a window, recording the search tree in a dictionary so that its cost scales with the window rather than the maze.
+		Parameters: start_index, end_index, window
+			start_index: Int - The flat index of the cell to begin searching from
+			end_index: Int - The flat index of the cell to target in the search
+			window: Region - The region the search is confined to
+		Return: [Int] - The flat indices of the cells along the path (from start to end), or None if no path lies within the window
+		'''
+
+		grid = self.m_maze.m_grid
+		cells = grid.m_cells
+		width = grid.m_width
+		offsets = grid.m_offsets
+		open_directions = self.m_solver.OPEN_DIRECTIONS
+		(x0, x1), (y0, y1) = window.m_range
+
+		parents = {start_index: start_index}
+		queue = [start_index]
+		for current in queue:
+			if current == end_index:
+				path = self.m_solver.backtrace(parents, end_index)
+				path.reverse()
+				return path
+
+			y, x = divmod(current, width)
+			for direction in open_directions[cells[current] & 15]:
+				if direction == 0:
+					if y == y0:
+						continue
+				elif direction == 1:
+					if x == x1:
+						continue
+				elif direction == 2:
+					if y == y1:
+						continue
+				elif x == x0:
+					continue
+
+				neighbor = current + offsets[direction]
+				if neighbor not in parents:
+					parents[neighbor] = current
+					queue.append(neighbor)
+
+		return None
+
+	def solve(self, tracked_path):
+		'''
+		Method: solve
+		Description: Solves a tracked path from scratch.
+		Parameters: tracked_path
+			tracked_path: TrackedPath - The tracked path to solve
+		Return: [Int] - The flat indices of the cells along the path (from start to end), or None if there is no path
+		'''
+
+		if tracked_path.m_start_index == tracked_path.m_end_index:
+			return [tracked_path.m_start_index]
+
+		return self.m_solver.solve(self.m_maze, tracked_path.m_start_index, tracked_path.m_end_index)
\ No newline at end of file
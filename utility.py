@@ -5,6 +5,7 @@ Description: Contains a variety of helper Classes.
 '''
 
 import enum
+import hashlib
 import random
 
 class Direction(enum.Enum):
@@ -60,5 +61,45 @@ class Direction(enum.Enum):
 
 		return Direction((direction.value - 1) % 4)
 
+def derive_seed(seed, *keys):
+	'''
+	Function: derive_seed
+	Description: Derives an independent seed from a base seed and the given keys (e.g. a region's range or a chunk's position). The derivation is a hash, so it is identical across processes and does not depend on the order in which seeds are derived.
+	Parameters: seed, *keys
+		seed: Int - The base seed
+		keys: Ints/Strings - The keys identifying what the seed is for
+	Return: Int - The derived seed
+	'''
+
+	digest = hashlib.blake2b(":".join([str(key) for key in (seed, ) + keys]).encode(), digest_size=8).digest()
+	return int.from_bytes(digest, "little")
+
+def derive_random(seed, *keys):
+	'''
+	Function: derive_random
+	Description: Creates an independent random stream derived from a base seed and the given keys.
+	Parameters: seed, *keys
+		seed: Int - The base seed
+		keys: Ints/Strings - The keys identifying what the stream is for
+	Return: Random - The derived random stream
+	'''
+
+	return random.Random(derive_seed(seed, *keys))
+
+def exhaust(steps):
+	'''
+	Function: exhaust
+	Description: Runs a resumable (generator-based) computation to completion.
+	Parameters: steps
+		steps: Generator - The computation, which yields between slices of work
+	Return: Object - The computation's result (the value it returns)
+	'''
+
+	while True:
+		try:
+			next(steps)
+		except StopIteration as stop:
+			return stop.value
+
 def pause():
 	input("Paused! Press 'Enter' to continue...")
\ No newline at end of file
@@ -0,0 +1,346 @@
+'''
+Module: world
+Author: David Frye
+Description: Contains the World class.
+'''
+
+import collections
+import os
+import pickle
+import tempfile
+
+from generator import RecursiveBacktracker
+from maze import Maze
+from region import Region
+from storage import load_maze
+from storage import save_maze
+from utility import Direction
+from utility import derive_random
+from utility import derive_seed
+
+class World:
+	'''
+	Class: World
+	Description: Represents an unbounded maze, split into fixed-size chunks which are each a Maze. Chunks are generated on first access from a deterministic per-chunk seed, and the seams between neighboring chunks are opened at positions derived from a per-seam seed, so that either side of a seam agrees regardless of which chunk was generated first. Only the most recently used chunks are kept in memory.
+	'''
+
+	DEFAULT_CHUNK_WIDTH = 32
+	DEFAULT_CHUNK_HEIGHT = 32
+	DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+	DEFAULT_SEAM_OPENINGS = 2
+	# The position offset to the neighboring cell, indexed by direction value.
+	DIRECTION_OFFSETS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+	def __init__(self, chunk_size=(DEFAULT_CHUNK_WIDTH, DEFAULT_CHUNK_HEIGHT), seed=0, max_bytes=DEFAULT_MAX_BYTES, open_chance=Maze.DEFAULT_OPEN_CHANCE, seam_openings=DEFAULT_SEAM_OPENINGS, spill_directory=None):
+		'''
+		Method: __init__
+		Description: World constructor.
+		Parameters: chunk_size=(DEFAULT_CHUNK_WIDTH, DEFAULT_CHUNK_HEIGHT), seed=0, max_bytes=DEFAULT_MAX_BYTES, open_chance=Maze.DEFAULT_OPEN_CHANCE, seam_openings=DEFAULT_SEAM_OPENINGS, spill_directory=None
+			chunk_size: 2-Tuple - The dimensional lengths of each chunk
+				[0] - Chunk x-dimensional length
+				[1] - Chunk y-dimensional length
+			seed: Int - The seed from which every chunk and seam is derived
+			max_bytes: Int - The approximate cap on the cell storage of the chunks kept in memory
+			open_chance: The percent chance that each cell of a generated chunk will have a wall to an already-visited neighbor knocked down
+			seam_openings: Int - The number of passages opened along each seam between neighboring chunks
+			spill_directory: String - The directory evicted mutated chunks are written to (a temporary directory, created on first use, if None)
+		Return: None
+		'''
+
+		self.m_chunk_size = chunk_size
+		self.m_seed = seed
+		self.m_open_chance = open_chance
+		self.m_seam_openings = min(seam_openings, chunk_size[0], chunk_size[1])
+		# The maximum number of chunks kept in memory at once.
+		self.m_max_chunks = max(1, max_bytes // (chunk_size[0] * chunk_size[1]))
+		# The chunks kept in memory, keyed by chunk position, from least to most recently used.
+		self.m_chunks = collections.OrderedDict()
+		# The chunk positions which have been mutated since they were generated.
+		self.m_dirty = set([])
+		# The positions of evicted dirty chunks, whose cells and overlay marks are spilled to disk (clean chunks are simply regenerated).
+		self.m_evicted = set([])
+		self.m_spill_directory = spill_directory
+		# The temporary directory backing the spill directory, if none was given.
+		self.m_temporary_directory = None
+
+	def seam_openings(self, chunk_position, direction):
+		'''
+		Method: seam_openings
+		Description: Gets the offsets along the given border of the given chunk at which the seam with the neighboring chunk is opened.
+		Parameters: chunk_position, direction
+			chunk_position: 2-Tuple - The position of the chunk
+			direction: Direction - The border of the chunk
+		Return: [Int] - The offsets along the border (x-offsets for northern/southern borders, y-offsets for eastern/western borders)
+		'''
+
+		# Each seam is identified by the chunk to its north/west, so that both chunks derive the same openings.
+		chunk_x, chunk_y = chunk_position
+		if direction == Direction.WEST:
+			chunk_x -= 1
+			direction = Direction.EAST
+		elif direction == Direction.NORTH:
+			chunk_y -= 1
+			direction = Direction.SOUTH
+
+		length = self.m_chunk_size[1] if direction == Direction.EAST else self.m_chunk_size[0]
+		rng = derive_random(self.m_seed, "seam", direction.name, chunk_x, chunk_y)
+		return rng.sample(range(length), self.m_seam_openings)
+
+	def to_chunk(self, position):
+		'''
+		Method: to_chunk
+		Description: Splits a world position into the position of the chunk containing it and the position within that chunk.
+		Parameters: position
+			position: 2-Tuple - A world position (which may be negative)
+		Return: 2-Tuple - The chunk position and the position within the chunk
+		'''
+
+		chunk_x, local_x = divmod(position[0], self.m_chunk_size[0])
+		chunk_y, local_y = divmod(position[1], self.m_chunk_size[1])
+		return ((chunk_x, chunk_y), (local_x, local_y))
+
+	def get_chunk(self, chunk_position):
+		'''
+		Method: get_chunk
+		Description: Gets the chunk at the given chunk position, generating or reloading it if it is not in memory, and evicting the least recently used chunks if necessary.
+		Parameters: chunk_position
+			chunk_position: 2-Tuple - The position of the chunk
+		Return: Maze - The chunk
+		'''
+
+		chunk = self.m_chunks.get(chunk_position)
+		if chunk is not None:
+			self.m_chunks.move_to_end(chunk_position)
+			return chunk
+
+		if chunk_position in self.m_evicted:
+			chunk = self.reload(chunk_position)
+		else:
+			chunk = Maze(self.m_chunk_size)
+			chunk.generate(open_chance=self.m_open_chance, generator=RecursiveBacktracker(derive_random(self.m_seed, "chunk", chunk_position[0], chunk_position[1])))
+			self.stitch(chunk_position, chunk)
+
+		self.m_chunks[chunk_position] = chunk
+		while len(self.m_chunks) > self.m_max_chunks:
+			self.evict()
+
+		return chunk
+
+	def spill_path(self, chunk_position):
+		'''
+		Method: spill_path
+		Description: Gets the path (without extension) of the spill files of the chunk at the given chunk position, creating the spill directory if necessary.
+		Parameters: chunk_position
+			chunk_position: 2-Tuple - The position of the chunk
+		Return: String - The path of the chunk's spill files, without extension
+		'''
+
+		if self.m_spill_directory is None:
+			self.m_temporary_directory = tempfile.TemporaryDirectory(prefix="world-")
+			self.m_spill_directory = self.m_temporary_directory.name
+		os.makedirs(self.m_spill_directory, exist_ok=True)
+
+		return os.path.join(self.m_spill_directory, "chunk_{}_{}".format(chunk_position[0], chunk_position[1]))
+
+	def evict(self):
+		'''
+		Method: evict
+		Description: Evicts the least recently used chunk from memory, spilling it to disk (cells in the storage format, overlay marks alongside) only if it has been mutated since it was generated.
+		Parameters: No parameters
+		Return: None
+		'''
+
+		chunk_position, chunk = self.m_chunks.popitem(last=False)
+		if chunk_position not in self.m_dirty:
+			return
+
+		path = self.spill_path(chunk_position)
+		with open(path + ".maze", "wb") as outfile:
+			save_maze(chunk, outfile)
+		marks = dict([(name, dict(overlay.m_marks)) for name, overlay in chunk.m_overlays.items() if not overlay.is_empty()])
+		if marks:
+			with open(path + ".marks", "wb") as outfile:
+				pickle.dump(marks, outfile)
+		self.m_evicted.add(chunk_position)
+
+	def reload(self, chunk_position):
+		'''
+		Method: reload
+		Description: Reloads an evicted chunk from its spill files, removing them.
+		Parameters: chunk_position
+			chunk_position: 2-Tuple - The position of the chunk
+		Return: Maze - The chunk
+		'''
+
+		self.m_evicted.remove(chunk_position)
+		path = self.spill_path(chunk_position)
+		with open(path + ".maze", "rb") as infile:
+			chunk = load_maze(infile)
+		os.remove(path + ".maze")
+		if os.path.exists(path + ".marks"):
+			with open(path + ".marks", "rb") as infile:
+				for name, marks in pickle.load(infile).items():
+					chunk.get_overlay(name).m_marks.update(marks)
+			os.remove(path + ".marks")
+
+		return chunk
+
+	def stitch(self, chunk_position, chunk, region=None):
+		'''
+		Method: stitch
+		Description: Opens the given chunk's side of the seam openings along its borders.
+		Parameters: chunk_position, chunk, region=None
+			chunk_position: 2-Tuple - The position of the chunk
+			chunk: Maze - The chunk
+			region: Region - A region (in chunk coordinates) outside of which openings are left alone
+		Return: None
+		'''
+
+		width, height = self.m_chunk_size
+		for direction in list(Direction):
+			for offset in self.seam_openings(chunk_position, direction):
+				if direction == Direction.NORTH:
+					position = (offset, 0)
+				elif direction == Direction.EAST:
+					position = (width - 1, offset)
+				elif direction == Direction.SOUTH:
+					position = (offset, height - 1)
+				else:
+					position = (0, offset)
+
+				if region is None or region.contains(position):
+					chunk.m_grid.set_wall_side(chunk.m_grid.index(position), direction, False)
+
+	def chunk_regions(self, region):
+		'''
+		Method: chunk_regions
+		Description: Splits a world region into the parts falling within each chunk.
+		Parameters: region
+			region: Region - A world region
+		Return: [2-Tuple] - The chunk position and the part of the region (in chunk coordinates) for each overlapped chunk
+		'''
+
+		width, height = self.m_chunk_size
+		(x0, x1), (y0, y1) = region.m_range
+		parts = []
+		for chunk_y in range(y0 // height, y1 // height + 1):
+			for chunk_x in range(x0 // width, x1 // width + 1):
+				origin = (chunk_x * width, chunk_y * height)
+				part = region.intersect(Region(origin, self.m_chunk_size))
+				if part is not None:
+					parts.append(((chunk_x, chunk_y), part.translate((-origin[0], -origin[1]))))
+
+		return parts
+
+	def mutate(self, operation, region, exemptions):
+		'''
+		Method: mutate
+		Description: Applies a maze operation to every chunk overlapped by the given world region, keeping the seams stitched.
+		Parameters: operation, region, exemptions
+			operation: Function(Maze, Region, Regions) - The operation to apply to each chunk, given the parts of the region and exemptions in chunk coordinates
+			region: Region - A world region
+			exemptions: Regions - A collection of world regions for the operation to avoid
+		Return: None
+		'''
+
+		for chunk_position, part in self.chunk_regions(region):
+			origin = (-chunk_position[0] * self.m_chunk_size[0], -chunk_position[1] * self.m_chunk_size[1])
+			chunk = self.get_chunk(chunk_position)
+			local_exemptions = None if exemptions is None else [exemption.translate(origin) for exemption in exemptions]
+			operation(chunk, part, local_exemptions)
+			self.stitch(chunk_position, chunk, part)
+			self.m_dirty.add(chunk_position)
+
+	def reset(self, region, exemptions=None):
+		'''
+		Method: reset
+		Description: Reset cells inside the provided world region whose coordinates do not also fall within any of the provided exemption ranges.
+		Parameters: region, exemptions=None
+			region: Region - A world region for maze reset to span
+			exemptions: Regions - A collection of world regions for maze reset to avoid
+		Return: None
+		'''
+
+		self.mutate(lambda chunk, part, local_exemptions: chunk.reset(part, local_exemptions), region, exemptions)
+
+	def generate(self, region, exemptions=None, open_chance=None, generator=None, seed=None):
+		'''
+		Method: generate
+		Description: Generate a maze within the provided world region (each chunk separately, connected through the seam openings).
+		Parameters: region, exemptions=None, open_chance=None, generator=None, seed=None
+			region: Region - A world region for maze generation to span
+			exemptions: Regions - A collection of world regions for maze generation to avoid
+			open_chance: The percent chance that each cell will have a wall to an already-visited neighbor knocked down (the world's open chance if None)
+			generator: Generator - The maze generation algorithm to use (a RecursiveBacktracker if None)
+			seed: Int - The seed from which the random stream of each chunk's part of the region is derived (the global random module is used if None)
+		Return: None
+		'''
+
+		if open_chance is None:
+			open_chance = self.m_open_chance
+
+		for chunk_position, part in self.chunk_regions(region):
+			chunk_seed = None if seed is None else derive_seed(seed, "world", chunk_position[0], chunk_position[1])
+			self.mutate(lambda chunk, part, local_exemptions: chunk.generate(part, local_exemptions, open_chance, generator, chunk_seed), part.translate((chunk_position[0] * self.m_chunk_size[0], chunk_position[1] * self.m_chunk_size[1])), exemptions)
+
+	def open(self, region, exemptions=None):
+		'''
+		Method: open
+		Description: Opens (visits all cells and destroys all walls within) the given world region, avoiding the given exempt world regions. Walls along the seams between chunks are only opened at the seam openings.
+		Parameters: region, exemptions=None
+			region: Region - A world region for maze opening to span
+			exemptions: Regions - A collection of world regions for maze opening to avoid
+		Return: None
+		'''
+
+		self.mutate(lambda chunk, part, local_exemptions: chunk.open(part, local_exemptions), region, exemptions)
+
+	def get_wall(self, position, direction):
+		'''
+		Method: get_wall
+		Description: Gets the wall of the cell at the given world position in the given direction.
+		Parameters: position, direction
+			position: 2-Tuple - A world position
+			direction: Direction - The direction of the wall
+		Return: Boolean - Whether the wall exists or not
+		'''
+
+		chunk_position, local_position = self.to_chunk(position)
+		chunk = self.get_chunk(chunk_position)
+		return chunk.m_grid.get_wall(chunk.m_grid.index(local_position), direction)
+
+	def set_wall(self, position, direction, value):
+		'''
+		Method: set_wall
+		Description: Modify both sides of the wall of the cell at the given world position in the given direction, even across chunks.
+		Parameters: position, direction, value
+			position: 2-Tuple - A world position
+			direction: Direction - The direction of the wall
+			value: Boolean - Whether the wall should exist or not
+		Return: None
+		'''
+
+		offset = self.DIRECTION_OFFSETS[direction.value]
+		neighbor_position = (position[0] + offset[0], position[1] + offset[1])
+		for side_position, side_direction in ((position, direction), (neighbor_position, Direction.get_opposite(direction))):
+			chunk_position, local_position = self.to_chunk(side_position)
+			chunk = self.get_chunk(chunk_position)
+			chunk.m_grid.set_wall_side(chunk.m_grid.index(local_position), side_direction, value)
+			self.m_dirty.add(chunk_position)
+
+	def get_accessible_neighbors(self, position):
+		'''
+		Method: get_accessible_neighbors
+		Description: Gets all neighboring world positions which are directly-accessible from the given world position.
+		Parameters: position
+			position: 2-Tuple - A world position
+		Return: [2-Tuple] - All neighboring world positions directly-accessible from the given world position
+		'''
+
+		accessible_neighbors = []
+		for direction in list(Direction):
+			if not self.get_wall(position, direction):
+				offset = self.DIRECTION_OFFSETS[direction.value]
+				accessible_neighbors.append((position[0] + offset[0], position[1] + offset[1]))
+
+		return accessible_neighbors
\ No newline at end of file